@@ -0,0 +1,174 @@
+# Program Description: Bulk safety checker for the Banker's Algorithm. It reads a file of state snapshots, checks
+#                      them across a process pool and streams one JSON result per snapshot, in input order, as soon
+#                      as each result is ready. This is meant for what-if sweeps such as capacity planning and
+#                      replayed allocation logs, where thousands of snapshots are checked at once.
+#
+#                      Snapshots are read either as JSON Lines (one object with "available", "max" and "allocation"
+#                      entries per line) or in a compact binary format. The binary file starts with the magic bytes
+#                      BNKR and a version byte, followed by one record per snapshot: the number of processes n and
+#                      the number of resources m as little-endian unsigned 32-bit integers, then the m available
+#                      values, the n*m maximum values and the n*m allocation values as little-endian signed 32-bit
+#                      integers in row-major order. The main process only splits the input into raw records; parsing
+#                      and checking happen in the workers, so throughput scales with the number of cores. Every worker
+#                      keeps the results of recent snapshots in a cache keyed on the raw record or line, so repeated
+#                      snapshots, which are common in replayed logs, are answered without being parsed or checked.
+
+import argparse
+import json
+import os
+import struct
+import sys
+from array import array
+from multiprocessing import Pool
+
+from banker_engine import checkState
+from banker_input import stateFromDict
+from banker_search import SafetyCache
+
+BINARY_MAGIC = b"BNKR\x01"
+RECORD_HEADER = struct.Struct("<II")
+
+# Results of the snapshots recently checked by this worker process, keyed on the raw record or line
+workerCache = SafetyCache()
+
+
+# Function to convert a list of integers to little-endian signed 32-bit bytes
+def packValues(values):
+    packed = array("i", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+# Function to convert little-endian signed 32-bit bytes back to a list of integers
+def unpackValues(payload):
+    values = array("i")
+    values.frombytes(payload)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+# Function to encode one state as a binary record
+def encodeBinaryState(available, maxm, allot):
+    n, m = len(maxm), len(available)
+    values = list(available)
+    for row in maxm:
+        values.extend(row)
+    for row in allot:
+        values.extend(row)
+    return RECORD_HEADER.pack(n, m) + packValues(values)
+
+
+# Function to write states to a file in the binary snapshot format
+def writeBinaryStates(path, states):
+    with open(path, "wb") as binaryFile:
+        binaryFile.write(BINARY_MAGIC)
+        for available, maxm, allot in states:
+            binaryFile.write(encodeBinaryState(available, maxm, allot))
+
+
+# Function to read the raw binary records of a snapshot file one at a time, without decoding their values
+def readBinaryRecords(binaryFile):
+    if binaryFile.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Invalid input. The file is not a Banker's snapshot file.")
+    while True:
+        header = binaryFile.read(RECORD_HEADER.size)
+        if not header:
+            return
+        if len(header) != RECORD_HEADER.size:
+            raise ValueError("Invalid input. The snapshot file ends in the middle of a record.")
+        n, m = RECORD_HEADER.unpack(header)
+        payload = binaryFile.read(4 * (m + 2 * n * m))
+        if len(payload) != 4 * (m + 2 * n * m):
+            raise ValueError("Invalid input. The snapshot file ends in the middle of a record.")
+        yield header + payload
+
+
+# Function to decode and check one binary record in a worker process, answering repeated records from the cache
+def checkBinaryRecord(record):
+    result = workerCache.get(record)
+    if result is None:
+        result = decodeAndCheckRecord(record)
+        workerCache.put(record, result)
+    return result
+
+
+# Function to decode and check one binary record
+def decodeAndCheckRecord(record):
+    n, m = RECORD_HEADER.unpack_from(record)
+    values = unpackValues(record[RECORD_HEADER.size:])
+    available = values[:m]
+    maxm = [values[m + i * m:m + (i + 1) * m] for i in range(n)]
+    allot = [values[m + (n + i) * m:m + (n + i + 1) * m] for i in range(n)]
+    return checkState(available, maxm, allot)
+
+
+# Function to decode and check one JSON line in a worker process, answering repeated lines from the cache.
+# A malformed line gives an error record, so it never stops the rest of the batch.
+def checkJsonLine(line):
+    key = line.strip()
+    result = workerCache.get(key)
+    if result is None:
+        try:
+            result = checkState(*stateFromDict(json.loads(line)))
+        except (TypeError, ValueError) as error:
+            result = {"error": str(error)}
+        workerCache.put(key, result)
+    return result
+
+
+# Function to check a stream of raw records across a process pool, yielding the results in input order
+def checkRecords(records, checkRecord, workers=None, chunksize=64):
+    if workers == 1:
+        yield from map(checkRecord, records)
+        return
+    with Pool(processes=workers) as pool:
+        yield from pool.imap(checkRecord, records, chunksize)
+
+
+# Function to check every snapshot in a JSON Lines or binary file, yielding the results in input order
+def checkFile(path, workers=None, chunksize=64):
+    with open(path, "rb") as inputFile:
+        if inputFile.peek(len(BINARY_MAGIC))[:len(BINARY_MAGIC)] == BINARY_MAGIC:
+            yield from checkRecords(readBinaryRecords(inputFile), checkBinaryRecord, workers, chunksize)
+        else:
+            lines = (line for line in inputFile if line.strip())
+            yield from checkRecords(lines, checkJsonLine, workers, chunksize)
+
+
+# Function to build the command-line argument parser
+def buildArgumentParser():
+    parser = argparse.ArgumentParser(description="Check many Banker's Algorithm snapshots in parallel.")
+    parser.add_argument("input", help="JSON Lines or binary snapshot file, or - for JSON Lines from stdin")
+    parser.add_argument("--output", metavar="FILE", help="write the results to FILE instead of stdout")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=64, help="snapshots sent to a worker at a time")
+    return parser
+
+
+# Function to run the bulk checker, writing one JSON result per snapshot with its index in the input
+def main(argv=None):
+    args = buildArgumentParser().parse_args(argv)
+
+    if args.input == "-":
+        lines = (line for line in sys.stdin if line.strip())
+        results = checkRecords(lines, checkJsonLine, args.workers, args.chunksize)
+    else:
+        results = checkFile(args.input, args.workers, args.chunksize)
+
+    outputStream = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for index, result in enumerate(results):
+            outputStream.write(json.dumps(dict(index=index, **result)) + "\n")
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 2
+    finally:
+        if args.output:
+            outputStream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+# Program Description: Headless core of the Banker's Algorithm. This module contains the need calculation, the
+#                      safety-check engine, the resource-request allocator and the input validation used by the
+#                      graphical user interface and the command-line entry point in bankers_algorithm.py. It does not
+#                      import Tkinter, so it can be used from servers, worker processes and benchmarks that have no
+#                      display.
+#
+#                      The available vector and the maximum and allocation matrices can be given either as lists of
+#                      lists or as NumPy integer arrays. NumPy is optional; when arrays are given, the need matrix is
+#                      computed with one array subtraction and the safety check compares all candidate processes
+#                      against the work vector at once.
+#
+#                      Besides avoidance, the same work/finish loop detects deadlock: given the outstanding requests
+#                      instead of the maximum claims, it reports the deadlocked processes and which to abort.
+
+import bisect
+import heapq
+import operator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Smallest fraction of the remaining processes a vectorized round of isSafeArray has to finish before the rest of the
+# check is handed to the wait-index engine
+ARRAY_ROUND_FRACTION = 0.125
+
+
+# Function to tell whether any of the given values is a NumPy array
+def isArray(*values):
+    return np is not None and any(isinstance(value, np.ndarray) for value in values)
+
+
+# Function to convert a NumPy array or a sequence of sequences into lists
+def toList(value):
+    return value.tolist() if isArray(value) else list(value)
+
+
+# Function to find the need of each process
+def calculateNeed(need, maxm, allot):
+    if isArray(need):
+        np.subtract(maxm, allot, out=need)
+        return
+    for i in range(len(need)):
+        for j in range(len(need[i])):
+            need[i][j] = maxm[i][j] - allot[i][j]
+
+
+# Safety-check engine that keeps the need matrix and a per-resource wait index between checks.
+# For every resource, the processes are kept sorted by how much of that resource they still need. During a check,
+# each resource has a pointer into its sorted list that only moves forward as the work vector grows, and every
+# process counts the resources it is still blocked on. A process becomes runnable when that count reaches zero, so
+# every (process, resource) pair is examined once per check instead of rescanning all processes after each finish.
+class SafetyEngine:
+    def __init__(self, available, maxm, allot):
+        self.available = toList(available)
+        self.maxm = [list(row) for row in toList(maxm)]
+        self.allot = [list(row) for row in toList(allot)]
+        self.need = [[0] * len(self.available) for i in range(len(self.maxm))]
+        calculateNeed(self.need, self.maxm, self.allot)
+
+        # Per-resource wait index: (need, process) pairs sorted by need
+        self.waitIndex = [sorted((self.need[i][j], i) for i in range(len(self.need))) for j in range(len(self.available))]
+
+        # Work vector and finish flags of the most recent run of the work/finish loop
+        self.work = self.available.copy()
+        self.finish = [False] * len(self.need)
+
+        # Result of the most recent check, cleared whenever the state changes
+        self.result = None
+
+    # Function to change the need of one process for one resource and keep the wait index sorted
+    def setNeed(self, i, j, value):
+        column = self.waitIndex[j]
+        del column[bisect.bisect_left(column, (self.need[i][j], i))]
+        bisect.insort(column, (value, i))
+        self.need[i][j] = value
+        self.result = None
+
+    # Function to replace the maximum and/or allocation row of a process, updating only the needs that changed
+    def updateProcess(self, i, maxRow=None, allotRow=None):
+        if maxRow is not None:
+            self.maxm[i] = list(maxRow)
+        if allotRow is not None:
+            self.allot[i] = list(allotRow)
+        self.result = None
+        for j in range(len(self.available)):
+            value = self.maxm[i][j] - self.allot[i][j]
+            if value != self.need[i][j]:
+                self.setNeed(i, j, value)
+
+    # Function to replace the available resources vector
+    def setAvailable(self, available):
+        self.available = toList(available)
+        self.result = None
+
+    # Function to start a run of the work/finish loop from the available resources.
+    # Processes listed as finished are never run, and the other processes whose needs are already covered are made
+    # runnable.
+    def startCheck(self, finished=None):
+        n = len(self.need)
+        m = len(self.available)
+        self.work = self.available.copy()
+        self.finish = list(finished) if finished is not None else [False] * n
+
+        # Number of resources each process is still blocked on, and the processes that can run.
+        # A finished process starts one above m, so it can never become runnable.
+        self.blocked = [m + 1 if done else m for done in self.finish]
+        self.ready = [i for i in range(n) if self.blocked[i] == 0]
+        self.position = [0] * m
+
+        for j in range(m):
+            self.advance(j)
+
+    # Function to move the pointer of resource j past every process whose need is now covered by work
+    def advance(self, j):
+        column = self.waitIndex[j]
+        blocked = self.blocked
+        ready = self.ready
+        end = bisect.bisect_right(column, (self.work[j], len(blocked)))
+        for p in range(self.position[j], end):
+            i = column[p][1]
+            blocked[i] -= 1
+            if blocked[i] == 0:
+                heapq.heappush(ready, i)
+        self.position[j] = end
+
+    # Function to mark process i as finished, release its allocation and wake the processes waiting on it
+    def finishProcess(self, i):
+        self.finish[i] = True
+        work = self.work
+        allotRow = self.allot[i]
+        for j in range(len(work)):
+            if allotRow[j]:
+                work[j] += allotRow[j]
+                self.advance(j)
+
+    # Function to run the work/finish loop until no process can run, returning the processes in the order they ran.
+    # Runnable processes are taken lowest index first, which gives the same sequence as rescanning from P0.
+    def runCheck(self):
+        ready = self.ready
+        sequence = []
+        while ready:
+            # Allocate resources to the lowest-numbered runnable process and mark it as finished
+            i = heapq.heappop(ready)
+            self.finishProcess(i)
+            sequence.append(i)
+        return sequence
+
+    # Function to find whether the current state is safe, returning the flag and a safe sequence.
+    # After the check, finish shows which processes could not finish. The result is kept until the state is changed
+    # through setNeed, updateProcess or setAvailable, so checking an unchanged state again returns immediately.
+    def check(self):
+        if self.result is None:
+            self.startCheck()
+
+            # Initialize the safe sequence array
+            safe_sequence = self.runCheck()
+
+            # If all processes are finished, the system is in a safe state
+            if len(safe_sequence) == len(self.need):
+                self.result = (True, safe_sequence)
+            else:
+                self.result = (False, [])
+        return self.result[0], list(self.result[1])
+
+
+# Deadlock detector built on the safety engine's work/finish loop and wait index.
+# Detection uses the outstanding requests of the processes in place of their remaining need, so the maximum matrix
+# seen by the engine is request + allocation. Processes holding no resources cannot be part of a deadlock and start
+# as finished; every process the loop cannot finish afterwards is deadlocked.
+class DeadlockDetector(SafetyEngine):
+    def __init__(self, available, request, allot):
+        request = [list(row) for row in toList(request)]
+        allot = [list(row) for row in toList(allot)]
+        super().__init__(available, [[r + a for r, a in zip(requestRow, allotRow)]
+                                     for requestRow, allotRow in zip(request, allot)], allot)
+
+    # Function to change the outstanding request of process i for resource j
+    def setRequest(self, i, j, value):
+        self.setNeed(i, j, value)
+
+    # Function to return the deadlocked processes in index order
+    def detect(self):
+        self.startCheck([not any(row) for row in self.allot])
+        self.runCheck()
+        return [i for i, done in enumerate(self.finish) if not done]
+
+    # Function to choose processes to abort until the remaining processes can finish.
+    # The victims are chosen greedily: the deadlocked process holding the most resources (or with the lowest cost,
+    # when costs are given) is aborted, its allocation is released into the same loop, and the processes that can
+    # then finish are run before the next victim is chosen. Returns the deadlocked processes and the victims.
+    def chooseVictims(self, costs=None):
+        deadlocked = self.detect()
+        if costs is None:
+            order = sorted(deadlocked, key=lambda i: (-sum(self.allot[i]), i))
+        else:
+            order = sorted(deadlocked, key=lambda i: (costs[i], i))
+
+        victims = []
+        for i in order:
+            if not self.finish[i]:
+                victims.append(i)
+                # The victim is still listed in the wait index, so it must never become runnable again
+                self.blocked[i] = len(self.available) + 1
+                self.finishProcess(i)
+                self.runCheck()
+        return deadlocked, victims
+
+
+# Stateful allocator implementing the Banker's resource-request algorithm on top of the safety engine.
+# A request is applied to available, allot and need in place, the safety check is run, and an unsafe request is
+# rolled back from an undo log holding only the entries it changed, so no matrices are copied per request.
+class ResourceAllocator(SafetyEngine):
+    # Function to validate a request or release vector for process i
+    def validateVector(self, i, vector):
+        if not 0 <= i < len(self.need):
+            raise ValueError(f"Process P{i} does not exist.")
+        if len(vector) != len(self.available):
+            raise ValueError(f"Expected {len(self.available)} resource values, got {len(vector)}.")
+        if any(x < 0 for x in vector):
+            raise ValueError("Resource values should not be negative.")
+
+    # Function to grant request to process i if the resulting state is safe.
+    # Returns (True, safe sequence) when granted, or (False, []) when the process has to wait.
+    def requestResources(self, i, request):
+        self.validateVector(i, request)
+        m = len(self.available)
+
+        # The process cannot ask for more than its remaining maximum claim
+        if any(request[j] > self.need[i][j] for j in range(m)):
+            raise ValueError(f"Process P{i} has exceeded its maximum claim.")
+
+        # The process has to wait if the resources are not available
+        if any(request[j] > self.available[j] for j in range(m)):
+            return False, []
+
+        # Pretend to allocate the requested resources, recording the old values
+        undoLog = []
+        for j in range(m):
+            if request[j]:
+                undoLog.append((j, self.available[j], self.allot[i][j], self.need[i][j]))
+                self.available[j] -= request[j]
+                self.allot[i][j] += request[j]
+                self.setNeed(i, j, self.need[i][j] - request[j])
+
+        safe, safe_sequence = self.check()
+
+        # Roll back the allocation if the new state is unsafe
+        if not safe:
+            for j, available, allotted, needed in reversed(undoLog):
+                self.available[j] = available
+                self.allot[i][j] = allotted
+                self.setNeed(i, j, needed)
+
+        return safe, safe_sequence
+
+    # Function to return resources held by process i to the available pool
+    def releaseResources(self, i, release):
+        self.validateVector(i, release)
+        m = len(self.available)
+
+        if any(release[j] > self.allot[i][j] for j in range(m)):
+            raise ValueError(f"Process P{i} cannot release more resources than it holds.")
+
+        for j in range(m):
+            if release[j]:
+                self.available[j] += release[j]
+                self.allot[i][j] -= release[j]
+                self.setNeed(i, j, self.need[i][j] + release[j])
+
+
+# Function to find whether a state given as NumPy arrays is safe.
+# Each round compares the need of every unfinished process with the work vector in one vectorized comparison,
+# finishes all processes that can run and adds their allocations to the work vector. The processes finished in the
+# same round are listed in index order, so the result is a valid safe sequence, although it may differ from the
+# lowest-index-first sequence of the list-based engine. A round costs as much as comparing every remaining process,
+# so once a round finishes fewer than ARRAY_ROUND_FRACTION of them (as in a chain where each process waits for the
+# one before it), the remaining processes are checked by the wait-index engine from the current work vector. This
+# keeps the check within a constant factor of the engine's cost instead of O(n * n * m).
+def isSafeArray(available, maxm, allot):
+    maxm = np.asarray(maxm)
+    allot = np.asarray(allot)
+    need = np.subtract(maxm, allot)
+    work = np.array(available, dtype=np.int64)
+
+    # Indices of the processes that have not finished yet
+    remaining = np.arange(len(need))
+
+    # Initialize the safe sequence array
+    safe_sequence = []
+
+    while remaining.size:
+        runnable = (need[remaining] <= work).all(axis=1)
+        if not runnable.any():
+            return False, []
+        finished = remaining[runnable]
+        work += allot[finished].sum(axis=0, dtype=np.int64)
+        safe_sequence.extend(finished.tolist())
+        slowRound = finished.size < remaining.size * ARRAY_ROUND_FRACTION
+        remaining = remaining[~runnable]
+        if slowRound:
+            break
+
+    if remaining.size:
+        safe, sequence = SafetyEngine(work, maxm[remaining], allot[remaining]).check()
+        if not safe:
+            return False, []
+        safe_sequence.extend(remaining[sequence].tolist())
+
+    return True, safe_sequence
+
+
+# Function to find whether a process can be allocated resources
+def isSafe(processes, available, maxm, allot):
+    if isArray(available, maxm, allot):
+        return isSafeArray(available, np.asarray(maxm)[:len(processes)], np.asarray(allot)[:len(processes)])
+    return SafetyEngine(available, [maxm[i] for i in range(len(processes))], [allot[i] for i in range(len(processes))]).check()
+
+
+# Function to find the deadlocked processes of a state and the processes to abort to resolve the deadlock
+def detectDeadlock(available, request, allot, costs=None):
+    return DeadlockDetector(available, request, allot).chooseVictims(costs)
+
+
+# Function to check one state for deadlock and return the result as a dictionary that can be written as JSON
+def checkDeadlock(available, request, allot):
+    error = validateDetectionState(available, request, allot)
+    if error:
+        return {"error": error}
+    deadlocked, victims = detectDeadlock(available, request, allot)
+    return {"deadlocked": deadlocked, "victims": victims}
+
+
+# Function to check one state and return the result as a dictionary that can be written as JSON
+def checkState(available, maxm, allot):
+    error = validateState(available, maxm, allot)
+    if error:
+        return {"error": error}
+    safe, sequence = isSafe(range(len(maxm)), available, maxm, allot)
+    return {"safe": safe, "sequence": sequence}
+
+
+# Function to display the input data in a table format. maxLabel names the first matrix column.
+def displayInputData(available, maxm, allot, maxLabel="Maximum"):
+    output_text = "\nInput Data:\n\n"
+    output_text += "Available Resources: " + ", ".join([f"{x}" for x in available]) + "\n\n"
+    output_text += f"Process\t{maxLabel}\tAllocation\n"
+    for i in range(len(maxm)):
+        output_text += f"P{i}\t"
+        output_text += "[" + ", ".join([f"{x}" for x in maxm[i]]) + "]" + "\t"
+        output_text += "[" + ", ".join([f"{x}" for x in allot[i]]) + "]" + "\n"
+    output_text += "\n"
+
+    return output_text
+
+
+# Function to check whether the input values are valid
+def validateInput(input_string):
+    if not input_string:
+        return False
+
+    # Check if input is valid matrix of integers
+    try:
+        rows = input_string.strip().split('\n')
+        for row in rows:
+            values = [int(x) for x in row.strip().split(',')]
+    except ValueError:
+        return False
+
+    return True
+
+
+# Function to check whether the available vector and the maximum and allocation matrices form a valid state.
+# Returns None for a valid state, or a message describing the first problem found.
+# Every row is visited once: its length, minimum and maximum are taken with the built-in functions, and the problems
+# found are reported in a fixed order of precedence, so the message does not depend on which row is visited first.
+def validateState(available, maxm, allot, maxValue=None):
+    if isArray(available, maxm, allot):
+        return validateStateArray(np.asarray(available), np.asarray(maxm), np.asarray(allot), maxValue)
+
+    m = len(available)
+    badShape = len(maxm) != len(allot)
+    negative = bool(available) and min(available) < 0
+    tooLarge = maxValue is not None and bool(available) and max(available) > maxValue
+    exceedsAvailable = False
+
+    for maxRow, allotRow in zip(maxm, allot):
+        # Check that every matrix has one row per process and one column per resource
+        if len(maxRow) != m or len(allotRow) != m:
+            return "Invalid input. Every matrix row should have one value per resource." if not badShape else \
+                "Invalid input. The maximum and allocation matrices should have the same number of rows."
+        if m == 0:
+            continue
+
+        # Check for negative values and for values that exceed the maximum resource value
+        low = min(min(maxRow), min(allotRow))
+        high = max(max(maxRow), max(allotRow))
+        negative = negative or low < 0
+        tooLarge = tooLarge or (maxValue is not None and high > maxValue)
+
+        # Check if the number of resources requested by a process exceeds the maximum resources available
+        exceedsAvailable = exceedsAvailable or any(map(operator.gt, allotRow, available))
+
+    if badShape:
+        return "Invalid input. The maximum and allocation matrices should have the same number of rows."
+    if negative:
+        return "Invalid input. Matrix values should not be negative."
+    if tooLarge:
+        return f"Invalid input. Matrix values should not exceed {maxValue}."
+    if exceedsAvailable:
+        return "Invalid input. The number of resources requested by a process exceeds the maximum resources available."
+
+    return None
+
+
+# Function to check whether the available vector and the request and allocation matrices form a valid state for
+# deadlock detection. Returns None for a valid state, or a message describing the first problem found.
+def validateDetectionState(available, request, allot):
+    available, request, allot = toList(available), [toList(row) for row in toList(request)], [toList(row) for row in toList(allot)]
+
+    # Check that every matrix has one row per process and one column per resource
+    if len(request) != len(allot):
+        return "Invalid input. The request and allocation matrices should have the same number of rows."
+    if any(len(row) != len(available) for row in request + allot):
+        return "Invalid input. Every matrix row should have one value per resource."
+
+    # Check if there are any negative values in the input matrices
+    if any(any(x < 0 for x in row) for row in request + allot + [available]):
+        return "Invalid input. Matrix values should not be negative."
+
+    return None
+
+
+# Function to describe the result of a safety check in the format shown to the user.
+# For an unsafe state, the processes that could not finish are listed when they are given.
+def describeResult(safe, sequence, unfinished=None):
+    if safe:
+        return "The system is in a safe state.\nSafe sequence: " + ", ".join([f"P{x}" for x in sequence])
+    elif unfinished:
+        return "The system is in an unsafe state.\nProcesses that cannot finish: " + ", ".join([f"P{x}" for x in unfinished])
+    else:
+        return "The system is in an unsafe state."
+
+
+# Function to describe the result of a deadlock check in the format shown to the user
+def describeDeadlock(deadlocked, victims):
+    if not deadlocked:
+        return "No processes are deadlocked."
+    return ("Deadlocked processes: " + ", ".join([f"P{x}" for x in deadlocked]) +
+            "\nProcesses to abort: " + ", ".join([f"P{x}" for x in victims]))
+
+
+# Function to check whether a state given as NumPy arrays is valid, using whole-array comparisons
+def validateStateArray(available, maxm, allot, maxValue=None):
+    # Check that every matrix has one row per process and one column per resource
+    if maxm.shape != allot.shape:
+        return "Invalid input. The maximum and allocation matrices should have the same number of rows."
+    if available.ndim != 1 or maxm.ndim != 2 or maxm.shape[1] != available.shape[0]:
+        return "Invalid input. Every matrix row should have one value per resource."
+
+    # Check if there are any negative values in the input matrices
+    if (available < 0).any() or (maxm < 0).any() or (allot < 0).any():
+        return "Invalid input. Matrix values should not be negative."
+
+    # Check if there are any values in the input matrices that exceed the maximum resource value
+    if maxValue is not None and ((available > maxValue).any() or (maxm > maxValue).any() or (allot > maxValue).any()):
+        return f"Invalid input. Matrix values should not exceed {maxValue}."
+
+    # Check if the number of resources requested by a process exceeds the maximum resources available
+    if (allot > available).any():
+        return "Invalid input. The number of resources requested by a process exceeds the maximum resources available."
+
+    return None
@@ -0,0 +1,132 @@
+# Program Description: Tkinter graphical user interface for the Banker's Algorithm. The user inputs the number of
+#                      processes and resources, the available resources, the maximum resource allocation matrix and
+#                      the current resource allocation matrix, and clicking the "Check Safety" button runs the safety
+#                      check from banker_engine.py. The counts and values are not limited: the available resources are
+#                      typed as one comma-separated row, and the matrices can be pasted or loaded from CSV files. This
+#                      module is only imported when the GUI is started, so the engine and the command-line entry point
+#                      do not depend on Tkinter or a display.
+
+from tkinter import *
+from tkinter import filedialog
+
+from banker_engine import SafetyEngine, describeResult, validateState
+from banker_input import parseMatrix, parseVector
+
+
+# Main window of the Banker's Algorithm GUI
+class BankerApp:
+    def __init__(self, root):
+        self.root = root
+        root.title("Banker's Algorithm")
+
+        # Create the widgets
+        self.num_processes_label = Label(root, text="Number of Processes:")
+        self.num_processes_spinner = Spinbox(root, from_=1, to=10 ** 9)
+        self.num_resources_label = Label(root, text="Number of Resources:")
+        self.num_resources_spinner = Spinbox(root, from_=1, to=10 ** 9)
+
+        self.available_label = Label(root, text="Available Resources (comma-separated):")
+        self.available_entry = Entry(root, width=50)
+
+        self.maxm_label = Label(root, text="Maximum Resource Allocation (one row per process):")
+        self.maxm_text = Text(root, width=50, height=10)
+        self.maxm_scroll = Scrollbar(root, command=self.maxm_text.yview)
+        self.maxm_text.config(yscrollcommand=self.maxm_scroll.set)
+        self.maxm_load_button = Button(root, text="Load CSV...", command=lambda: self.loadMatrix(self.maxm_text))
+
+        self.allot_label = Label(root, text="Current Resource Allocation (one row per process):")
+        self.allot_text = Text(root, width=50, height=10)
+        self.allot_scroll = Scrollbar(root, command=self.allot_text.yview)
+        self.allot_text.config(yscrollcommand=self.allot_scroll.set)
+        self.allot_load_button = Button(root, text="Load CSV...", command=lambda: self.loadMatrix(self.allot_text))
+
+        self.check_button = Button(root, text="Check Safety", command=self.checkSafety)
+        self.output_label = Label(root, text="")
+
+        # Add the widgets to the window
+        self.num_processes_label.grid(row=0, column=0, padx=5, pady=5, sticky=W)
+        self.num_processes_spinner.grid(row=0, column=1, padx=5, pady=5, sticky=W)
+        self.num_resources_label.grid(row=1, column=0, padx=5, pady=5, sticky=W)
+        self.num_resources_spinner.grid(row=1, column=1, padx=5, pady=5, sticky=W)
+
+        self.available_label.grid(row=2, column=0, padx=5, pady=5, sticky=W)
+        self.available_entry.grid(row=2, column=1, columnspan=10, padx=5, pady=5, sticky=W)
+
+        self.maxm_label.grid(row=3, column=0, padx=5, pady=5, sticky=W)
+        self.maxm_text.grid(row=3, column=1, columnspan=10, padx=5, pady=5, sticky=W)
+        self.maxm_scroll.grid(row=3, column=11, sticky=N+S+W)
+        self.maxm_load_button.grid(row=3, column=12, padx=5, pady=5, sticky=W)
+
+        self.allot_label.grid(row=4, column=0, padx=5, pady=5, sticky=W)
+        self.allot_text.grid(row=4, column=1, columnspan=10, padx=5, pady=5, sticky=W)
+        self.allot_scroll.grid(row=4, column=11, sticky=N+S+W)
+        self.allot_load_button.grid(row=4, column=12, padx=5, pady=5, sticky=W)
+
+        self.check_button.grid(row=5, column=0, padx=5, pady=5, sticky=W)
+        self.output_label.grid(row=5, column=1, padx=5, pady=5, sticky=W)
+
+    # Function to replace the contents of a matrix Text widget with a CSV file chosen by the user
+    def loadMatrix(self, text):
+        path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            with open(path) as csvFile:
+                contents = csvFile.read()
+        except OSError as error:
+            self.output_label.configure(text=str(error))
+            return
+        text.delete("1.0", END)
+        text.insert("1.0", contents)
+
+    def checkSafety(self):
+        # Get the input values
+        num_processes = self.num_processes_spinner.get()
+        num_resources = self.num_resources_spinner.get()
+
+        if not num_processes or not num_resources:
+            self.output_label.configure(text="Please enter the number of processes and resources.")
+            return
+
+        try:
+            num_processes = int(num_processes)
+            num_resources = int(num_resources)
+            available = parseVector(self.available_entry.get())
+            maxm = parseMatrix(self.maxm_text.get("1.0", "end-1c"))
+            allot = parseMatrix(self.allot_text.get("1.0", "end-1c"))
+        except ValueError as error:
+            self.output_label.configure(text=str(error))
+            return
+
+        # Check if the inputs are valid
+        if num_processes <= 0 or num_resources <= 0:
+            self.output_label.configure(text="Invalid input.")
+            return
+
+        if len(maxm) != num_processes or len(allot) != num_processes:
+            self.output_label.configure(text="Invalid input. The matrices should have one row per process.")
+            return
+
+        if len(available) != num_resources:
+            self.output_label.configure(text="Invalid input. There should be one available value per resource.")
+            return
+
+        error = validateState(available, maxm, allot)
+        if error:
+            self.output_label.configure(text=error)
+            return
+
+        # Run the banker's algorithm
+        engine = SafetyEngine(available, maxm, allot)
+        safe, sequence = engine.check()
+        unfinished = [i for i, done in enumerate(engine.finish) if not done]
+
+        # Display the results
+        self.output_label.configure(text=describeResult(safe, sequence, unfinished))
+
+
+# Function to create the main window and start the main event loop
+def runGui():
+    root = Tk()
+    BankerApp(root)
+    root.mainloop()
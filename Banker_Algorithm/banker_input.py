@@ -0,0 +1,150 @@
+# Program Description: Input readers for the Banker's Algorithm. A state is made of the available resources vector,
+#                      the maximum resource allocation matrix and the current resource allocation matrix. States can
+#                      be read from comma-separated text (one row per process, as typed into the GUI), from CSV files
+#                      holding one matrix each, or from JSON objects with "available", "max" and "allocation" keys.
+#                      For deadlock detection, the JSON objects hold a "request" matrix of outstanding requests in
+#                      place of the "max" matrix.
+#
+#                      Matrices of any size are parsed in one pass over the text. With NumPy installed, all values
+#                      are converted by a single np.fromstring() call; the per-row parser is only used to report the
+#                      row of a malformed or empty value, or for values too large for a 64-bit integer.
+
+import json
+import re
+import warnings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Pattern matching a value that is empty or only whitespace, which np.fromstring() would read as 0
+EMPTY_VALUE = re.compile(r'(?:^|,)\s*(?:,|$)')
+
+
+# Function to parse a matrix of integers from text with one comma-separated row per line, one row at a time
+def parseRows(rows):
+    matrix = []
+    for lineNumber, row in rows:
+        try:
+            matrix.append([int(x) for x in row.split(',')])
+        except ValueError:
+            raise ValueError(f"Invalid input. Row {lineNumber} is not a comma-separated list of integers.")
+    return matrix
+
+
+# Function to convert the values of all rows with a single np.fromstring() call. Returns None when a value is
+# malformed, empty or does not fit in a 64-bit integer, so that the caller can fall back to the per-row parser.
+def parseValues(rows, count):
+    text = ",".join(row for _, row in rows)
+    if EMPTY_VALUE.search(text):
+        return None
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(text, dtype=np.int64, sep=",")
+    except (ValueError, DeprecationWarning):
+        return None
+    limits = np.iinfo(np.int64)
+    if values.size != count or values.max() == limits.max or values.min() == limits.min:
+        return None
+    return values
+
+
+# Function to parse a matrix of integers from text with one comma-separated row per line.
+# Blank lines are skipped. Every row must have the same number of values, which is checked by counting the commas of
+# each row before any value is converted. Returns the matrix as a NumPy int64 array when asArray is set (NumPy is
+# then required), and as a list of lists otherwise.
+def parseMatrix(text, asArray=False):
+    if asArray and np is None:
+        raise ValueError("NumPy is required to parse a matrix into an array.")
+
+    rows = [(lineNumber, row) for lineNumber, row in enumerate(text.split('\n'), start=1) if row.strip()]
+    if not rows:
+        return np.zeros((0, 0), dtype=np.int64) if asArray else []
+
+    width = rows[0][1].count(',') + 1
+    for lineNumber, row in rows:
+        if row.count(',') + 1 != width:
+            raise ValueError(f"Invalid input. Row {lineNumber} has {row.count(',') + 1} values, expected {width}.")
+
+    values = parseValues(rows, len(rows) * width) if np is not None else None
+    if values is not None:
+        matrix = values.reshape(len(rows), width)
+        return matrix if asArray else matrix.tolist()
+
+    matrix = parseRows(rows)
+    if not asArray:
+        return matrix
+    try:
+        return np.array(matrix, dtype=np.int64)
+    except OverflowError:
+        raise ValueError("Invalid input. Matrix values should fit in a 64-bit integer.")
+
+
+# Function to parse a vector of integers from text holding a single comma-separated row
+def parseVector(text, asArray=False):
+    matrix = parseMatrix(text, asArray)
+    if len(matrix) != 1:
+        raise ValueError("Invalid input. Expected exactly one row of values.")
+    return matrix[0]
+
+
+# Function to read a matrix of integers from a CSV file with one row per process
+def readCsvMatrix(path, asArray=False):
+    with open(path, newline='') as csvFile:
+        text = csvFile.read()
+    try:
+        return parseMatrix(text, asArray)
+    except ValueError as error:
+        raise ValueError(f"Invalid input. {path}: {str(error).replace('Invalid input. ', '')}")
+
+
+# Function to read the available vector from a CSV file holding a single row
+def readCsvVector(path, asArray=False):
+    matrix = readCsvMatrix(path, asArray)
+    if len(matrix) != 1:
+        raise ValueError(f"Invalid input. {path} should contain exactly one row of available resources.")
+    return matrix[0]
+
+
+# Function to check that every value of a vector read from JSON is an integer. Booleans, floats and strings are
+# rejected, as the engine compares and adds the values as integers.
+def checkIntegers(values):
+    if not all(type(x) is int for x in values):
+        raise ValueError("Invalid input. Resource values should be integers.")
+    return values
+
+
+# Function to extract the available vector and the maximum and allocation matrices from a JSON object
+def stateFromDict(state):
+    try:
+        available = list(state['available'])
+        maxm = [list(row) for row in state['max']]
+        allot = [list(row) for row in state['allocation']]
+    except (KeyError, TypeError):
+        raise ValueError("Invalid input. A state needs \"available\", \"max\" and \"allocation\" entries.")
+    return checkIntegers(available), [checkIntegers(row) for row in maxm], [checkIntegers(row) for row in allot]
+
+
+# Function to extract the available vector and the request and allocation matrices from a JSON object
+def detectionStateFromDict(state):
+    try:
+        available = list(state['available'])
+        request = [list(row) for row in state['request']]
+        allot = [list(row) for row in state['allocation']]
+    except (KeyError, TypeError):
+        raise ValueError("Invalid input. A state needs \"available\", \"request\" and \"allocation\" entries.")
+    return checkIntegers(available), [checkIntegers(row) for row in request], [checkIntegers(row) for row in allot]
+
+
+# Function to read a state from a JSON file
+def readJsonState(path):
+    with open(path) as jsonFile:
+        return stateFromDict(json.load(jsonFile))
+
+
+# Function to read a deadlock detection state from a JSON file
+def readJsonDetectionState(path):
+    with open(path) as jsonFile:
+        return detectionStateFromDict(json.load(jsonFile))
@@ -0,0 +1,259 @@
+# Program Description: Safe-sequence search and cached safety checks for the Banker's Algorithm. The safety check in
+#                      banker_engine.py returns a single safe sequence; this module lists every safe sequence up to a
+#                      limit, finds the safe sequence that follows a priority order, counts the safe sequences, and
+#                      keeps the verdicts of recent checks in a least-recently-used cache.
+#
+#                      The search relies on a property of the safety algorithm: the work vector only grows as
+#                      processes finish, so once a state is safe, every process that can run leads to another safe
+#                      state. A state is therefore checked once with the safety engine before the search, and an
+#                      unsafe state is pruned as a whole. The enumeration moves through the safety engine's wait
+#                      index as processes finish and moves back when it backtracks. When counting, the finished set is
+#                      kept as a bit mask, the work vector is updated incrementally, and the number of completions of
+#                      each finished set is memoized, so states reached through different orders are counted once.
+
+import bisect
+import hashlib
+import itertools
+from array import array
+from collections import OrderedDict
+
+from banker_engine import SafetyEngine, calculateNeed, checkState, toList
+
+# Default number of sequences returned by enumerateSafeSequences
+SEQUENCE_LIMIT = 1000
+
+# Default number of verdicts kept by a SafetyCache
+CACHE_SIZE = 4096
+
+# Number of bytes of the BLAKE2b digest used as the state key
+STATE_KEY_SIZE = 16
+
+
+# Function to convert the state to lists and compute the need matrix
+def prepareState(available, maxm, allot):
+    available = toList(available)
+    maxm = [list(row) for row in toList(maxm)]
+    allot = [list(row) for row in toList(allot)]
+    need = [[0] * len(available) for i in range(len(maxm))]
+    calculateNeed(need, maxm, allot)
+    return available, maxm, need, allot
+
+
+# Function to list the processes that are not finished and can run with the given work vector
+def runnableProcesses(order, finished, need, work):
+    return [i for i in order if not finished >> i & 1 and all(x <= w for x, w in zip(need[i], work))]
+
+
+# Function to check that a priority order lists every process exactly once
+def validatePriority(priority, n):
+    priority = list(priority)
+    if sorted(priority) != list(range(n)):
+        raise ValueError("The priority order should list every process exactly once.")
+    return priority
+
+
+# Function to generate the safe sequences of a state in order, up to limit sequences (None for no limit).
+# Processes are tried lowest index first, or in the given priority order (a list of process indices, highest
+# priority first), so the first sequence generated is the one the safety check or prioritySafeSequence returns.
+# The search walks the safety engine's wait index: finishing a process moves the pointers of the resources it
+# releases and wakes the processes that become runnable, and backtracking moves the pointers back, so each step only
+# touches the processes whose state changes instead of rescanning all of them.
+def enumerateSafeSequences(available, maxm, allot, limit=SEQUENCE_LIMIT, priority=None):
+    engine = SafetyEngine(available, maxm, allot)
+    n = len(engine.need)
+    m = len(engine.available)
+    order = validatePriority(priority, n) if priority is not None else list(range(n))
+    if limit == 0 or not engine.check()[0]:
+        return
+
+    rank = [0] * n
+    for k, i in enumerate(order):
+        rank[i] = k
+    allot = engine.allot
+    waitIndex = engine.waitIndex
+    work = engine.available.copy()
+    blocked = [m] * n
+    position = [0] * m
+
+    # Function to move the pointer of resource j forward, collecting the ranks of the processes that become runnable
+    def advance(j, woken):
+        column = waitIndex[j]
+        end = bisect.bisect_right(column, (work[j], n))
+        for p in range(position[j], end):
+            i = column[p][1]
+            blocked[i] -= 1
+            if blocked[i] == 0:
+                woken.append(rank[i])
+        position[j] = end
+
+    # Ranks of the runnable processes that have not finished, kept sorted
+    woken = list(range(n)) if m == 0 else []
+    for j in range(m):
+        advance(j, woken)
+    runnable = sorted(woken)
+
+    # Depth-first search holding, for every depth, the position of the next runnable process to try and the undo
+    # record of the step taken from it
+    sequence = []
+    tries = [0]
+    steps = []
+    count = 0
+
+    while tries:
+        if len(sequence) == n:
+            yield list(sequence)
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+        k = tries[-1]
+        if len(sequence) == n or k >= len(runnable):
+            # Undo the last step: put the woken processes back to sleep, move the pointers back and return the
+            # finished process to the runnable list
+            tries.pop()
+            if sequence:
+                i = sequence.pop()
+                woken, moved = steps.pop()
+                for r in woken:
+                    del runnable[bisect.bisect_left(runnable, r)]
+                for j, start in reversed(moved):
+                    column = waitIndex[j]
+                    for p in range(position[j] - 1, start - 1, -1):
+                        blocked[column[p][1]] += 1
+                    position[j] = start
+                    work[j] -= allot[i][j]
+                bisect.insort(runnable, rank[i])
+            continue
+
+        # Finish the next runnable process and wake the processes waiting on the resources it releases
+        tries[-1] = k + 1
+        i = order[runnable.pop(k)]
+        woken = []
+        moved = []
+        for j in range(m):
+            if allot[i][j]:
+                moved.append((j, position[j]))
+                work[j] += allot[i][j]
+                advance(j, woken)
+        for r in woken:
+            bisect.insort(runnable, r)
+        sequence.append(i)
+        steps.append((woken, moved))
+        tries.append(0)
+
+
+# Function to find the safe sequence that follows a priority order (a list of process indices, highest priority
+# first): at every step the runnable process with the highest priority is finished. The processes are renumbered in
+# priority order and checked with the safety engine, whose lowest-index-first rule then picks the highest priority.
+# Returns the flag and the sequence, like isSafe.
+def prioritySafeSequence(available, maxm, allot, priority):
+    maxm = toList(maxm)
+    allot = toList(allot)
+    priority = validatePriority(priority, len(maxm))
+    safe, sequence = SafetyEngine(available, [maxm[i] for i in priority], [allot[i] for i in priority]).check()
+    return safe, [priority[i] for i in sequence]
+
+
+# Function to count the safe sequences of a state, stopping at limit (None for no limit).
+# The number of ways to finish the remaining processes depends only on the finished set, since the work vector is
+# the available vector plus the allocations of the finished processes, so it is memoized per finished set. Every
+# finished set reached from a safe state has at least one completion, so once the count of a finished set reaches
+# limit its remaining runnable processes are not explored; its memoized count is then limit.
+def countSafeSequences(available, maxm, allot, limit=None):
+    if limit == 0 or not SafetyEngine(available, maxm, allot).check()[0]:
+        return 0
+    available, maxm, need, allot = prepareState(available, maxm, allot)
+    n = len(need)
+    memo = {(1 << n) - 1: 1}
+
+    # Depth-first traversal of the finished sets reachable from the empty set, holding for every finished set on the
+    # path its work vector, its runnable processes, the position of the next one to try and the count so far
+    stack = [[0, available, runnableProcesses(range(n), 0, need, available), 0, 0]] if n else []
+    while stack:
+        frame = stack[-1]
+        finished, work, runnable, k, total = frame
+        if k == len(runnable) or (limit is not None and total >= limit):
+            stack.pop()
+            memo[finished] = total if limit is None else min(total, limit)
+            if stack:
+                stack[-1][4] += memo[finished]
+            continue
+
+        frame[3] = k + 1
+        i = runnable[k]
+        child = finished | 1 << i
+        if child in memo:
+            frame[4] = total + memo[child]
+            continue
+        childWork = [w + a for w, a in zip(work, allot[i])]
+        stack.append([child, childWork, runnableProcesses(range(n), child, need, childWork), 0, 0])
+
+    return memo[0]
+
+
+# Function to compute a compact key for a state. The dimensions and all values are hashed with BLAKE2b, so two states
+# share a key exactly when their available vectors and maximum and allocation matrices are equal.
+def stateKey(available, maxm, allot):
+    available = toList(available)
+    maxm = toList(maxm)
+    allot = toList(allot)
+    digest = hashlib.blake2b(digest_size=STATE_KEY_SIZE)
+    digest.update(array("q", [len(maxm), len(available)] + [len(row) for row in itertools.chain(maxm, allot)]).tobytes())
+    try:
+        digest.update(array("q", itertools.chain(available, itertools.chain.from_iterable(maxm),
+                                                 itertools.chain.from_iterable(allot))).tobytes())
+    except (OverflowError, TypeError):
+        # Values that do not fit in 64 bits are hashed through their text form
+        digest.update(repr((available, maxm, allot)).encode())
+    return digest.digest()
+
+
+# Function to copy a result dictionary and the lists it holds, such as the safe sequence
+def copyResult(result):
+    return {name: list(value) if isinstance(value, list) else value for name, value in result.items()}
+
+
+# Bounded least-recently-used cache of safety verdicts.
+# check() returns the result of checkState for a state, answering repeated states from the cache. get() and put()
+# take any hashable key, so callers that already hold a compact form of the state (such as a binary record) can use
+# it directly instead of hashing the state again. Results are copied on the way in and out, so a caller that changes
+# a result does not change later hits. The hits and misses counters record how the cache was used.
+class SafetyCache:
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    # Function to return the cached result for a key, or None
+    def get(self, key):
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.results.move_to_end(key)
+        self.hits += 1
+        return copyResult(result)
+
+    # Function to store the result for a key and evict the least recently used results
+    def put(self, key, result):
+        self.results[key] = copyResult(result)
+        self.results.move_to_end(key)
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+    # Function to check a state, using the cached verdict when the same state was checked before
+    def check(self, available, maxm, allot):
+        key = stateKey(available, maxm, allot)
+        result = self.get(key)
+        if result is None:
+            result = checkState(available, maxm, allot)
+            self.put(key, result)
+        return result
+
+    # Function to return the cache counters
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.results)}
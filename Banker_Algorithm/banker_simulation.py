@@ -0,0 +1,373 @@
+# Program Description: Event-driven replay of resource request and release traces against the Banker's Algorithm.
+#                      A trace is read as a stream: its first line is a JSON state with "available", "max" and
+#                      "allocation" entries, and every following line is one event, either as a JSON object such as
+#                      {"time": 12.5, "process": 3, "request": [1, 0, 2]} (or "release") or as a compact CSV line
+#                      time,request,process,v1,...,vm (or release). A missing time is taken as the event's position.
+#                      Malformed event lines are counted as invalid events and skipped, as are events that the
+#                      allocator rejects.
+#
+#                      The state is kept in one ResourceAllocator and updated in place by every event, so nothing is
+#                      rebuilt per event. A request that cannot be granted safely waits in a queue, and every release
+#                      retries the waiting requests oldest first. A process with a waiting request is blocked, so its
+#                      later requests queue behind it. The report gives the number of immediate and delayed grants,
+#                      the distribution of the grant latency in trace time, and the throughput of the replay.
+#
+#                      Most retries cannot succeed, so they are skipped without a safety check. When a request fails
+#                      the safety check, its final work vector is recorded together with, for every resource, the
+#                      smallest needs of the processes blocked on that resource. A release by a process that finished
+#                      in the check leaves its outcome unchanged, and a release by a process that did not finish only
+#                      adds to the final work vector, so the request is retried once the work vector covers one of the
+#                      recorded needs. A grant never makes an unsafe state safe but can change which processes finish,
+#                      so every waiting request is retried at the first release after a grant.
+
+import argparse
+import bisect
+import heapq
+import json
+import math
+import sys
+import time
+from array import array
+from collections import deque
+
+from banker_engine import ResourceAllocator
+from banker_input import stateFromDict
+
+# Percentiles of the grant latency included in the report
+LATENCY_PERCENTILES = (0.5, 0.9, 0.99)
+
+
+# Function to parse one event line into (time, kind, process, vector). The default time is used when the line has
+# none.
+def parseEvent(line, defaultTime):
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            event = json.loads(line)
+            kind = "request" if "request" in event else "release"
+            return float(event.get("time", defaultTime)), kind, int(event["process"]), list(event[kind])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid event: {line}")
+
+    fields = line.split(",")
+    try:
+        kind = fields[1].strip()
+        if kind not in ("request", "release"):
+            raise ValueError
+        eventTime = float(fields[0]) if fields[0].strip() else defaultTime
+        return eventTime, kind, int(fields[2]), [int(value) for value in fields[3:]]
+    except (IndexError, ValueError):
+        raise ValueError(f"Invalid event: {line}")
+
+
+# Function to parse the event lines of a trace, numbered from the start of the trace. A malformed line is yielded as
+# a ValueError that names the line, so that the replay can count it and go on.
+def parseEvents(lines):
+    for index, (lineNumber, line) in enumerate(lines):
+        try:
+            yield parseEvent(line, index)
+        except ValueError as error:
+            yield ValueError(f"{error} (line {lineNumber})")
+
+
+# Function to read a trace from a stream of lines, returning the initial state and an iterator over its events
+def readTrace(lines):
+    lines = ((lineNumber, line) for lineNumber, line in enumerate(lines, start=1) if line.strip())
+    _, header = next(lines, (None, None))
+    if header is None:
+        raise ValueError("Invalid input. The trace is empty.")
+    try:
+        state = stateFromDict(json.loads(header))
+    except json.JSONDecodeError:
+        raise ValueError("Invalid input. The first line of a trace should be a JSON state.")
+    available, maxm, allot = state
+    if len(maxm) != len(allot) or any(len(row) != len(available) for row in maxm + allot):
+        raise ValueError("Invalid input. The maximum and allocation matrices should have one row per process and one "
+                         "value per resource.")
+    return state, parseEvents(lines)
+
+
+# Function to return the value at the given fraction of a sorted list, using the nearest rank
+def percentile(sortedValues, fraction):
+    if not sortedValues:
+        return 0.0
+    return sortedValues[max(0, math.ceil(fraction * len(sortedValues)) - 1)]
+
+
+# Function to return the report percentiles of a sorted list, keyed as p50, p90 and so on
+def percentiles(sortedValues):
+    return {f"p{round(fraction * 100)}": percentile(sortedValues, fraction) for fraction in LATENCY_PERCENTILES}
+
+
+# Replay engine for request and release events.
+# Every blocked process has a queue of (event index, arrival time, request) entries in arrival order, and the heads
+# heap holds an (event index, process) pair for the oldest waiting request of every blocked process. For a blocked
+# process whose oldest request failed the safety check, denials holds the number of grants made before the check, its
+# finish flags and final work vector and, for every resource, the two smallest (need, process) pairs of the processes
+# blocked on that resource. The latencies of delayed grants are kept in a compact array; grants made on arrival only
+# increase a counter, as their latency is 0.
+class TraceSimulator:
+    def __init__(self, available, maxm, allot):
+        self.allocator = ResourceAllocator(available, maxm, allot)
+        self.queues = {}
+        self.heads = []
+        self.denials = {}
+        self.grants = 0
+        self.delays = array("d")
+        self.events = 0
+        self.requests = 0
+        self.releases = 0
+        self.grantedOnArrival = 0
+        self.attempts = 0
+        self.invalid = 0
+        self.firstError = None
+        self.firstTime = None
+        self.lastTime = None
+
+    # Function to record an event that could not be applied
+    def recordInvalid(self, error):
+        self.invalid += 1
+        if self.firstError is None:
+            self.firstError = f"Event {self.events - 1}: {error}"
+
+    # Function to try to grant a request, returning True when it was granted, False when it has to wait and None when
+    # it is invalid
+    def tryGrant(self, i, request):
+        allocator = self.allocator
+        self.attempts += 1
+        try:
+            granted = allocator.requestResources(i, request)[0]
+        except ValueError as error:
+            self.recordInvalid(error)
+            self.denials.pop(i, None)
+            return None
+
+        if granted:
+            self.grants += 1
+            self.denials.pop(i, None)
+        elif all(r <= a for r, a in zip(request, allocator.available)):
+            self.recordDenial(i, request)
+        else:
+            self.denials.pop(i, None)
+        return granted
+
+    # Function to record the outcome of a safety check that request of process i has just failed. After the check,
+    # finish and work show the processes that could not finish and the final work vector. The processes blocked on
+    # resource j are the ones past the work vector in its wait index, where process i is listed with its need before
+    # the request; its need during the check is put in its place.
+    def recordDenial(self, i, request):
+        allocator = self.allocator
+        n = len(allocator.need)
+        work = allocator.work.copy()
+        thresholds = []
+        for j, column in enumerate(allocator.waitIndex):
+            start = bisect.bisect_right(column, (work[j], n))
+            pairs = [pair for pair in column[start:start + 3] if pair[1] != i]
+            need = allocator.need[i][j] - request[j]
+            if need > work[j]:
+                pairs.append((need, i))
+            pairs.sort()
+            thresholds.append(pairs[:2])
+        self.denials[i] = (self.grants, allocator.finish.copy(), work, thresholds)
+
+    # Function to tell whether the oldest waiting request of process i may have become grantable since it was last
+    # tried, given the process that has just released resources and what it released. The recorded work vector is
+    # updated with the release.
+    def mayGrant(self, i, releasing, release):
+        denial = self.denials.get(i)
+        if denial is None or denial[0] != self.grants:
+            return True
+        _, finish, work, thresholds = denial
+        if finish[releasing]:
+            return False
+
+        # The releasing process needs as much more as it has released, so it stays blocked itself
+        for j, amount in enumerate(release):
+            work[j] += amount
+        return any(amount and any(need <= work[j] and k != releasing for need, k in thresholds[j])
+                   for j, amount in enumerate(release))
+
+    # Function to apply a request event
+    def request(self, eventTime, i, request):
+        self.requests += 1
+        entry = (self.events, eventTime, request)
+        if i in self.queues:
+            # The process is blocked on an earlier request
+            self.queues[i].append(entry)
+            return
+        granted = self.tryGrant(i, request)
+        if granted:
+            self.grantedOnArrival += 1
+        elif granted is not None:
+            self.queues[i] = deque([entry])
+            heapq.heappush(self.heads, (self.events, i))
+
+    # Function to apply a release event and retry the waiting requests
+    def release(self, eventTime, i, release):
+        self.releases += 1
+        try:
+            self.allocator.releaseResources(i, release)
+        except ValueError as error:
+            self.recordInvalid(error)
+            return
+        if self.heads and any(release):
+            self.retryWaiting(eventTime, i, release)
+
+    # Function to grant every waiting request that can now be granted after process releasing has released resources,
+    # oldest first. Only the oldest waiting request of a process is tried, so the requests of one process are granted
+    # in order.
+    def retryWaiting(self, eventTime, releasing, release):
+        heads = self.heads
+        stillBlocked = []
+        while heads:
+            head = heapq.heappop(heads)
+            i = head[1]
+            queue = self.queues[i]
+            _, arrival, request = queue[0]
+            if not self.mayGrant(i, releasing, release):
+                stillBlocked.append(head)
+                continue
+            granted = self.tryGrant(i, request)
+            if granted is False:
+                stillBlocked.append(head)
+                continue
+            if granted:
+                self.delays.append(eventTime - arrival)
+
+            # The next request of the process is tried in this pass as well, in its place in arrival order
+            queue.popleft()
+            if queue:
+                heapq.heappush(heads, (queue[0][0], i))
+            else:
+                del self.queues[i]
+
+        # The heads were popped in order, so the ones left form a valid heap
+        self.heads = stillBlocked
+
+    # Function to apply one event
+    def handleEvent(self, eventTime, kind, i, vector):
+        self.events += 1
+        if self.firstTime is None:
+            self.firstTime = eventTime
+        self.lastTime = eventTime
+        if kind == "request":
+            self.request(eventTime, i, vector)
+        else:
+            self.release(eventTime, i, vector)
+
+    # Function to apply every event of an iterator, returning the wall-clock time taken in seconds. A ValueError in
+    # place of an event stands for a malformed line, which is counted as invalid.
+    def run(self, events):
+        start = time.perf_counter()
+        for event in events:
+            if isinstance(event, ValueError):
+                self.events += 1
+                self.recordInvalid(event)
+                continue
+            self.handleEvent(*event)
+        return time.perf_counter() - start
+
+    # Function to summarize the replay. Latency percentiles are taken over all granted requests, counting grants on
+    # arrival as 0, and over the delayed grants alone.
+    def report(self, seconds=None):
+        delays = sorted(self.delays)
+        granted = self.grantedOnArrival + len(delays)
+        allLatencies = _ZeroPaddedList(self.grantedOnArrival, delays)
+        waiting = sum(len(queue) for queue in self.queues.values())
+        span = (self.lastTime - self.firstTime) if self.events else 0.0
+        result = {
+            "events": self.events,
+            "requests": self.requests,
+            "releases": self.releases,
+            "grantedOnArrival": self.grantedOnArrival,
+            "grantedAfterWaiting": len(delays),
+            "stillWaiting": waiting,
+            "invalid": self.invalid,
+            "delayedFraction": (len(delays) + waiting) / self.requests if self.requests else 0.0,
+            "attempts": self.attempts,
+            "latency": percentiles(allLatencies),
+            "delayLatency": percentiles(delays),
+            "meanLatency": sum(delays) / granted if granted else 0.0,
+            "maxLatency": delays[-1] if delays else 0.0,
+            "grantsPerTimeUnit": granted / span if span > 0 else None,
+        }
+        if seconds is not None:
+            result["seconds"] = seconds
+            result["eventsPerSecond"] = self.events / seconds if seconds > 0 else None
+        if self.firstError is not None:
+            result["firstError"] = self.firstError
+        return result
+
+
+# Read-only sequence of a number of zeros followed by a sorted list, so percentiles over all grants can be taken
+# without storing a 0 for every grant made on arrival
+class _ZeroPaddedList:
+    def __init__(self, zeros, values):
+        self.zeros = zeros
+        self.values = values
+
+    def __len__(self):
+        return self.zeros + len(self.values)
+
+    def __getitem__(self, index):
+        return 0.0 if index < self.zeros else self.values[index - self.zeros]
+
+
+# Function to replay a trace given as a stream of lines and return the report
+def simulateTrace(lines):
+    state, events = readTrace(lines)
+    simulator = TraceSimulator(*state)
+    seconds = simulator.run(events)
+    return simulator.report(seconds)
+
+
+# Function to print a report in a readable form
+def printReport(result, outputStream=sys.stdout):
+    print(f"Events: {result['events']} ({result['requests']} requests, {result['releases']} releases, "
+          f"{result['invalid']} invalid)", file=outputStream)
+    print(f"Granted on arrival: {result['grantedOnArrival']}, after waiting: {result['grantedAfterWaiting']}, "
+          f"still waiting: {result['stillWaiting']} ({result['delayedFraction']:.1%} of requests delayed)",
+          file=outputStream)
+    latency = ", ".join(f"{name} {value:g}" for name, value in result["latency"].items())
+    delayLatency = ", ".join(f"{name} {value:g}" for name, value in result["delayLatency"].items())
+    print(f"Grant latency: {latency}, mean {result['meanLatency']:g}, max {result['maxLatency']:g}", file=outputStream)
+    print(f"Latency of delayed grants: {delayLatency}", file=outputStream)
+    if result.get("grantsPerTimeUnit") is not None:
+        print(f"Grants per time unit: {result['grantsPerTimeUnit']:g}", file=outputStream)
+    if result.get("eventsPerSecond") is not None:
+        print(f"Replayed in {result['seconds']:.3f} s ({result['eventsPerSecond']:.0f} events/s, "
+              f"{result['attempts']} grant attempts)", file=outputStream)
+    if "firstError" in result:
+        print(f"First invalid event: {result['firstError']}", file=outputStream)
+
+
+# Function to build the command-line argument parser
+def buildArgumentParser():
+    parser = argparse.ArgumentParser(description="Replay a resource request/release trace against the Banker's Algorithm.")
+    parser.add_argument("trace", help="trace file (JSON state line followed by JSON or CSV events), or - for stdin")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+# Function to replay a trace file and print the report
+def main(argv=None):
+    args = buildArgumentParser().parse_args(argv)
+    try:
+        if args.trace == "-":
+            result = simulateTrace(sys.stdin)
+        else:
+            with open(args.trace) as inputFile:
+                result = simulateTrace(inputFile)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        printReport(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
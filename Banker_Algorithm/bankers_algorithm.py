@@ -18,6 +18,13 @@
 #                      If the system is in an unsafe state, the program will display a message indicating the
 #                      unsafe status.
 #
+#                      The algorithm itself lives in banker_engine.py and the GUI in banker_gui.py, which is only
+#                      imported when the GUI is started. Given command-line arguments, this program instead checks a
+#                      state read from a JSON file or from CSV files, or checks a stream of JSON states from stdin.
+#                      With --detect, the state holds the outstanding requests instead of the maximum claims, and the
+#                      program reports the deadlocked processes and the processes to abort. With --sequences N, every
+#                      safe sequence up to N is listed instead of the first one (see banker_search.py).
+#
 # References Cited: Below are the resources that were utilized to clarify and solve the given problem.
 # 
 #                   1. Operating System Concepts (10th Edition) by Abraham Silberschatz, Peter B. Galvin,
@@ -38,184 +45,129 @@
 #                      the Banker's Algorithm in Python.
 #                      Link: https://stackoverflow.com/questions/47706058/how-to-implement-bankers-algorithm-in-python
 
-import re
-from tkinter import *
-
-
-# Function to find the need of each process
-def calculateNeed(need, maxm, allot):
-    for i in range(len(need)):
-        for j in range(len(need[i])):
-            need[i][j] = maxm[i][j] - allot[i][j]
-
-
-# Function to find whether a process can be allocated resources
-def isSafe(processes, available, maxm, allot):
-    need = [[0] * len(available) for i in range(len(processes))]
-    calculateNeed(need, maxm, allot)
-
-    # Mark all processes as unfinished
-    finish = [False] * len(processes)
-
-    # Initialize the work and the finish arrays
-    work = available.copy()
-
-    # Initialize the safe sequence array
-    safe_sequence = []
-
-    # Find a process which can be allocated resources
-    found = True
-    while found:
-        found = False
-        for i in range(len(processes)):
-            # Check if the process has not finished and its need can be satisfied
-            if not finish[i] and all(need[i][j] <= work[j] for j in range(len(work))):
-                # Allocate resources to the process
-                for j in range(len(work)):
-                    work[j] += allot[i][j]
-
-                # Mark the process as finished
-                finish[i] = True
+import argparse
+import json
+import sys
+
+from banker_engine import checkDeadlock, checkState, describeDeadlock, describeResult, displayInputData
+from banker_search import enumerateSafeSequences
+from banker_input import (detectionStateFromDict, readCsvMatrix, readCsvVector, readJsonDetectionState, readJsonState,
+                          stateFromDict)
+
+# The algorithm functions used to be defined in this module, so they are still available from it
+from banker_engine import calculateNeed, isSafe, validateInput
+
+__all__ = ["calculateNeed", "isSafe", "validateInput", "displayInputData", "checkStream", "main"]
+
+
+# Function to check every JSON state read from a stream, one state per line, writing one JSON result per line.
+# With detect, the states are checked for deadlock instead of safety.
+def checkStream(inputStream, outputStream, detect=False):
+    for line in inputStream:
+        if not line.strip():
+            continue
+        try:
+            if detect:
+                result = checkDeadlock(*detectionStateFromDict(json.loads(line)))
+            else:
+                result = checkState(*stateFromDict(json.loads(line)))
+        except ValueError as error:
+            result = {"error": str(error)}
+        outputStream.write(json.dumps(result) + "\n")
+        outputStream.flush()
+
+
+# Function to build the command-line argument parser
+def buildArgumentParser():
+    parser = argparse.ArgumentParser(description="Banker's Algorithm safety check. Run without arguments to start "
+                                                 "the graphical user interface.")
+    parser.add_argument("--gui", action="store_true", help="start the graphical user interface")
+    parser.add_argument("--state", metavar="FILE", help="JSON file with \"available\", \"max\" and \"allocation\" entries")
+    parser.add_argument("--available", metavar="FILE", help="CSV file with one row of available resources")
+    parser.add_argument("--max", metavar="FILE", help="CSV file with the maximum resource allocation matrix")
+    parser.add_argument("--allocation", metavar="FILE", help="CSV file with the current resource allocation matrix")
+    parser.add_argument("--request", metavar="FILE", help="CSV file with the outstanding request matrix (with --detect)")
+    parser.add_argument("--detect", action="store_true",
+                        help="detect deadlock from the outstanding requests instead of checking safety")
+    parser.add_argument("--sequences", type=int, metavar="N", help="list up to N safe sequences instead of one")
+    parser.add_argument("--stream", action="store_true", help="check one JSON state per line from stdin")
+    parser.add_argument("--verbose", action="store_true", help="also print the input data")
+    return parser
+
+
+# Function to run the program. Exits with 0 for a safe state, 1 for an unsafe state and 2 for invalid input.
+# With --detect, exits with 0 when no process is deadlocked and 1 when some are.
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    args = buildArgumentParser().parse_args(argv)
+
+    if args.gui or not argv:
+        from banker_gui import runGui
+        runGui()
+        return 0
+
+    if args.stream:
+        checkStream(sys.stdin, sys.stdout, args.detect)
+        return 0
+
+    if args.detect:
+        return detectMain(args)
 
-                # Add the process to the safe sequence
-                safe_sequence.append(i)
-
-                found = True
-                break # Exit the loop after finding a process that can be allocated resources
-
-    # If all processes are finished, the system is in a safe state
-    if all(finish):
-        return True, safe_sequence
-    else:
-        return False, []
-
-
-# Function to display the input data in a table format
-def displayInputData(available, maxm, allot):
-    output_text = "\nInput Data:\n\n"
-    output_text += "Available Resources: " + ", ".join([f"{x}" for x in available]) + "\n\n"
-    output_text += "Process\tMaximum\tAllocation\n"
-    for i in range(len(maxm)):
-        output_text += f"P{i}\t"
-        output_text += "[" + ", ".join([f"{x}" for x in maxm[i]]) + "]" + "\t"
-        output_text += "[" + ", ".join([f"{x}" for x in allot[i]]) + "]" + "\n"
-    output_text += "\n"
-
-    return output_text
-
-
-# Function to check whether the input values are valid
-def validateInput(input_string):
-    if not input_string:
-        return False
-
-    # Check if input is valid matrix of integers
     try:
-        rows = input_string.strip().split('\n')
-        for row in rows:
-            values = [int(x) for x in row.strip().split(',')]
-    except ValueError:
-        return False
-
-    return True
-
-def checkSafety():
-    # Get the input values
-    num_processes = num_processes_spinner.get()
-    num_resources = num_resources_spinner.get()
-
-    if not num_processes or not num_resources:
-        output_label.configure(text="Please enter the number of processes and resources.")
-        return
-
-    num_processes = int(num_processes)
-    num_resources = int(num_resources)
-
-    if num_resources > len(available_spinners):
-        num_resources = len(available_spinners)
-
-    available = [int(available_spinners[i].get().strip()) for i in range(num_resources)]  # Update the available array here
-    maxm = [[int(x) for x in row.split(",")] for row in maxm_text.get("1.0", "end-1c").split("\n")]
-    allot = [[int(x) for x in row.split(",")] for row in allot_text.get("1.0", "end-1c").split("\n")]
-
-    # Check if the inputs are valid
-    if not all([num_processes > 0, num_resources > 0] + [validateInput(x.get()) for x in available_spinners] + [validateInput(maxm_text.get("1.0", "end-1c")), validateInput(allot_text.get("1.0", "end-1c"))]):
-        output_label.configure(text="Invalid input.")
-        return
-
-    # Check if there are any negative values in the input matrices
-    if any(any(x < 0 for x in row) for row in maxm + allot + [available]):
-        output_label.configure(text="Invalid input. Matrix values should not be negative.")
-        return
-
-    # Check if there are any values in the input matrices that exceed the maximum resource value
-    if any(any(x > 10 for x in row) for row in maxm + allot + [available]):
-        output_label.configure(text="Invalid input. Matrix values should not exceed 10.")
-        return
-
-    # Check if the number of resources requested by a process exceeds the maximum resources available
-    if any(any(x > available[i] for i, x in enumerate(row)) for row in allot):
-        output_label.configure(text="Invalid input. The number of resources requested by a process exceeds the maximum resources available.")
-        return
-
-    # Run the banker's algorithm
-    safe, sequence = isSafe(list(range(num_processes)), available, maxm, allot)
-
-    # Display the results
-    if safe:
-        output_label.configure(text="The system is in a safe state.\nSafe sequence: " + ", ".join([f"P{x}" for x in sequence]))
-    else:
-        output_label.configure(text="The system is in an unsafe state.")
-
-# Create the main window
-root = Tk()
-root.title("Banker's Algorithm")
-
-# Create the widgets
-num_processes_label = Label(root, text="Number of Processes:")
-num_processes_spinner = Spinbox(root, from_=1, to=10)
-num_resources_label = Label(root, text="Number of Resources:")
-num_resources_spinner = Spinbox(root, from_=1, to=10)
-
-available_label = Label(root, text="Available Resources:")
-available_spinners = []
-for i in range(10):
-    spinner = Spinbox(root, from_=0, to=10)
-    available_spinners.append(spinner)
-
-maxm_label = Label(root, text="Maximum Resource Allocation (one row per process):")
-maxm_text = Text(root, width=50, height=10)
-maxm_scroll = Scrollbar(root, command=maxm_text.yview)
-maxm_text.config(yscrollcommand=maxm_scroll.set)
-
-allot_label = Label(root, text="Current Resource Allocation (one row per process):")
-allot_text = Text(root, width=50, height=10)
-allot_scroll = Scrollbar(root, command=allot_text.yview)
-allot_text.config(yscrollcommand=allot_scroll.set)
-
-check_button = Button(root, text="Check Safety", command=checkSafety)
-output_label = Label(root, text="")
-
-# Add the widgets to the window
-num_processes_label.grid(row=0, column=0, padx=5, pady=5, sticky=W)
-num_processes_spinner.grid(row=0, column=1, padx=5, pady=5, sticky=W)
-num_resources_label.grid(row=1, column=0, padx=5, pady=5, sticky=W)
-num_resources_spinner.grid(row=1, column=1, padx=5, pady=5, sticky=W)
-
-available_label.grid(row=2, column=0, padx=5, pady=5, sticky=W)
-for i in range(10):
-    available_spinners[i].grid(row=2, column=i+1, padx=5, pady=5, sticky=W)
-
-maxm_label.grid(row=3, column=0, padx=5, pady=5, sticky=W)
-maxm_text.grid(row=3, column=1, columnspan=10, padx=5, pady=5, sticky=W)
-maxm_scroll.grid(row=3, column=11, sticky=N+S+W)
-
-allot_label.grid(row=4, column=0, padx=5, pady=5, sticky=W)
-allot_text.grid(row=4, column=1, columnspan=10, padx=5, pady=5, sticky=W)
-allot_scroll.grid(row=4, column=11, sticky=N+S+W)
-
-check_button.grid(row=5, column=0, padx=5, pady=5, sticky=W)
-output_label.grid(row=5, column=1, padx=5, pady=5, sticky=W)
-
-# Start the main event loop
-root.mainloop()
\ No newline at end of file
+        if args.state:
+            available, maxm, allot = readJsonState(args.state)
+        elif args.available and args.max and args.allocation:
+            available, maxm, allot = readCsvVector(args.available), readCsvMatrix(args.max), readCsvMatrix(args.allocation)
+        else:
+            print("Please give either --state or all of --available, --max and --allocation.", file=sys.stderr)
+            return 2
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    if args.verbose:
+        print(displayInputData(available, maxm, allot))
+
+    result = checkState(available, maxm, allot)
+    if "error" in result:
+        print(result["error"], file=sys.stderr)
+        return 2
+
+    print(describeResult(result["safe"], result["sequence"]))
+    if result["safe"] and args.sequences:
+        sequences = list(enumerateSafeSequences(available, maxm, allot, args.sequences))
+        print(f"Safe sequences found: {len(sequences)}")
+        for sequence in sequences:
+            print(", ".join([f"P{x}" for x in sequence]))
+    return 0 if result["safe"] else 1
+
+
+# Function to run deadlock detection on a state read from a JSON file or from CSV files
+def detectMain(args):
+    try:
+        if args.state:
+            available, request, allot = readJsonDetectionState(args.state)
+        elif args.available and args.request and args.allocation:
+            available, request, allot = readCsvVector(args.available), readCsvMatrix(args.request), readCsvMatrix(args.allocation)
+        else:
+            print("Please give either --state or all of --available, --request and --allocation.", file=sys.stderr)
+            return 2
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    if args.verbose:
+        print(displayInputData(available, request, allot, maxLabel="Request"))
+
+    result = checkDeadlock(available, request, allot)
+    if "error" in result:
+        print(result["error"], file=sys.stderr)
+        return 2
+
+    print(describeDeadlock(result["deadlocked"], result["victims"]))
+    return 1 if result["deadlocked"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
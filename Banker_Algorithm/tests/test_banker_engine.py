@@ -0,0 +1,190 @@
+# Program Description: Tests for the Banker's Algorithm engine. The safety engine and the NumPy check are compared
+#                      with the original rescanning safety algorithm on random states, and the allocator and deadlock
+#                      detector are checked on small states whose outcome is known.
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from banker_engine import DeadlockDetector, ResourceAllocator, SafetyEngine, isSafe, isSafeArray, np  # noqa: E402
+
+# The textbook state, whose lowest-index-first safe sequence is [1, 3, 0, 2, 4]
+AVAILABLE = [3, 3, 2]
+MAXIMUM = [[7, 5, 3], [3, 2, 2], [9, 0, 2], [2, 2, 2], [4, 3, 3]]
+ALLOCATION = [[0, 1, 0], [2, 0, 0], [3, 0, 2], [2, 1, 1], [0, 0, 2]]
+
+
+# Function to run the original safety algorithm, which rescans the processes from P0 after every process it finishes
+def rescanIsSafe(available, maxm, allot):
+    need = [[x - a for x, a in zip(maxRow, allotRow)] for maxRow, allotRow in zip(maxm, allot)]
+    finish = [False] * len(need)
+    work = list(available)
+    sequence = []
+    found = True
+    while found:
+        found = False
+        for i in range(len(need)):
+            if not finish[i] and all(x <= w for x, w in zip(need[i], work)):
+                work = [w + a for w, a in zip(work, allot[i])]
+                finish[i] = True
+                sequence.append(i)
+                found = True
+                break
+    return (True, sequence) if all(finish) else (False, [])
+
+
+# Function to tell whether an order finishes every process, by running it step by step
+def isSafeOrder(order, available, maxm, allot):
+    work = list(available)
+    for i in order:
+        if any(x - a > w for x, a, w in zip(maxm[i], allot[i], work)):
+            return False
+        work = [w + a for w, a in zip(work, allot[i])]
+    return sorted(order) == list(range(len(maxm)))
+
+
+# Function to generate random states, about half of them safe
+def randomStates(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        n = rng.randint(0, 8)
+        m = rng.randint(1, 4)
+        available = [rng.randint(0, 4) for _ in range(m)]
+        allot = [[rng.randint(0, 3) for _ in range(m)] for _ in range(n)]
+        maxm = [[a + rng.randint(0, 5) for a in row] for row in allot]
+        yield available, maxm, allot
+
+
+# Function to check that the safety engine gives the same flag and sequence as the original algorithm
+def testSafetyEngineMatchesRescan():
+    for state in randomStates(500):
+        assert SafetyEngine(*state).check() == rescanIsSafe(*state)
+        assert isSafe(range(len(state[1])), *state) == rescanIsSafe(*state)
+
+
+# Function to check that the NumPy check agrees with the original algorithm and returns a valid safe sequence
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+def testSafeArrayMatchesRescan():
+    for available, maxm, allot in randomStates(500):
+        m = len(available)
+        safe, sequence = isSafeArray(np.array(available), np.array(maxm).reshape(-1, m), np.array(allot).reshape(-1, m))
+        assert safe == rescanIsSafe(available, maxm, allot)[0]
+        if safe:
+            assert isSafeOrder(sequence, available, maxm, allot)
+        else:
+            assert sequence == []
+
+
+# Function to check the NumPy check on a chain where every process waits for the one before it, which is finished
+# by the wait-index engine once the vectorized rounds become slow
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+def testSafeArrayChain():
+    n = 200
+    maxm = np.array([[i + 1] for i in range(n)])
+    allot = np.ones((n, 1), dtype=np.int64)
+    assert isSafeArray(np.array([1]), maxm, allot) == (True, list(range(n)))
+    maxm[-1, 0] = n + 2
+    assert isSafeArray(np.array([1]), maxm, allot) == (False, [])
+
+
+# Function to check that a safe request is granted and applied to the state
+def testRequestIsGranted():
+    allocator = ResourceAllocator(AVAILABLE, MAXIMUM, ALLOCATION)
+    assert allocator.requestResources(1, [1, 0, 2]) == (True, [1, 3, 0, 2, 4])
+    assert allocator.available == [2, 3, 0]
+    assert allocator.allot[1] == [3, 0, 2]
+    assert allocator.need[1] == [0, 2, 0]
+
+
+# Function to check that an unsafe request is rolled back, leaving the state and the wait index as they were
+def testUnsafeRequestIsUndone():
+    allocator = ResourceAllocator(AVAILABLE, MAXIMUM, ALLOCATION)
+    assert allocator.requestResources(1, [1, 0, 2])[0]
+    available = list(allocator.available)
+    allot = [list(row) for row in allocator.allot]
+    need = [list(row) for row in allocator.need]
+    waitIndex = [list(column) for column in allocator.waitIndex]
+    assert allocator.requestResources(0, [0, 2, 0]) == (False, [])
+    assert allocator.available == available
+    assert allocator.allot == allot
+    assert allocator.need == need
+    assert allocator.waitIndex == waitIndex
+    assert allocator.check() == (True, [1, 3, 0, 2, 4])
+
+
+# Function to check that a request larger than the available resources waits without changing the state
+def testRequestWaitsForResources():
+    allocator = ResourceAllocator(AVAILABLE, MAXIMUM, ALLOCATION)
+    assert allocator.requestResources(4, [3, 3, 1]) == (False, [])
+    assert allocator.requestResources(0, [4, 0, 0]) == (False, [])
+    assert allocator.available == AVAILABLE
+    assert allocator.allot == ALLOCATION
+
+
+# Function to check that invalid requests and releases are rejected
+def testInvalidRequestsAreRejected():
+    allocator = ResourceAllocator(AVAILABLE, MAXIMUM, ALLOCATION)
+    with pytest.raises(ValueError, match="exceeded its maximum claim"):
+        allocator.requestResources(3, [1, 2, 0])
+    with pytest.raises(ValueError, match="does not exist"):
+        allocator.requestResources(5, [0, 0, 0])
+    with pytest.raises(ValueError, match="Expected 3 resource values"):
+        allocator.requestResources(0, [0, 0])
+    with pytest.raises(ValueError, match="should not be negative"):
+        allocator.releaseResources(0, [0, -1, 0])
+    with pytest.raises(ValueError, match="cannot release more"):
+        allocator.releaseResources(0, [0, 2, 0])
+
+
+# Function to check that a release returns the resources and makes a waiting request grantable
+def testReleaseResources():
+    allocator = ResourceAllocator(AVAILABLE, MAXIMUM, ALLOCATION)
+    assert allocator.requestResources(1, [1, 0, 2])[0]
+    assert allocator.requestResources(0, [0, 2, 0]) == (False, [])
+    allocator.releaseResources(2, [3, 0, 2])
+    assert allocator.available == [5, 3, 2]
+    assert allocator.allot[2] == [0, 0, 0]
+    assert allocator.need[2] == [9, 0, 2]
+    safe, sequence = allocator.requestResources(0, [0, 2, 0])
+    assert safe and isSafeOrder(sequence, allocator.available, allocator.maxm, allocator.allot)
+
+
+# Function to check that the allocator stays consistent with a fresh engine over random requests and releases
+def testAllocatorMatchesFreshEngine():
+    rng = random.Random(1)
+    for available, maxm, allot in randomStates(100, seed=1):
+        allocator = ResourceAllocator(available, maxm, allot)
+        for _ in range(20):
+            if not maxm:
+                break
+            i = rng.randrange(len(maxm))
+            if rng.random() < 0.5:
+                allocator.requestResources(i, [rng.randint(0, x) for x in allocator.need[i]])
+            else:
+                allocator.releaseResources(i, [rng.randint(0, x) for x in allocator.allot[i]])
+            fresh = SafetyEngine(allocator.available, allocator.maxm, allocator.allot)
+            assert allocator.need == fresh.need
+            assert allocator.waitIndex == fresh.waitIndex
+            assert allocator.check() == fresh.check()
+
+
+# Function to check that processes waiting on each other are reported as deadlocked and processes holding nothing
+# are not
+def testDeadlockDetection():
+    detector = DeadlockDetector([0, 0], [[0, 1], [1, 0], [1, 1]], [[1, 0], [0, 1], [0, 0]])
+    assert detector.detect() == [0, 1]
+    assert DeadlockDetector([1, 0], [[0, 1], [1, 0]], [[1, 0], [0, 1]]).detect() == []
+
+
+# Function to check that an aborted victim is never run again by the loop. Once P0 is aborted and P1 finishes, the
+# work vector is [1, 5], which leaves P2 and P3 deadlocked, so both have to be aborted as well.
+def testVictimIsNotFinishedTwice():
+    detector = DeadlockDetector([0, 2], [[1, 0], [1, 3], [2, 2], [2, 3]], [[1, 2], [0, 1], [0, 2], [0, 2]])
+    deadlocked, victims = detector.chooseVictims()
+    assert deadlocked == [0, 1, 2, 3]
+    assert victims == [0, 2, 3]
+    assert detector.work == [1, 9]
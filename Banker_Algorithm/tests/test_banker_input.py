@@ -0,0 +1,39 @@
+# Program Description: Tests for the Banker's Algorithm input readers.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from banker_input import parseMatrix, parseVector  # noqa: E402
+
+
+# Function to check that an empty value at the end, in the middle or at the start of a row is rejected instead of
+# being read as 0, with and without NumPy arrays
+@pytest.mark.parametrize("text, row", [("1,2\n3, ", 2), ("1, ,3\n4,5,6", 1), (" ,1\n2,3", 1), ("1,2\n3,", 2)])
+@pytest.mark.parametrize("asArray", [False, True])
+def testEmptyValueIsRejected(text, row, asArray):
+    with pytest.raises(ValueError, match=f"Row {row} is not"):
+        parseMatrix(text, asArray)
+
+
+# Function to check that blank lines and spaces around values are accepted
+def testBlankLinesAndSpacesAreSkipped():
+    assert parseMatrix("\n1 , 2 \n\n3,4\n") == [[1, 2], [3, 4]]
+    assert parseMatrix("1,2\n3,4", asArray=True).tolist() == [[1, 2], [3, 4]]
+    assert parseVector(" 7,0 ,5") == [7, 0, 5]
+
+
+# Function to check that rows of different widths are reported with their row number
+def testRaggedRowIsRejected():
+    with pytest.raises(ValueError, match="Row 2 has 3 values, expected 2"):
+        parseMatrix("1,2\n3,4,5")
+
+
+# Function to check that values too large for a 64-bit integer are kept as Python integers in lists
+def testLargeValuesFallBackToRowParser():
+    assert parseMatrix(f"{2 ** 70},1") == [[2 ** 70, 1]]
+    with pytest.raises(ValueError, match="64-bit"):
+        parseMatrix(f"{2 ** 70},1", asArray=True)
@@ -0,0 +1,61 @@
+# Program Description: Tests for the safe-sequence search and the cache of safety verdicts.
+
+import os
+import sys
+from itertools import permutations
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from banker_search import SafetyCache, countSafeSequences, enumerateSafeSequences  # noqa: E402
+
+# The textbook state, whose lowest-index-first safe sequence is [1, 3, 0, 2, 4]
+AVAILABLE = [3, 3, 2]
+MAXIMUM = [[7, 5, 3], [3, 2, 2], [9, 0, 2], [2, 2, 2], [4, 3, 3]]
+ALLOCATION = [[0, 1, 0], [2, 0, 0], [3, 0, 2], [2, 1, 1], [0, 0, 2]]
+
+
+# Function to tell whether an order finishes every process, by running it step by step
+def isSafeOrder(order, available, maxm, allot):
+    work = list(available)
+    for i in order:
+        if any(x - a > w for x, a, w in zip(maxm[i], allot[i], work)):
+            return False
+        work = [w + a for w, a in zip(work, allot[i])]
+    return True
+
+
+# Function to check the enumeration and the count against every order of the processes
+def testSequencesMatchBruteForce():
+    expected = [list(order) for order in permutations(range(len(MAXIMUM)))
+                if isSafeOrder(order, AVAILABLE, MAXIMUM, ALLOCATION)]
+    assert list(enumerateSafeSequences(AVAILABLE, MAXIMUM, ALLOCATION, limit=None)) == expected
+    assert countSafeSequences(AVAILABLE, MAXIMUM, ALLOCATION) == len(expected)
+    assert countSafeSequences(AVAILABLE, MAXIMUM, ALLOCATION, limit=3) == 3
+
+
+# Function to check that an unsafe state has no safe sequences
+def testUnsafeStateHasNoSequences():
+    maxm = [row[:] for row in MAXIMUM]
+    maxm[1] = [9, 9, 9]
+    assert list(enumerateSafeSequences([0, 0, 0], maxm, ALLOCATION)) == []
+    assert countSafeSequences([0, 0, 0], maxm, ALLOCATION) == 0
+
+
+# Function to check that a count with a small limit stops early. Forty processes that can run in any order have
+# 40! safe sequences and 2 ** 40 finished sets, so this only returns when the traversal is cut off at the limit.
+def testCountStopsAtLimit():
+    n = 40
+    assert countSafeSequences([1], [[1]] * n, [[0]] * n, limit=10) == 10
+
+
+# Function to check that changing a result returned by the cache does not change later hits
+def testCachedResultIsCopied():
+    cache = SafetyCache()
+    first = cache.check(AVAILABLE, MAXIMUM, ALLOCATION)
+    assert first == {"safe": True, "sequence": [1, 3, 0, 2, 4]}
+    first["sequence"].append(9)
+    second = cache.check(AVAILABLE, MAXIMUM, ALLOCATION)
+    second["sequence"].clear()
+    second["safe"] = False
+    assert cache.check(AVAILABLE, MAXIMUM, ALLOCATION) == {"safe": True, "sequence": [1, 3, 0, 2, 4]}
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 1}
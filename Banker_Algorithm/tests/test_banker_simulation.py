@@ -0,0 +1,44 @@
+# Program Description: Tests for the Banker's Algorithm trace replay.
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from banker_simulation import main, simulateTrace  # noqa: E402
+
+STATE = '{"available": [3, 3], "max": [[2, 2], [3, 3]], "allocation": [[0, 0], [0, 0]]}'
+
+
+# Function to check that malformed lines are counted as invalid and the events after them are still replayed
+def testMalformedLinesAreSkipped():
+    lines = [STATE, "0,request,0,1,1", ",bogus", "", '{"process": 9, "request": [1, 1]}', '{"proc',
+             "2,release,0,1,1", "3,request,1,3,3"]
+    result = simulateTrace(lines)
+    assert result["events"] == 6
+    assert result["requests"] == 3
+    assert result["releases"] == 1
+    assert result["invalid"] == 3
+    assert result["grantedOnArrival"] == 2
+    assert result["firstError"] == "Event 1: Invalid event: ,bogus (line 3)"
+
+
+# Function to check that a request that would leave the state unsafe waits until a release lets it through
+def testRequestWaitsForRelease():
+    lines = [STATE, "0,request,0,2,2", "1,request,1,2,2", "4,release,0,2,2"]
+    result = simulateTrace(lines)
+    assert result["grantedOnArrival"] == 1
+    assert result["grantedAfterWaiting"] == 1
+    assert result["stillWaiting"] == 0
+    assert result["maxLatency"] == 3.0
+
+
+# Function to check that the command line prints a report for a trace with a malformed line
+def testCommandLineReportsMalformedLine(tmp_path, capsys):
+    trace = tmp_path / "trace.csv"
+    trace.write_text("\n".join([STATE, "0,request,0,1,1", ",bogus"]) + "\n")
+    assert main(["--json", str(trace)]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["invalid"] == 1
+    assert result["grantedOnArrival"] == 1
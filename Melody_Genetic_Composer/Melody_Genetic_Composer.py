@@ -94,14 +94,21 @@
 #                   https://www.sciencedirect.com/science/article/pii/S1568494611003757
 
 # Required Libraries.
+import argparse
+import contextlib
+import inspect
+import json
+import os
 import random
+import struct
+import time
 import numpy as np
-from typing import Dict, List, Tuple
-from midiutil import MIDIFile
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import sys
-import fluidsynth
-from fluidsynth import *
 import logging
+from fitness_cache import FitnessCache
+from evolution_control import MUTATION_SCHEDULES, EarlyStopping, get_mutation_schedule
+from selection_operators import SELECTION_OPERATORS, get_selection_operator, tournament_selection
 
 # Constants Declaration
 POPULATION_SIZE: int = 150
@@ -110,9 +117,32 @@ MUTATION_RATE: float = 0.5
 NUM_GENERATIONS: int = 100
 TEMPO: int = 120
 TOURNAMENT_SIZE: int = 3
+NUM_ISLANDS: int = 1
+MIGRATION_INTERVAL: int = 10
+MIGRATION_SIZE: int = 2
+FITNESS_CACHE_SIZE: int = 0
+CHECKPOINT_INTERVAL: int = 10
+ELITE_SIZE: int = 0
+PATIENCE: int = 0
+MUTATION_SCHEDULE: str = 'constant'
+SELECTION: str = 'tournament'
+NUM_BARS: int = 12
+FITNESS_FUNCTION: str = 'default'
+FITNESS_WORKERS: int = 0
+SOUNDFONT_ENVIRONMENT_VARIABLE: str = 'MELODY_SOUNDFONT'
+DEFAULT_SOUNDFONT_PATH: str = "D:/Courses Material/Courses Winter-2023/COMP 3710/Experimental Code/Iterations/20 Synth " \
+                              "Soundfonts/Acid SQ Neutral.sf2"
 NOTES: List[str] = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 OCTAVES: List[int] = [4, 5]
 DURATIONS: List[float] = [0.25, 0.5, 1, 2]
+PITCH_INDEX: Dict[str, int] = {note: index for index, note in enumerate(NOTES)}
+
+# MIDI Export Constants.
+TICKS_PER_BEAT: int = 960
+NOTE_ON: int = 0x90
+NOTE_OFF: int = 0x80
+# MIDI pitch of every (note index, octave) pair for octaves -1 to 9, indexed as MIDI_PITCH_TABLE[note, octave + 1].
+MIDI_PITCH_TABLE: np.ndarray = np.arange(len(NOTES))[:, None] + 12 * np.arange(11)[None, :]
 
 # Chord Progressions List.
 CHORD_PROGRESSIONS: List[List[str]] = [
@@ -126,46 +156,66 @@ PITCH_VARIETY_WEIGHT: float = 0.3
 NOTE_OCTAVE_WEIGHT: float = 0.2
 
 
+# Rules for chord movement, mapping each chord to the list of chords that may follow it.
+CHORD_RULES: Dict[str, List[str]] = {
+    'C': ['F', 'G', 'Am', 'Em'],
+    'G': ['C', 'D', 'Em', 'Am'],
+    'D': ['G', 'A', 'Bm', 'F#m'],
+    'A': ['D', 'E', 'F#m', 'C#m'],
+    'E': ['A', 'B', 'C#m', 'G#m'],
+    'B': ['E', 'F#', 'G#m', 'D#m'],
+    'F#': ['B', 'C#', 'D#m', 'A#m'],
+    'C#': ['F#', 'G#', 'A#m', 'Fm'],
+    'G#': ['C#', 'D#', 'Fm', 'Cm'],
+    'D#': ['G#', 'A#', 'Cm', 'Gm'],
+    'A#': ['D#', 'F', 'Gm', 'Dm'],
+    'F': ['A#', 'C', 'Dm', 'Am'],
+    'Am': ['C', 'Dm', 'Em', 'F'],
+    'Em': ['G', 'Am', 'Bm', 'C'],
+    'Bm': ['D', 'Em', 'F#m', 'G'],
+    'F#m': ['A', 'Bm', 'C#m', 'D'],
+    'C#m': ['E', 'F#m', 'G#m', 'A'],
+    'G#m': ['B', 'C#m', 'D#m', 'E'],
+    'D#m': ['F#', 'G#m', 'A#m', 'F#'],
+    'A#m': ['C#', 'D#m', 'Fm', 'G#'],
+    'Fm': ['G#', 'A#m', 'Cm', 'D#'],
+    'Cm': ['D#', 'Fm', 'Gm', 'A#'],
+    'Gm': ['A#', 'Cm', 'Dm', 'F'],
+    'Dm': ['F', 'Gm', 'Am', 'C'],
+}
+
+# Chord Lookup Tables. Chords are numbered with the twelve major chords first, in the order of NOTES, followed by the
+# twelve minor chords, so the major chord built on a note has the same index as the note.
+CHORDS: List[str] = NOTES + [note + 'm' for note in NOTES]
+CHORD_INDEX: Dict[str, int] = {chord: index for index, chord in enumerate(CHORDS)}
+# Pitch classes (root, third, fifth) of every chord, as indices into NOTES. Major thirds are four semitones above the
+# root and minor thirds three.
+CHORD_TRIADS: np.ndarray = (np.arange(len(CHORDS))[:, None] % len(NOTES) +
+                            np.array([[0, 4, 7]] * len(NOTES) + [[0, 3, 7]] * len(NOTES))) % len(NOTES)
+# Probability of moving from each chord (row) to each chord (column), following CHORD_RULES. A chord listed twice in
+# a rule is twice as likely.
+CHORD_TRANSITIONS: np.ndarray = np.zeros((len(CHORDS), len(CHORDS)))
+for _chord, _next_chords in CHORD_RULES.items():
+    for _next_chord in _next_chords:
+        CHORD_TRANSITIONS[CHORD_INDEX[_chord], CHORD_INDEX[_next_chord]] += 1.0 / len(_next_chords)
+del _chord, _next_chords, _next_chord
+# Cumulative transition probabilities used to draw the next chord of many progressions at once.
+CHORD_TRANSITION_CDF: np.ndarray = np.cumsum(CHORD_TRANSITIONS, axis=1)
+CHORD_TRANSITION_CDF[:, -1] = 1.0
+CHORDS_PER_PROGRESSION: int = 4
+
+
 # This function takes in a starting chord and a number of chords as inputs, and returns a list of chords representing
-# a chord progression. The function defines a set of rules for chord movement in a dictionary called rules,
-# which maps each chord to a list of possible next chords. The function then iteratively selects the next chord to
-# add to the progression based on the possible options for the current chord defined in the rules' dictionary,
-# using the random.choice() method to randomly select from the options. The function returns the resulting chord
-# progression as a list.
+# a chord progression. The rules for chord movement are defined in the CHORD_RULES dictionary, which maps each chord
+# to a list of possible next chords. The function iteratively selects the next chord to add to the progression based
+# on the possible options for the current chord defined in the rules' dictionary, using the random.choice() method to
+# randomly select from the options. The function returns the resulting chord progression as a list.
 def generate_chord_progression(starting_chord: str, num_chords: int) -> List[str]:
     chord_progression = [starting_chord]
 
-    # Define a set of rules for chord movement
-    rules = {
-        'C': ['F', 'G', 'Am', 'Em'],
-        'G': ['C', 'D', 'Em', 'Am'],
-        'D': ['G', 'A', 'Bm', 'F#m'],
-        'A': ['D', 'E', 'F#m', 'C#m'],
-        'E': ['A', 'B', 'C#m', 'G#m'],
-        'B': ['E', 'F#', 'G#m', 'D#m'],
-        'F#': ['B', 'C#', 'D#m', 'A#m'],
-        'C#': ['F#', 'G#', 'A#m', 'Fm'],
-        'G#': ['C#', 'D#', 'Fm', 'Cm'],
-        'D#': ['G#', 'A#', 'Cm', 'Gm'],
-        'A#': ['D#', 'F', 'Gm', 'Dm'],
-        'F': ['A#', 'C', 'Dm', 'Am'],
-        'Am': ['C', 'Dm', 'Em', 'F'],
-        'Em': ['G', 'Am', 'Bm', 'C'],
-        'Bm': ['D', 'Em', 'F#m', 'G'],
-        'F#m': ['A', 'Bm', 'C#m', 'D'],
-        'C#m': ['E', 'F#m', 'G#m', 'A'],
-        'G#m': ['B', 'C#m', 'D#m', 'E'],
-        'D#m': ['F#', 'G#m', 'A#m', 'F#'],
-        'A#m': ['C#', 'D#m', 'Fm', 'G#'],
-        'Fm': ['G#', 'A#m', 'Cm', 'D#'],
-        'Cm': ['D#', 'Fm', 'Gm', 'A#'],
-        'Gm': ['A#', 'Cm', 'Dm', 'F'],
-        'Dm': ['F', 'Gm', 'Am', 'C'],
-    }
-
     current_chord = starting_chord
     for _ in range(num_chords - 1):
-        next_chord_options = rules.get(current_chord, NOTES)
+        next_chord_options = CHORD_RULES.get(current_chord, NOTES)
         next_chord = random.choice(next_chord_options)
         chord_progression.append(next_chord)
         current_chord = next_chord
@@ -173,116 +223,134 @@ def generate_chord_progression(starting_chord: str, num_chords: int) -> List[str
     return chord_progression
 
 
-# This function generates an individual which consists of a chord progression and a corresponding melody. The chord
-# progression is generated by randomly selecting a starting chord and then using a set of rules to generate a chord
-# progression. The chord progression is then repeated until there are enough chords to match the desired length of
-# the individual. The melody is generated by iterating over the chord progression and randomly selecting notes,
-# durations, and velocities based on the chord being played. The function returns a dictionary containing the notes,
-# durations, and velocities of the melody.
-def generate_individual() -> Dict[str, List[Tuple[str, int]]]:
-    # Choose a random starting chord
-    starting_chord = random.choice(NOTES)
-
-    # Generate a chord progression
-    num_chords = 4
-    chord_progression = generate_chord_progression(starting_chord, num_chords)
-
-    # Repeat the chord progression until there are enough chords to match INDIVIDUAL_LENGTH
-    chord_progression = chord_progression * ((INDIVIDUAL_LENGTH + len(chord_progression) - 1) // len(chord_progression))
-    chord_progression = chord_progression[:INDIVIDUAL_LENGTH]
-
-    notes: List[Tuple[str, int]] = []
-    durations: List[float] = []
-    velocities: List[int] = []
-
-    # Iterate over the chord progression and generate notes, durations, and velocities
-    for chord in chord_progression:
-        if chord[-1] == 'm':
-            root = chord[:-1]
-            third = NOTES[(NOTES.index(root) + 2) % 7]
-        else:
-            root = chord
-            third = NOTES[(NOTES.index(root) + 4) % len(NOTES)]
-        fifth = NOTES[(NOTES.index(root) + 7) % len(NOTES)]
-        note = np.random.choice([root, third, fifth])
+# This function is the batched form of generate_chord_progression(). It draws num_progressions chord progressions at
+# once as a matrix of indices into CHORDS: the starting chords are drawn from the major chords, and every following
+# column is drawn from the CHORD_TRANSITIONS rows of the previous column by inverse transform sampling.
+def generate_chord_progressions(num_progressions: int, num_chords: int, rng=np.random) -> np.ndarray:
+    """
+    Generate many chord progressions as a matrix of chord indices
+    """
+    progressions = np.empty((num_progressions, num_chords), dtype=np.int64)
+    if num_chords == 0:
+        return progressions
+    progressions[:, 0] = rng.choice(len(NOTES), size=num_progressions)
+    for column in range(1, num_chords):
+        draws = rng.random(num_progressions)
+        cdf = CHORD_TRANSITION_CDF[progressions[:, column - 1]]
+        progressions[:, column] = np.count_nonzero(cdf <= draws[:, None], axis=1)
+    return progressions
 
-        notes.append((note, np.random.choice(OCTAVES)))
-        durations.append(np.random.choice(DURATIONS))
-        velocities.append(np.random.randint(70, 100))
 
-    # Return an individual with a subset of notes, durations, and velocities
-    return {'notes': notes[:INDIVIDUAL_LENGTH], 'durations': durations[:INDIVIDUAL_LENGTH], 'velocities': velocities[:INDIVIDUAL_LENGTH]}
+# The Individual class is the compact representation of one melody. Instead of a dictionary of lists holding a
+# (note name, octave) tuple per note, it keeps four packed NumPy arrays: the pitch as the index of the note in the
+# NOTES list, the octave, the duration in beats and the velocity. The class uses __slots__, so an individual is five
+# small objects regardless of its length, and crossover and mutation work directly on the array buffers. The field
+# names match the population arrays, so an individual converts to and from a row of the population without copying
+# per note. The (note name, octave) form is only built by to_dict() when the melody is exported to MIDI.
+class Individual:
+    __slots__ = ('pitches', 'octaves', 'durations', 'velocities')
 
+    def __init__(self, pitches: np.ndarray, octaves: np.ndarray, durations: np.ndarray, velocities: np.ndarray):
+        self.pitches = np.asarray(pitches, dtype=np.int8)
+        self.octaves = np.asarray(octaves, dtype=np.int8)
+        self.durations = np.asarray(durations, dtype=np.float32)
+        self.velocities = np.asarray(velocities, dtype=np.uint8)
 
-# This function generates a random individual, which is a dictionary that contains three lists: notes, durations,
-# and velocities. The individual is generated based on a randomly chosen starting chord, and a chord progression is
-# generated using the function generate_chord_progression(). The chord progression is repeated until it has a length
-# equal to the INDIVIDUAL_LENGTH constant.
-#
-# The individual is then created by iterating over the chord progression and generating a random note, duration,
-# and velocity for each chord. The notes are generated by selecting a root, third, and fifth note based on the chord
-# type, and then selecting one of these notes at random. The duration and velocity of each note are also randomly
-# selected.
-#
-# Finally, the individual is returned as a dictionary with the notes, durations, and velocities lists truncated to
-# length INDIVIDUAL_LENGTH.
-def fitness(individual: Dict[str, List[Tuple[str, int]]]) -> float:
-    # Calculate note duration score
-    note_duration_score: int = sum([int(duration) for duration in individual['durations']])
+    def __len__(self) -> int:
+        return len(self.pitches)
 
-    # Calculate pitch variety score
-    pitch_variety_score: int = len(set([note[0] for note in individual['notes']]))
+    def __repr__(self) -> str:
+        return f"Individual({self.to_dict()})"
 
-    # Calculate note octave score
-    note_octave_score: int = len(set([note[1] for note in individual['notes']]))
+    # This method builds an individual from the dictionary form with notes, durations and velocities lists.
+    @classmethod
+    def from_dict(cls, individual: Dict[str, List[Tuple[str, int]]]) -> 'Individual':
+        """
+        Create an individual from its dictionary form
+        """
+        return cls([PITCH_INDEX[note[0]] for note in individual['notes']], [note[1] for note in individual['notes']],
+                   individual['durations'], individual['velocities'])
 
-    # Calculate total fitness score
-    total_fitness_score: float = (NOTE_DURATION_WEIGHT * note_duration_score +
-                                  PITCH_VARIETY_WEIGHT * pitch_variety_score +
-                                  NOTE_OCTAVE_WEIGHT * note_octave_score)
+    # This method builds the dictionary form with (note name, octave) tuples used by generate_midi_file().
+    def to_dict(self) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Convert the individual to its dictionary form for MIDI export
+        """
+        return {
+            'notes': [(NOTES[pitch], octave) for pitch, octave in zip(self.pitches.tolist(), self.octaves.tolist())],
+            'durations': self.durations.tolist(),
+            'velocities': self.velocities.tolist()
+        }
+
+    # This method returns the individual as population arrays holding a single row. The arrays are views of the
+    # individual's buffers, so the batched population functions can be applied to one individual.
+    def as_population(self) -> Dict[str, np.ndarray]:
+        """
+        View the individual as single-row population arrays
+        """
+        return {field: getattr(self, field)[None, :] for field in self.__slots__}
+
+
+# This function generates an individual which consists of a chord progression and a corresponding melody. The chord
+# progression is generated by randomly selecting a starting chord and then using the chord transition table to
+# generate a chord progression. The chord progression is then repeated until there are enough chords to match the
+# desired length of the individual, and every note of the melody is a random tone of the triad of the chord being
+# played, with a random octave, duration and velocity. The individual is drawn by the batched initializer
+# generate_population(), so it follows exactly the same distribution. The function returns an Individual holding the
+# notes, durations, and velocities of the melody.
+def generate_individual(individual_length: int = INDIVIDUAL_LENGTH, rng=np.random) -> Individual:
+    return unpack_individual(generate_population(1, individual_length, rng), 0)
 
-    return total_fitness_score
+
+# This function evaluates the fitness of a single individual. The score combines the total of the whole-beat note
+# durations, the number of distinct pitches and the number of distinct octaves, weighted by NOTE_DURATION_WEIGHT,
+# PITCH_VARIETY_WEIGHT and NOTE_OCTAVE_WEIGHT. The individual is viewed as a one-row population, so it is scored by
+# exactly the same code as the batched fitness_batch().
+def fitness(individual: Individual) -> float:
+    return float(fitness_batch(individual.as_population())[0])
 
 
 # This function performs single-point crossover on two parent individuals to create two children. The function starts
-# by choosing a random crossover point between 1 and INDIVIDUAL_LENGTH. Then, two children are created by
-# concatenating the first part of the notes, durations, and velocities from one parent up to the crossover point with
-# the second part of the notes, durations, and velocities from the other parent starting from the crossover point.
+# by choosing a random crossover point between 1 and the length of the individuals. Then, two children are created by
+# concatenating the first part of the pitch, octave, duration and velocity buffers from one parent up to the
+# crossover point with the second part of the buffers from the other parent starting from the crossover point.
 #
 # The function then returns the two children as a tuple.
-def crossover(parent1: Dict[str, List[Tuple[str, int]]], parent2: Dict[str, List[Tuple[str, int]]]) -> Tuple[Dict[str, List[Tuple[str, int]]], Dict[str, List[Tuple[str, int]]]]:
+def crossover(parent1: Individual, parent2: Individual) -> Tuple[Individual, Individual]:
     """
     Perform single-point crossover on the two parents to create two children
     """
     # Choose a random crossover point
-    crossover_point = np.random.randint(1, INDIVIDUAL_LENGTH)
+    crossover_point = np.random.randint(1, len(parent1))
 
     # Perform crossover
-    child1 = {
-        'notes': parent1['notes'][:crossover_point] + parent2['notes'][crossover_point:],
-        'durations': parent1['durations'][:crossover_point] + parent2['durations'][crossover_point:],
-        'velocities': parent1['velocities'][:crossover_point] + parent2['velocities'][crossover_point:]
-    }
-
-    child2 = {
-        'notes': parent2['notes'][:crossover_point] + parent1['notes'][crossover_point:],
-        'durations': parent2['durations'][:crossover_point] + parent1['durations'][crossover_point:],
-        'velocities': parent2['velocities'][:crossover_point] + parent1['velocities'][crossover_point:]
-    }
+    child1 = Individual(*(np.concatenate((getattr(parent1, field)[:crossover_point], getattr(parent2, field)[crossover_point:]))
+                          for field in Individual.__slots__))
+    child2 = Individual(*(np.concatenate((getattr(parent2, field)[:crossover_point], getattr(parent1, field)[crossover_point:]))
+                          for field in Individual.__slots__))
 
     return child1, child2
 
 
-# This function returns the path to the soundfont file which is required to generate sound using MIDI output. The
-# path to the soundfont file is hard-coded and returned as a string. The path can be modified according to the actual
-# path to the soundfont file on the user's machine.
-def get_soundfont_path() -> str:
+# This function mutates an individual in place. Every note is replaced, with probability mutation_rate, by a random
+# note, octave, duration and velocity. The individual's buffers are mutated directly through its population view.
+def mutate(individual: Individual, mutation_rate: float, rng=np.random) -> None:
+    """
+    Mutate the notes of an individual
+    """
+    mutate_batch(individual.as_population(), mutation_rate, rng)
+
+
+# This function returns the path to the soundfont file which is required to generate sound using MIDI output. A path
+# passed as an argument is used as is; otherwise the path is read from the MELODY_SOUNDFONT environment variable, and
+# DEFAULT_SOUNDFONT_PATH is returned when the variable is not set.
+def get_soundfont_path(soundfont_path: Optional[str] = None) -> str:
     """
     Returns the path to the soundfont file
     """
-    # Replace 'path/to/soundfont.sf2' with the actual path to your soundfont file
-    return "D:/Courses Material/Courses Winter-2023/COMP 3710/Experimental Code/Iterations/20 Synth Soundfonts/Acid " \
-           "SQ Neutral.sf2"
+    if soundfont_path:
+        return soundfont_path
+    return os.environ.get(SOUNDFONT_ENVIRONMENT_VARIABLE, DEFAULT_SOUNDFONT_PATH)
 
 
 # This function takes in a list of notes, durations, and velocities, along with a filename as input. It generates a
@@ -291,11 +359,14 @@ def get_soundfont_path() -> str:
 # over and added to the MIDI file using the addNote() function. The pitch of each note is calculated using the index
 # of the note in the NOTES list, along with the octave number. The velocity of the note is set using the
 # corresponding value in the velocities list, and the duration of the note is set using the corresponding value in
-# the durations list. Finally, the MIDI file is saved using the writeFile() function of the MIDIFile module.
+# the durations list. Finally, the MIDI file is saved using the writeFile() function of the MIDIFile module. MIDIUtil
+# is only imported here, so runs and services that never write through it do not load it.
 def generate_midi_file(notes: List[Tuple[str, int]], durations: List[float], velocities: List[int], filename: str) -> None:
     """
     Generate a MIDI file for a given set of notes, durations, and velocities
     """
+    from midiutil import MIDIFile
+
     # Create a MIDI file
     midi_file = MIDIFile(1)
     midi_file.addTempo(0, 0, TEMPO)
@@ -314,73 +385,607 @@ def generate_midi_file(notes: List[Tuple[str, int]], durations: List[float], vel
         midi_file.writeFile(output_file)
 
 
-# This function generates a list of MIDI events for a given set of notes, durations, and velocities. It uses the
-# NOTES, TEMPO, and OCTAVES constants to calculate the pitch of each note and the start time and duration of each
-# event. The events are represented as tuples of four integers: the time of the event, the MIDI status byte (0x90 for
-# note on, 0x80 for note off), the pitch of the note, and the velocity of the note. The start time and duration are
-# calculated based on the tempo and the duration of each note. The function returns a list of all the MIDI events for
-# the given notes, durations, and velocities.
+# This function generates the MIDI events for arrays of MIDI pitches, durations in beats and velocities. The start time
+# of every note is the cumulative sum of the durations before it, so the timing of the whole melody is computed in one
+# pass. Every note produces a note on event at its start and a note off event at its end, with times in ticks of
+# TICKS_PER_BEAT per beat. The events are returned as an integer array with one (time, status, pitch, velocity) row
+# per event, sorted by time, with note off events before note on events at the same time so repeated notes restart
+# cleanly.
+def generate_midi_event_array(pitches: np.ndarray, durations: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+    """
+    Generate the MIDI events for arrays of pitches, durations, and velocities
+    """
+    pitches = np.asarray(pitches, dtype=np.int64)
+    velocities = np.asarray(velocities, dtype=np.int64)
+    end_times = np.rint(np.cumsum(np.asarray(durations, dtype=np.float64)) * TICKS_PER_BEAT).astype(np.int64)
+    start_times = np.concatenate(([0], end_times[:-1]))
+
+    num_notes = len(pitches)
+    events = np.empty((2 * num_notes, 4), dtype=np.int64)
+    events[:num_notes] = np.column_stack((start_times, np.full(num_notes, NOTE_ON), pitches, velocities))
+    events[num_notes:] = np.column_stack((end_times, np.full(num_notes, NOTE_OFF), pitches, np.zeros(num_notes, dtype=np.int64)))
+
+    order = np.lexsort((events[:, 1], events[:, 0]))
+    return events[order]
+
+
+# This function generates a list of MIDI events for a given set of notes, durations, and velocities. The pitch of
+# each note is looked up in MIDI_PITCH_TABLE from its index in the NOTES list and its octave, and the events are then
+# generated by generate_midi_event_array(). The events are represented as tuples of four integers: the time of the
+# event in ticks, the MIDI status byte (0x90 for note on, 0x80 for note off), the pitch of the note, and the velocity
+# of the note. The function returns a list of all the MIDI events for the given notes, durations, and velocities.
 def generate_midi_events(notes: List[Tuple[str, int]], durations: List[float], velocities: List[int]) -> List[Tuple[int, int, int, int]]:
     """
     Generate the MIDI events for a given set of notes, durations, and velocities
     """
-    events = []
-    time = 0
-    for i in range(len(notes)):
-        pitch = NOTES.index(notes[i][0]) + 12 * (notes[i][1] + 1)
-        start_time = sum(durations[:i]) * 4 * TEMPO
-        duration = durations[i] * 4 * TEMPO
-        volume = velocities[i]
-        events.append((time + start_time, 0x90, pitch, volume))
-        events.append((time + start_time + duration, 0x80, pitch, 0))
-    return events
+    note_indices = np.fromiter((PITCH_INDEX[note[0]] for note in notes), dtype=np.int64, count=len(notes))
+    octaves = np.fromiter((note[1] for note in notes), dtype=np.int64, count=len(notes))
+    events = generate_midi_event_array(MIDI_PITCH_TABLE[note_indices, octaves + 1], durations, velocities)
+    return list(map(tuple, events.tolist()))
 
 
-# This function writes the MIDI events to a file. It takes a list of MIDI events as input and a filename for the
-# output MIDI file. First, it creates a MIDI file object and sets the tempo. Then, it iterates over each MIDI event
-# in the list and adds it to the MIDI file object. Finally, it writes the MIDI file to the output file.
+# This function encodes the MIDI events of one track as the bytes of a track chunk. The time of every event is turned
+# into the delta from the previous event and written as a variable-length quantity. The variable-length quantities of
+# all events are built at once: each delta is split into four 7-bit groups, the leading groups that are not needed are
+# masked out, and the remaining bytes are read out of the event matrix in order. The track starts with the tempo
+# (unless tempo is False, for the later tracks of a multi-track file) and ends with the end of track event.
+def encode_midi_track(events: np.ndarray, channel: int = 0, tempo: bool = True) -> bytes:
+    """
+    Encode MIDI events as a track chunk
+    """
+    events = np.asarray(events, dtype=np.int64).reshape(-1, 4)
+    events = events[np.argsort(events[:, 0], kind='stable')]
+    deltas = np.diff(events[:, 0], prepend=0)
+    if len(deltas) and (deltas.min() < 0 or deltas.max() >= 1 << 28):
+        raise ValueError("MIDI event times must be non-negative and less than 2^28 ticks apart.")
+
+    event_bytes = np.empty((len(events), 7), dtype=np.uint8)
+    event_bytes[:, 0] = ((deltas >> 21) & 0x7F) | 0x80
+    event_bytes[:, 1] = ((deltas >> 14) & 0x7F) | 0x80
+    event_bytes[:, 2] = ((deltas >> 7) & 0x7F) | 0x80
+    event_bytes[:, 3] = deltas & 0x7F
+    event_bytes[:, 4] = (events[:, 1] & 0xF0) | channel
+    event_bytes[:, 5] = events[:, 2] & 0x7F
+    event_bytes[:, 6] = events[:, 3] & 0x7F
+
+    keep = np.ones_like(event_bytes, dtype=bool)
+    keep[:, 0] = deltas >= 1 << 21
+    keep[:, 1] = deltas >= 1 << 14
+    keep[:, 2] = deltas >= 1 << 7
+
+    tempo_event = b'\x00\xff\x51\x03' + (60000000 // TEMPO).to_bytes(3, 'big') if tempo else b''
+    end_of_track = b'\x00\xff\x2f\x00'
+    data = tempo_event + event_bytes[keep].tobytes() + end_of_track
+    return b'MTrk' + struct.pack('>I', len(data)) + data
+
+
+# This function returns the bytes of a standard MIDI file with a single track holding the MIDI events, as generated
+# by generate_midi_events(), without building an intermediate MIDI file object.
+def midi_file_bytes(events: List[Tuple[int, int, int, int]]) -> bytes:
+    """
+    Encode the MIDI events as the bytes of a MIDI file
+    """
+    header = b'MThd' + struct.pack('>IHHH', 6, 0, 1, TICKS_PER_BEAT)
+    return header + encode_midi_track(np.asarray(events))
+
+
+# This function writes the MIDI events to a file. It takes a list (or array) of MIDI events as generated by
+# generate_midi_events() and a filename for the output MIDI file, and writes a standard MIDI file with a single
+# track directly, without building an intermediate MIDI file object.
 def write_midi_file(events: List[Tuple[int, int, int, int]], filename: str) -> None:
     """
     Write the MIDI events to a file
     """
-    midi_file = MIDIFile(1)
-    midi_file.addTempo(0, 0, TEMPO)
-    for event in events:
-        midi_file.addEvent(event[1], 0, event[2], event[3], event[0])
     with open(filename, 'wb') as output_file:
-        midi_file.writeFile(output_file)
+        output_file.write(midi_file_bytes(events))
 
 
 # This function takes in a population of individuals, their fitness scores, and the tournament size. It then performs
 # the tournament selection method where it selects a random subset of individuals (tournament) of size
 # 'tournament_size' from the population. It then selects the best individual from the tournament (with the highest
 # fitness score) and adds it to the selected list. This process is repeated for all individuals in the population,
-# resulting in a list of selected individuals. Finally, the function returns the list of selected individuals.
-def selection(population: List[Dict[str, List[Tuple[str, int]]]], fitness_scores: List[float], tournament_size: int) -> List[Dict[str, List[Tuple[str, int]]]]:
+# resulting in a list of selected individuals. All tournaments are drawn at once by tournament_selection(). Finally,
+# the function returns the list of selected individuals.
+def selection(population: List[Individual], fitness_scores: List[float], tournament_size: int) -> List[Individual]:
     """
     Select individuals from the population using tournament selection
     """
-    selected = []
-    for i in range(len(population)):
-        tournament = np.random.choice(range(len(population)), size=tournament_size, replace=False)
-        tournament_fitness_scores = [fitness_scores[i] for i in tournament]
-        tournament_best_index = tournament_fitness_scores.index(max(tournament_fitness_scores))
-        selected.append(population[tournament[tournament_best_index]])
+    selected = tournament_selection(np.asarray(fitness_scores, dtype=np.float64), len(population), np.random, tournament_size)
+    return [population[i] for i in selected]
+
+
+# The population engine keeps the whole population as one set of contiguous arrays instead of a list of dictionaries.
+# Each field is a two-dimensional array of shape (population size, individual length): 'pitches' holds the index of
+# the note in the NOTES list, 'octaves' the octave number, 'durations' the note length in beats and 'velocities' the
+# MIDI velocity. Fitness, selection, crossover and mutation then run as batched array operations over the whole
+# population, and single individuals are only copied out as an Individual when they are kept, printed or exported.
+# This function packs a list of individuals into the array form used by the population engine. Every individual must
+# have the same length.
+def pack_population(individuals: List[Individual]) -> Dict[str, np.ndarray]:
+    """
+    Pack a list of individuals into population arrays
+    """
+    return {field: np.stack([getattr(individual, field) for individual in individuals]) for field in Individual.__slots__}
+
+
+# This function copies the individual stored at the given row of the population arrays out into an Individual, so
+# that it can be kept as the best individual, printed or exported.
+def unpack_individual(population: Dict[str, np.ndarray], index: int) -> Individual:
+    """
+    Copy one individual out of the population arrays
+    """
+    return Individual(*(population[field][index].copy() for field in Individual.__slots__))
+
+
+# This function counts the number of distinct values in each row of a two-dimensional array. Each row is sorted and
+# the number of positions where the sorted value changes is counted, so the whole array is handled in one pass.
+def count_distinct_per_row(values: np.ndarray) -> np.ndarray:
+    """
+    Count the distinct values in each row of a two-dimensional array
+    """
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0], dtype=np.int64)
+    sorted_values = np.sort(values, axis=1)
+    return 1 + np.count_nonzero(np.diff(sorted_values, axis=1), axis=1)
+
+
+# This function is the batched form of fitness(). It computes the note duration, pitch variety and note octave scores
+# for every individual in the population at once and combines them with the same weights, returning one fitness
+# score per individual.
+def fitness_batch(population: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Evaluate the fitness of every individual in the population arrays
+    """
+    # Calculate note duration score (durations are positive, so flooring matches int())
+    note_duration_score = np.floor(population['durations']).sum(axis=1, dtype=np.float64)
+
+    # Calculate pitch variety score
+    pitch_variety_score = count_distinct_per_row(population['pitches'])
+
+    # Calculate note octave score
+    note_octave_score = count_distinct_per_row(population['octaves'])
+
+    # Calculate total fitness score
+    return (NOTE_DURATION_WEIGHT * note_duration_score +
+            PITCH_VARIETY_WEIGHT * pitch_variety_score +
+            NOTE_OCTAVE_WEIGHT * note_octave_score)
+
+
+# This function is the batched form of selection(). One parent is selected per individual with the named selection
+# operator (see selection_operators.py); tournament selection draws all tournaments as one matrix of population
+# indices and picks the winner of each row with argmax. The function returns the indices of the selected parents
+# rather than copies of the individuals.
+def selection_batch(fitness_scores: np.ndarray, tournament_size: int, rng=np.random, selection: str = SELECTION) -> np.ndarray:
+    """
+    Select parent indices from the population
+    """
+    return get_selection_operator(selection)(fitness_scores, len(fitness_scores), rng, tournament_size)
+
+
+# This function is the batched form of crossover(). The selected parents are paired in order, one crossover point is
+# drawn for every pair, and a mask of the positions before each point is used to build both children of every pair
+# for all fields at once. If the number of parents is odd, the last parent is carried over unchanged. The fields only
+# need to share their length with each other, so the function also crosses over the bass and chord tracks of
+# polyphony.py. The function returns new population arrays holding the children.
+def crossover_batch(population: Dict[str, np.ndarray], parents: np.ndarray, rng=np.random) -> Dict[str, np.ndarray]:
+    """
+    Perform single-point crossover on consecutive pairs of the selected parents
+    """
+    individual_length = next(iter(population.values())).shape[1]
+    num_pairs = len(parents) // 2
+    first_parents = parents[0:2 * num_pairs:2]
+    second_parents = parents[1:2 * num_pairs:2]
+
+    # Choose a random crossover point for every pair
+    crossover_points = 1 + rng.choice(max(individual_length - 1, 1), size=num_pairs)
+    mask = np.arange(individual_length) < crossover_points[:, None]
+
+    # Perform crossover
+    children = {}
+    for field, values in population.items():
+        first = values[first_parents]
+        second = values[second_parents]
+        field_children = np.empty((len(parents),) + values.shape[1:], dtype=values.dtype)
+        field_children[0:2 * num_pairs:2] = np.where(mask, first, second)
+        field_children[1:2 * num_pairs:2] = np.where(mask, second, first)
+        if len(parents) % 2:
+            field_children[-1] = values[parents[-1]]
+        children[field] = field_children
+
+    return children
+
+
+# This function is the batched form of the per-gene mutation. A mask of the genes to mutate is drawn for the whole
+# population at once, and every masked gene is given a new random note, octave, duration and velocity. The
+# population arrays are modified in place.
+def mutate_batch(population: Dict[str, np.ndarray], mutation_rate: float, rng=np.random) -> None:
+    """
+    Mutate the genes of every individual in the population arrays
+    """
+    mask = rng.random(population['pitches'].shape) < mutation_rate
+    num_mutations = np.count_nonzero(mask)
+    population['pitches'][mask] = rng.choice(len(NOTES), size=num_mutations)
+    population['octaves'][mask] = rng.choice(OCTAVES, size=num_mutations)
+    population['durations'][mask] = rng.choice(DURATIONS, size=num_mutations)
+    population['velocities'][mask] = 70 + rng.choice(30, size=num_mutations)
+
+
+# This function returns the indices of the elite_size fittest individuals, fittest first. Ties are broken by the
+# position in the population so the choice is deterministic.
+def select_elite(fitness_scores: np.ndarray, elite_size: int) -> np.ndarray:
+    """
+    Return the indices of the fittest individuals
+    """
+    if elite_size > len(fitness_scores):
+        raise ValueError("The number of elite individuals cannot be larger than the population size.")
+    return np.argsort(-fitness_scores, kind='stable')[:elite_size]
+
+
+# This function implements elitism. The elite_size fittest individuals of the population are copied unchanged over
+# the first children, so the best genomes found so far survive selection, crossover and mutation. The children are
+# modified in place.
+def apply_elitism(children: Dict[str, np.ndarray], population: Dict[str, np.ndarray], fitness_scores: np.ndarray, elite_size: int) -> None:
+    """
+    Carry the fittest individuals of the population over to the children unchanged
+    """
+    if elite_size <= 0:
+        return
+    elite = select_elite(fitness_scores, elite_size)
+    for field, values in children.items():
+        values[:elite_size] = population[field][elite]
+
+
+# This function generates an initial population of the given size in the array form used by the population engine.
+# Every individual gets its own chord progression from generate_chord_progressions(), repeated over its length, and
+# the tone of the triad, octave, duration and velocity of every note are drawn for the whole population at once, so
+# no Python code runs per individual or per note. Passing a seeded np.random.Generator as rng makes the population
+# reproducible without touching the global random state.
+def generate_population(population_size: int, individual_length: int = INDIVIDUAL_LENGTH, rng=np.random) -> Dict[str, np.ndarray]:
+    """
+    Generate an initial population as population arrays
+    """
+    shape = (population_size, individual_length)
+    progressions = generate_chord_progressions(population_size, CHORDS_PER_PROGRESSION, rng)
+    chords = progressions[:, np.arange(individual_length) % CHORDS_PER_PROGRESSION]
+    return {
+        'pitches': CHORD_TRIADS[chords, rng.choice(3, size=shape)].astype(np.int8),
+        'octaves': np.asarray(OCTAVES, dtype=np.int8)[rng.choice(len(OCTAVES), size=shape)],
+        'durations': np.asarray(DURATIONS, dtype=np.float32)[rng.choice(len(DURATIONS), size=shape)],
+        'velocities': (70 + rng.choice(30, size=shape)).astype(np.uint8),
+    }
+
+
+# This function produces the next generation from a population and its fitness scores. Parents are chosen with
+# the named selection operator, paired for crossover to create the children, and the children are mutated. The elite_size
+# fittest individuals replace the first children unchanged. The function returns the children as new population
+# arrays.
+def next_generation(population: Dict[str, np.ndarray], fitness_scores: np.ndarray, mutation_rate: float, tournament_size: int, rng=np.random,
+                    elite_size: int = ELITE_SIZE, selection: str = SELECTION) -> Dict[str, np.ndarray]:
+    """
+    Create the next generation from the population using selection, crossover and mutation
+    """
+    parents = selection_batch(fitness_scores, tournament_size, rng, selection)
+    children = crossover_batch(population, parents, rng)
+    mutate_batch(children, mutation_rate, rng)
+    apply_elitism(children, population, fitness_scores, elite_size)
+    return children
+
+
+# The function compose is the library entry point of the genetic algorithm music composer. It runs the genetic
+# algorithm with the given parameters without prompting, either on a single population or, when num_islands is more
+# than one, with the island model. Passing a seed seeds the random number generators so the run can be reproduced.
+# A positive fitness_cache_size memoizes the fitness of up to that many recently seen genomes, so duplicate genomes
+# are not evaluated again. When render_dir is given in a single-population run, the best individual of every
+# generation is written to a MIDI file there by a background render worker, and with synthesize it is also rendered
+# to audio using the soundfont at soundfont_path (see get_soundfont_path()). When checkpoint_path is given in a
+# single-population run, the state of the run is saved there every checkpoint_interval generations and after the
+# last one, and with resume an existing checkpoint is loaded and the run continues from it exactly. Every function
+# in callbacks is called after each generation of a single-population run with its GenerationMetrics (phase timings,
+# fitness, diversity and evaluation counts, see metrics.py), and metrics_path also writes them to a CSV file (.csv)
+# or a JSON Lines file (any other extension).
+# Individuals are scored by the fitness function described by fitness_function, either the name of a registered
+# batched scorer or a weighted combination such as "chord_tones=2,interval_smoothness=1" (see fitness_functions.py).
+# With a positive fitness_workers in a single-population run, the population is scored in chunks across that many
+# worker processes, or threads when fitness_executor is 'thread'.
+# Parents are chosen with the named selection operator: tournament (of tournament_size individuals), rank, sus
+# (stochastic universal sampling) or truncation (see selection_operators.py).
+# The elite_size fittest individuals of every generation are carried over to the next one unchanged. The mutation
+# rate of every generation is taken from the named mutation_schedule (see evolution_control.py), starting from
+# mutation_rate. A single-population run stops early once its best fitness has not improved for patience generations
+# (0 never stops on a stall) or once it reaches target_fitness.
+# With polyphonic, melody, bass and chord tracks are evolved together over a shared chord progression of num_bars
+# bars and written to one multi-track MIDI file by compose_polyphonic() (see polyphony.py); such a run uses the
+# population, generation, mutation, tournament, seed, output, elitism and selection options, and returns the tracks
+# of the best individual instead of an Individual. Options that only apply to single-population runs raise a
+# ValueError when combined with the island model or a polyphonic run, instead of being ignored.
+# The amount of console output is controlled by verbosity: 0 prints nothing, 1 prints the best fitness of each
+# generation and the output file, 2 also prints the best individual of each generation, and 3 also dumps the whole
+# population every generation. Finally, a MIDI file is generated for the best individual in output_dir, named after
+# the given name and the fitness score of the individual. The function returns the best individual, its fitness and
+# the path of the MIDI file; when output_dir is None no file is written and the bytes of the MIDI file are returned
+# instead of its path.
+def compose(population_size: int = POPULATION_SIZE, individual_length: int = INDIVIDUAL_LENGTH,
+            mutation_rate: float = MUTATION_RATE, num_generations: int = NUM_GENERATIONS,
+            tournament_size: int = TOURNAMENT_SIZE, seed: Optional[int] = None, output_dir: Optional[str] = '.',
+            name: str = 'best_individual', num_islands: int = NUM_ISLANDS,
+            migration_interval: int = MIGRATION_INTERVAL, fitness_cache_size: int = FITNESS_CACHE_SIZE,
+            render_dir: Optional[str] = None, synthesize: bool = False, soundfont_path: Optional[str] = None,
+            checkpoint_path: Optional[str] = None, checkpoint_interval: int = CHECKPOINT_INTERVAL,
+            resume: bool = False, callbacks: Optional[List[Callable[..., None]]] = None,
+            metrics_path: Optional[str] = None, elite_size: int = ELITE_SIZE, patience: int = PATIENCE,
+            target_fitness: Optional[float] = None, mutation_schedule: str = MUTATION_SCHEDULE,
+            fitness_function: str = FITNESS_FUNCTION, fitness_workers: int = FITNESS_WORKERS,
+            fitness_executor: str = 'process', selection: str = SELECTION, polyphonic: bool = False,
+            num_bars: int = NUM_BARS, verbosity: int = 1) -> Tuple[Individual, float, Union[str, bytes]]:
+    """
+    Run the genetic algorithm without prompting and export the best individual to a MIDI file
+    """
+    if polyphonic or num_islands > 1:
+        # Options given a value other than their default that the island model and polyphonic runs do not support
+        unsupported = {
+            'checkpoint_path': checkpoint_path is not None, 'resume': resume, 'render_dir': render_dir is not None,
+            'metrics_path': metrics_path is not None, 'callbacks': bool(callbacks), 'patience': patience != PATIENCE,
+            'target_fitness': target_fitness is not None, 'mutation_schedule': mutation_schedule != MUTATION_SCHEDULE,
+            'fitness_workers': fitness_workers != FITNESS_WORKERS,
+        }
+        if polyphonic:
+            unsupported.update({
+                'num_islands': num_islands > 1, 'fitness_function': fitness_function != FITNESS_FUNCTION,
+                'fitness_cache_size': fitness_cache_size != FITNESS_CACHE_SIZE,
+            })
+        names = [name for name, given in unsupported.items() if given]
+        if names:
+            run = 'Polyphonic runs' if polyphonic else 'Island model runs'
+            raise ValueError(f"{run} do not support {', '.join(names)}; these options only apply to "
+                             f"single-population runs.")
+
+    if polyphonic:
+        from polyphony import compose_polyphonic
+        return compose_polyphonic(population_size, individual_length, mutation_rate, num_generations, tournament_size,
+                                  seed=seed, output_dir=output_dir, name=name, num_bars=num_bars,
+                                  elite_size=elite_size, selection=selection, verbosity=verbosity)
+
+    if num_islands > 1:
+        # Run the island model when more than one island is requested
+        from island_model import run_island_model
+        best_individual, best_fitness = run_island_model(num_islands, population_size, individual_length,
+                                                         mutation_rate, num_generations, tournament_size,
+                                                         migration_interval=migration_interval, seed=seed,
+                                                         fitness_cache_size=fitness_cache_size, elite_size=elite_size,
+                                                         fitness_function=fitness_function, selection=selection,
+                                                         verbosity=verbosity)
+        if verbosity >= 1:
+            print(f"Best Fitness Across Islands = {best_fitness}")
+    else:
+        # Initialize the best individual and fitness
+        best_individual = None
+        best_fitness = float('-inf')
+        start_generation = 0
+        schedule = get_mutation_schedule(mutation_schedule)
+        get_selection_operator(selection)  # Reject an unknown operator before the run starts
+        early_stopping = EarlyStopping(patience, target_fitness)
+
+        if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+            # Continue from the checkpoint, which also restores the random number generator states
+            from checkpoint import load_checkpoint
+            state = load_checkpoint(checkpoint_path)
+            population = state['population']
+            if population['pitches'].shape != (population_size, individual_length):
+                raise ValueError(f"The checkpoint {checkpoint_path} holds a population of shape "
+                                 f"{population['pitches'].shape}, not ({population_size}, {individual_length}).")
+            start_generation = state['generation']
+            best_individual = state['best_individual']
+            best_fitness = state['best_fitness']
+            early_stopping = EarlyStopping(patience, target_fitness, best_fitness=state['stopping_fitness'],
+                                           stalled_generations=state['stalled_generations'])
+            if verbosity >= 1:
+                print(f"Resuming From Generation {start_generation} : Best Fitness = {best_fitness}")
+        else:
+            if seed is not None:
+                random.seed(seed)
+                np.random.seed(seed)
 
-    return selected
+            # Generate initial population
+            population = generate_population(population_size, individual_length)
+            if verbosity >= 3:
+                print("Initial Population :")
+                print([unpack_individual(population, i) for i in range(population_size)])
 
+        # The worker pool, the render thread and the metrics file are released when the run ends, also when a
+        # callback stops it with an exception
+        with contextlib.ExitStack() as resources:
+            from fitness_functions import ParallelFitnessEvaluator, get_fitness_function
+            evaluate = get_fitness_function(fitness_function)
+            fitness_evaluator = None
+            if fitness_workers > 0:
+                fitness_evaluator = ParallelFitnessEvaluator(evaluate, fitness_workers, executor=fitness_executor)
+                resources.callback(fitness_evaluator.close)
+                evaluate = fitness_evaluator.evaluate
+            fitness_cache = FitnessCache(evaluate, fitness_cache_size) if fitness_cache_size > 0 else None
+            render_worker = None
+            if render_dir is not None:
+                from render_pipeline import RenderWorker
+                render_worker = RenderWorker(render_dir,
+                                             soundfont_path=get_soundfont_path(soundfont_path) if synthesize else None)
+                resources.callback(render_worker.close)
+            metric_callbacks = list(callbacks or [])
+            metrics_writer = None
+            if metrics_path is not None:
+                from metrics import open_metrics_writer
+                metrics_writer = open_metrics_writer(metrics_path, start_generation)
+                resources.callback(metrics_writer.close)
+                metric_callbacks.append(metrics_writer)
 
-# The function run_genetic_algorithm is the main function that runs the genetic algorithm for music composition. It
-# prompts the user for input regarding various parameters such as population size, mutation rate, and number of
-# generations. Then, it generates an initial population and evaluates the fitness of each individual. It runs the
-# genetic algorithm for the specified number of generations, where each generation involves selection of parents
-# using tournament selection, crossover to create children, and mutation of children. The best individual of each
-# generation is printed, and the best individual of the entire run is saved. Finally, a MIDI file is generated for
-# the best individual with the filename indicating the fitness score of the individual.
+            # Run the genetic algorithm for num_generations generations
+            for generation in range(start_generation, num_generations):
+                generation_start = time.perf_counter()
+                cache_hits, cache_misses = (fitness_cache.hits, fitness_cache.misses) if fitness_cache is not None else (0, 0)
+
+                # Evaluate fitness of each individual
+                fitness_scores = fitness_cache.evaluate(population) if fitness_cache is not None else evaluate(population)
+                fitness_end = time.perf_counter()
+
+                # Find the best individual in population
+                generation_best_index = int(np.argmax(fitness_scores))
+                generation_best_fitness = float(fitness_scores[generation_best_index])
+
+                # Update global best individual if necessary
+                if generation_best_fitness > best_fitness:
+                    best_individual = unpack_individual(population, generation_best_index)
+                    best_fitness = generation_best_fitness
+
+                if verbosity >= 1:
+                    print(f"Generation {generation} : Best Fitness = {generation_best_fitness}")
+                if verbosity >= 2:
+                    print(f"Best Individual : {best_individual}")
+
+                # Hand the generation's best individual to the render worker, which writes it in the background
+                if render_worker is not None:
+                    render_worker.submit(generation, unpack_individual(population, generation_best_index),
+                                         generation_best_fitness)
+
+                # Check for convergence and choose the mutation rate of this generation
+                stopping_state = (early_stopping.best_fitness, early_stopping.stalled_generations)
+                stop = early_stopping.update(best_fitness)
+                generation_mutation_rate = schedule(mutation_rate, generation, num_generations,
+                                                    early_stopping.stalled_generations)
+
+                # Select parents, crossover them to create children and mutate the children,
+                # carry the elite over unchanged, then replace the population with the children
+                previous_population = population
+                selection_start = crossover_start = mutation_start = time.perf_counter()
+                if not stop:
+                    parents = selection_batch(fitness_scores, tournament_size, selection=selection)
+                    crossover_start = time.perf_counter()
+                    children = crossover_batch(population, parents)
+                    mutation_start = time.perf_counter()
+                    mutate_batch(children, generation_mutation_rate)
+                    apply_elitism(children, population, fitness_scores, elite_size)
+                    population = children
+                mutation_end = time.perf_counter()
+                if verbosity >= 3 and not stop:
+                    print(f"Population After Generation {generation} : ")
+                    print([unpack_individual(population, i) for i in range(population_size)])
+
+                # Save a checkpoint of the population that starts the next generation. A run that stops early saves the
+                # population of this generation with the convergence state from before it, so resuming it repeats the
+                # generation and stops again.
+                if checkpoint_path is not None and (stop or (generation + 1) % checkpoint_interval == 0
+                                                    or generation + 1 == num_generations):
+                    from checkpoint import save_checkpoint
+                    if stop:
+                        save_checkpoint(checkpoint_path, population, generation, best_individual, best_fitness,
+                                        *stopping_state)
+                    else:
+                        save_checkpoint(checkpoint_path, population, generation + 1, best_individual, best_fitness,
+                                        early_stopping.best_fitness, early_stopping.stalled_generations)
+
+                # Report the metrics of the generation
+                if metric_callbacks:
+                    from metrics import GenerationMetrics, population_diversity
+                    generation_end = time.perf_counter()
+                    if fitness_cache is not None:
+                        cache_hits, cache_misses = fitness_cache.hits - cache_hits, fitness_cache.misses - cache_misses
+                    metrics = GenerationMetrics(
+                        generation=generation, best_fitness=generation_best_fitness,
+                        mean_fitness=float(fitness_scores.mean()), diversity=population_diversity(previous_population),
+                        evaluations=cache_misses if fitness_cache is not None else len(fitness_scores),
+                        cache_hits=cache_hits, cache_misses=cache_misses, mutation_rate=generation_mutation_rate,
+                        fitness_seconds=fitness_end - generation_start,
+                        selection_seconds=crossover_start - selection_start,
+                        crossover_seconds=mutation_start - crossover_start,
+                        mutation_seconds=mutation_end - mutation_start,
+                        io_seconds=(selection_start - fitness_end) + (generation_end - mutation_end),
+                        total_seconds=generation_end - generation_start)
+                    for callback in metric_callbacks:
+                        callback(metrics)
+
+                if stop:
+                    if verbosity >= 1:
+                        print(f"Stopping Early After Generation {generation} : {early_stopping.reason}")
+                    break
+
+            # With no generation run, export the best individual of the initial population
+            if best_individual is None:
+                fitness_scores = fitness_cache.evaluate(population) if fitness_cache is not None else evaluate(population)
+                best_index = int(np.argmax(fitness_scores))
+                best_individual = unpack_individual(population, best_index)
+                best_fitness = float(fitness_scores[best_index])
+
+        if render_worker is not None and verbosity >= 1:
+            print(f"Rendered {render_worker.rendered} Generations, Skipped {render_worker.skipped} Unchanged")
+
+        if fitness_cache is not None and verbosity >= 1:
+            print(f"Fitness Cache : {fitness_cache.hits} hits, {fitness_cache.misses} misses")
+
+    # Generate MIDI file for best individual
+    if output_dir is None:
+        export = best_individual.to_dict()
+        return best_individual, best_fitness, midi_file_bytes(generate_midi_events(export['notes'], export['durations'],
+                                                                                   export['velocities']))
+    os.makedirs(output_dir, exist_ok=True)
+    filename = os.path.join(output_dir, f"{name}_fitness_{best_fitness:.2f}.mid")
+    export = best_individual.to_dict()
+    generate_midi_file(export['notes'], export['durations'], export['velocities'], filename)
+    if verbosity >= 1:
+        print(f"MIDI File Written : {filename}")
+
+    return best_individual, best_fitness, filename
+
+
+# This function reads a job file describing many composition runs. The file is either a JSON list of objects or a
+# JSON Lines file with one object per line, and every object holds keyword arguments for compose(). Unknown keys are
+# rejected so that a misspelt parameter does not silently fall back to its default.
+def load_jobs(path: str) -> List[Dict[str, object]]:
+    """
+    Load the composition jobs described in a JSON or JSON Lines file
+    """
+    with open(path) as job_file:
+        text = job_file.read()
+
+    if text.lstrip().startswith('['):
+        jobs = json.loads(text)
+    else:
+        jobs = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    valid_keys = set(inspect.signature(compose).parameters)
+    for index, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            raise ValueError(f"Job {index} in {path} is not an object.")
+        unknown_keys = set(job) - valid_keys
+        if unknown_keys:
+            raise ValueError(f"Job {index} in {path} has unknown parameters: {', '.join(sorted(unknown_keys))}")
+
+    return jobs
+
+
+# This function runs a list of composition jobs back to back without prompting. The defaults are applied to every
+# job first and the job's own parameters override them. Jobs without a name are named after their position in the
+# list so that their MIDI files do not overwrite each other. The function returns the result of compose() for every
+# job.
+def run_jobs(jobs: List[Dict[str, object]], defaults: Optional[Dict[str, object]] = None) -> List[Tuple[Individual, float, str]]:
+    """
+    Run many composition jobs back to back
+    """
+    results = []
+    for index, job in enumerate(jobs):
+        parameters = dict(defaults or {})
+        parameters['name'] = f"job_{index:04d}"
+        parameters.update(job)
+        results.append(compose(**parameters))
+    return results
+
+
+# The function run_genetic_algorithm is the interactive entry point of the genetic algorithm for music composition.
+# It prompts the user for input regarding various parameters such as population size, mutation rate, and number of
+# generations, and then runs compose() with those parameters. The best individual of each generation and the whole
+# population are printed, and a MIDI file is generated for the best individual with the filename indicating the
+# fitness score of the individual.
 def run_genetic_algorithm() -> None:
     # Prompt the user for input
     print("Welcome to the Genetic Algorithm Music Composer!")
     print("Please enter the following parameters:")
+    migration_interval = MIGRATION_INTERVAL
     while True:
         try:
             population_size = int(input(f"Population Size (Current Default {POPULATION_SIZE}) : ") or "100")
@@ -388,68 +993,92 @@ def run_genetic_algorithm() -> None:
             mutation_rate = float(input(f"Mutation Rate (Current Default {MUTATION_RATE}) : ") or "0.5")
             num_generations = int(input(f"Number of Generations (Current Default {NUM_GENERATIONS}) : ") or "100")
             tournament_size = int(input(f"Tournament Size (Current Default {TOURNAMENT_SIZE}) : ") or "3")
+            num_islands = int(input(f"Number of Islands (Current Default {NUM_ISLANDS}) : ") or str(NUM_ISLANDS))
+            if num_islands > 1:
+                migration_interval = int(input(f"Migration Interval (Current Default {MIGRATION_INTERVAL}) : ") or str(MIGRATION_INTERVAL))
+            seed = input("Random Seed (Leave Blank For None) : ")
+            seed = int(seed) if seed else None
             break
         except ValueError:
             print("Invalid input. Please enter an integer for population size, individual length, number of "
-                  "generations, and tournament size, or a float for mutation rate.")
-
-    # Generate initial population
-    population = [generate_individual() for _ in range(population_size)]
-    print("Initial Population :")
-    print(population)
-
-    # Initialize the best individual and fitness
-    best_individual = None
-    best_fitness = -1
-
-    # Run the genetic algorithm for NUM_GENERATIONS generations
-    for generation in range(num_generations):
-        # Evaluate fitness of each individual
-        fitness_scores = [fitness(individual) for individual in population]
-
-        # Find the best individual in population
-        generation_best_index = fitness_scores.index(max(fitness_scores))
-        generation_best_fitness = fitness_scores[generation_best_index]
-        generation_best_individual = population[generation_best_index]
-
-        # Update global best individual if necessary
-        if generation_best_fitness > best_fitness:
-            best_individual = generation_best_individual
-            best_fitness = generation_best_fitness
-
-        print(f"Generation {generation} : Best Fitness = {generation_best_fitness}")
-        print(f"Best Individual : {best_individual}")
-
-        # Select parents for crossover using tournament selection
-        parents = selection(population, fitness_scores, tournament_size)
-
-        # Crossover parents to create children
-        children = []
-        for i in range(0, population_size, 2):
-            child1, child2 = crossover(parents[i], parents[i+1])
-            children.append(child1)
-            children.append(child2)
-
-        # Mutate children
-        for child in children:
-            for i in range(individual_length):
-                if np.random.random() < mutation_rate:
-                    child['notes'][i] = (np.random.choice(NOTES), np.random.choice(OCTAVES))
-                    child['durations'][i] = np.random.choice(DURATIONS)
-                    child['velocities'][i] = np.random.randint(70, 100)
-
-        # Replace population with children
-        population = children
-        print(f"Population After Generation {generation} : ")
-        print(population)
+                  "generations, tournament size, number of islands, migration interval and seed, or a float for "
+                  "mutation rate.")
 
-    # Generate MIDI file for best individual
-    filename = f"best_individual_fitness_{best_fitness:.2f}.mid"
-    generate_midi_file(best_individual['notes'], best_individual['durations'], best_individual['velocities'], filename)
+    compose(population_size, individual_length, mutation_rate, num_generations, tournament_size, seed=seed,
+            num_islands=num_islands, migration_interval=migration_interval, verbosity=3)
+
+
+# This function builds the command-line parser for the non-interactive batch mode.
+def build_argument_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line argument parser
+    """
+    parser = argparse.ArgumentParser(description="Genetic Algorithm Music Composer. Run without arguments to be "
+                                                 "prompted for every parameter.")
+    parser.add_argument('--population-size', type=int, default=POPULATION_SIZE, help="number of individuals per population")
+    parser.add_argument('--individual-length', type=int, default=INDIVIDUAL_LENGTH, help="number of notes per individual")
+    parser.add_argument('--mutation-rate', type=float, default=MUTATION_RATE, help="probability of mutating each note")
+    parser.add_argument('--generations', type=int, default=NUM_GENERATIONS, dest='num_generations', help="number of generations to run")
+    parser.add_argument('--tournament-size', type=int, default=TOURNAMENT_SIZE, help="number of individuals per tournament")
+    parser.add_argument('--selection', choices=sorted(SELECTION_OPERATORS), default=SELECTION,
+                        help="parent selection operator")
+    parser.add_argument('--polyphonic', action='store_true',
+                        help="evolve melody, bass and chord tracks together and write a multi-track MIDI file")
+    parser.add_argument('--bars', type=int, default=NUM_BARS, dest='num_bars',
+                        help="length of the shared chord progression in bars for --polyphonic")
+    parser.add_argument('--elite-size', type=int, default=ELITE_SIZE, help="fittest individuals carried over unchanged each generation")
+    parser.add_argument('--mutation-schedule', choices=sorted(MUTATION_SCHEDULES), default=MUTATION_SCHEDULE,
+                        help="how the mutation rate changes over the run, starting from --mutation-rate")
+    parser.add_argument('--patience', type=int, default=PATIENCE,
+                        help="stop after this many generations without improvement (0 never stops early)")
+    parser.add_argument('--target-fitness', type=float, default=None, help="stop once this fitness is reached")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for reproducible runs")
+    parser.add_argument('--output-dir', default='.', help="directory for the generated MIDI files")
+    parser.add_argument('--islands', type=int, default=NUM_ISLANDS, dest='num_islands', help="number of islands evolved in parallel")
+    parser.add_argument('--migration-interval', type=int, default=MIGRATION_INTERVAL, help="generations between migrations")
+    parser.add_argument('--fitness', dest='fitness_function', default=FITNESS_FUNCTION, metavar='SPEC',
+                        help="fitness function name or weighted combination, e.g. chord_tones=2,interval_smoothness=1")
+    parser.add_argument('--fitness-workers', type=int, default=FITNESS_WORKERS, metavar='N',
+                        help="score the population in chunks across N workers (0 scores it in the main process)")
+    parser.add_argument('--fitness-executor', choices=['process', 'thread'], default='process',
+                        help="use worker processes or threads for --fitness-workers")
+    parser.add_argument('--fitness-cache', type=int, default=FITNESS_CACHE_SIZE, dest='fitness_cache_size', metavar='SIZE',
+                        help="memoize the fitness of up to SIZE recent genomes (0 disables the cache)")
+    parser.add_argument('--render-dir', metavar='DIR', help="write the best individual of every generation to DIR in the background")
+    parser.add_argument('--synthesize', action='store_true', help="also render every generation's best to a WAV file")
+    parser.add_argument('--soundfont', dest='soundfont_path', metavar='FILE',
+                        help=f"soundfont for --synthesize (default: ${SOUNDFONT_ENVIRONMENT_VARIABLE})")
+    parser.add_argument('--checkpoint', dest='checkpoint_path', metavar='FILE', help="save the state of the run to FILE (.npz)")
+    parser.add_argument('--checkpoint-interval', type=int, default=CHECKPOINT_INTERVAL, help="generations between checkpoints")
+    parser.add_argument('--resume', action='store_true', help="continue from the checkpoint file if it exists")
+    parser.add_argument('--metrics', dest='metrics_path', metavar='FILE',
+                        help="write per-generation timings and statistics to FILE (.csv for CSV, otherwise JSON Lines)")
+    parser.add_argument('--jobs', metavar='FILE', help="JSON or JSON Lines file describing many runs; the other options become defaults")
+    parser.add_argument('-v', '--verbose', action='count', default=1, dest='verbosity',
+                        help="print more output (-v best individual, -vv whole population every generation)")
+    parser.add_argument('-q', '--quiet', action='store_const', const=0, dest='verbosity', help="print nothing")
+    return parser
+
+
+# This function is the command-line entry point. Without arguments the user is prompted for every parameter as
+# before; with arguments the composer runs non-interactively, either once or for every job in a job file.
+def main(argv: Optional[List[str]] = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        run_genetic_algorithm()
+        return
+
+    arguments = vars(build_argument_parser().parse_args(argv))
+    job_path = arguments.pop('jobs')
+    if job_path:
+        run_jobs(load_jobs(job_path), arguments)
+    else:
+        compose(**arguments)
 
 
 # The if __name__ == '__main__': block is a standard Python construct that allows the code inside it to only be
 # executed if the script is being run as the main program, rather than being imported as a module. In this case,
-# it is used to call the run_genetic_algorithm() function and run the entire genetic algorithm music composer program.
+# it is used to call the main() function and run the entire genetic algorithm music composer program.
 if __name__ == '__main__':
-    run_genetic_algorithm()
\ No newline at end of file
+    main()
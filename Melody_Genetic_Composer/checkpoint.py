@@ -0,0 +1,101 @@
+# Program Description: Checkpoint and resume support for long runs of the genetic algorithm music composer. A
+#                      checkpoint holds the population arrays, the number of the next generation, the best individual
+#                      and fitness found so far, the convergence state used by early stopping and the adaptive
+#                      mutation schedule, and the state of both the Python random module and NumPy's global
+#                      random generator. Checkpoints are compact .npz files written to a temporary file and moved into
+#                      place with os.replace(), so a crash or pre-emption during a write never leaves a truncated
+#                      checkpoint behind. Because the random states are restored exactly, a resumed run continues
+#                      bit-for-bit as if it had never stopped.
+
+# Required Libraries.
+import os
+import random
+import tempfile
+from typing import Dict, Optional
+import numpy as np
+
+from Melody_Genetic_Composer import Individual
+
+# Version of the checkpoint layout, stored in every checkpoint.
+CHECKPOINT_VERSION: int = 1
+
+
+# This function writes a checkpoint atomically. The arrays are written to a temporary file in the same directory as
+# the checkpoint, flushed to disk, and then moved over the previous checkpoint in one step.
+def save_checkpoint(path: str, population: Dict[str, np.ndarray], generation: int,
+                    best_individual: Optional[Individual], best_fitness: float, stopping_fitness: Optional[float] = None,
+                    stalled_generations: int = 0) -> None:
+    """
+    Write the state of a run to a checkpoint file
+    """
+    python_version, python_state, python_gauss = random.getstate()
+    numpy_name, numpy_keys, numpy_position, numpy_has_gauss, numpy_gauss = np.random.get_state()
+
+    arrays = {
+        'version': np.array(CHECKPOINT_VERSION),
+        'generation': np.array(generation),
+        'best_fitness': np.array(best_fitness, dtype=np.float64),
+        'stopping_fitness': np.array(best_fitness if stopping_fitness is None else stopping_fitness, dtype=np.float64),
+        'stalled_generations': np.array(stalled_generations),
+        'python_random_version': np.array(python_version),
+        'python_random_state': np.array(python_state, dtype=np.uint64),
+        'python_random_gauss': np.array(np.nan if python_gauss is None else python_gauss, dtype=np.float64),
+        'numpy_random_keys': numpy_keys,
+        'numpy_random_position': np.array(numpy_position),
+        'numpy_random_has_gauss': np.array(numpy_has_gauss),
+        'numpy_random_gauss': np.array(numpy_gauss, dtype=np.float64),
+    }
+    for field, values in population.items():
+        arrays['population_' + field] = values
+    if best_individual is not None:
+        for field in Individual.__slots__:
+            arrays['best_' + field] = getattr(best_individual, field)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(prefix='.checkpoint-', suffix='.npz', dir=directory)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as checkpoint_file:
+            np.savez(checkpoint_file, **arrays)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+# This function reads a checkpoint and restores the state of the Python and NumPy random number generators. It
+# returns a dictionary with the population arrays, the number of the next generation, the best individual and
+# fitness found so far, and the convergence state (the best fitness seen by early stopping and the number of
+# generations without improvement). Checkpoints written before the convergence state was saved resume with no
+# stalled generations.
+def load_checkpoint(path: str) -> Dict[str, object]:
+    """
+    Read a checkpoint file and restore the random number generator states
+    """
+    with np.load(path) as checkpoint:
+        if int(checkpoint['version']) != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {int(checkpoint['version'])} in {path}.")
+
+        population = {key[len('population_'):]: checkpoint[key] for key in checkpoint.files if key.startswith('population_')}
+        best_individual = None
+        if 'best_pitches' in checkpoint.files:
+            best_individual = Individual(*(checkpoint['best_' + field] for field in Individual.__slots__))
+
+        python_gauss = float(checkpoint['python_random_gauss'])
+        random.setstate((int(checkpoint['python_random_version']),
+                         tuple(int(word) for word in checkpoint['python_random_state']),
+                         None if np.isnan(python_gauss) else python_gauss))
+        np.random.set_state(('MT19937', checkpoint['numpy_random_keys'], int(checkpoint['numpy_random_position']),
+                             int(checkpoint['numpy_random_has_gauss']), float(checkpoint['numpy_random_gauss'])))
+
+        return {
+            'population': population,
+            'generation': int(checkpoint['generation']),
+            'best_individual': best_individual,
+            'best_fitness': float(checkpoint['best_fitness']),
+            'stopping_fitness': float(checkpoint['stopping_fitness'] if 'stopping_fitness' in checkpoint.files
+                                      else checkpoint['best_fitness']),
+            'stalled_generations': int(checkpoint['stalled_generations']) if 'stalled_generations' in checkpoint.files else 0,
+        }
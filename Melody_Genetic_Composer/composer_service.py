@@ -0,0 +1,435 @@
+# Program Description: Long-running composition service for the genetic algorithm music composer. Starting a new
+#                      Melody_Genetic_Composer.py process for every request pays for the interpreter, NumPy and the
+#                      composer modules each time; the service starts once, keeps a warm pool of worker processes
+#                      that have already imported them, and runs compose() jobs in that pool.
+#
+#                      Clients connect over a Unix domain socket (or TCP) and exchange JSON Lines. A submit request
+#                      carries the compose() parameters of a job and a priority; jobs wait in a priority queue (lower
+#                      values first, equal priorities in submission order) until a worker is free. The submitting
+#                      connection receives a "queued" event, one "progress" event per generation, and finally a "done"
+#                      event holding the MIDI file as base64, or an "error" or "cancelled" event. A cancel request
+#                      removes a queued job, or stops a running job at the end of its current generation. Jobs may
+#                      only set the genetic algorithm parameters of a single-population run: workers return the MIDI
+#                      bytes directly and never write files, and MIDIUtil and FluidSynth are never imported by the
+#                      service.
+#
+#                      Usage: python composer_service.py serve --socket composer.sock --workers 4
+#                             python composer_service.py submit --socket composer.sock job.json --output song.mid
+
+# Required Libraries.
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from Melody_Genetic_Composer import INDIVIDUAL_LENGTH, NUM_GENERATIONS, POPULATION_SIZE, compose
+
+SOCKET_PATH: str = 'composer.sock'
+SERVICE_WORKERS: int = os.cpu_count() or 1
+# Largest request line accepted from a client, in bytes.
+REQUEST_LIMIT: int = 1 << 20
+# compose() parameters a job may set. Only the genetic algorithm itself is configurable: parameters that write files
+# on the server (render, checkpoint and metrics paths), start extra processes, or select the island and polyphonic
+# runs, which report no per-generation progress and so could not be followed or cancelled, are chosen by the service.
+JOB_PARAMETERS = frozenset({
+    'population_size', 'individual_length', 'mutation_rate', 'num_generations', 'tournament_size', 'seed',
+    'fitness_cache_size', 'elite_size', 'patience', 'target_fitness', 'mutation_schedule', 'fitness_function',
+    'selection',
+})
+# Inclusive bounds of the numeric job parameters, and the largest number of notes a job may evaluate over its run
+# (population size times individual length times generations), so that one client cannot take a worker's memory or
+# time. The default job evaluates 750,000 notes.
+JOB_PARAMETER_LIMITS: Dict[str, Tuple[float, float]] = {
+    'population_size': (2, 10_000), 'individual_length': (1, 1_000), 'num_generations': (0, 10_000),
+    'tournament_size': (1, 10_000), 'fitness_cache_size': (0, 1_000_000), 'elite_size': (0, 10_000),
+    'patience': (0, 10_000), 'mutation_rate': (0.0, 1.0),
+}
+JOB_WORK_LIMIT: int = 10 ** 9
+
+# Progress queue and cancelled job ids shared with the worker processes, set by initialize_worker().
+worker_progress = None
+worker_cancelled = None
+
+
+# The JobCancelled exception is raised inside a worker to stop a job that was cancelled while running.
+class JobCancelled(Exception):
+    pass
+
+
+# This function checks the parameters of a submitted job: every name must be a job parameter, and numeric values must
+# be numbers within their bounds. It raises ValueError for the first problem found.
+def check_job_parameters(parameters: Dict[str, object]) -> None:
+    """
+    Check the parameters of a composition job
+    """
+    if not isinstance(parameters, dict):
+        raise ValueError("The job should be an object of compose() parameters.")
+    unknown = set(parameters) - JOB_PARAMETERS
+    if unknown:
+        raise ValueError(f"Unknown job parameters: {', '.join(sorted(unknown))}")
+    for name, (low, high) in JOB_PARAMETER_LIMITS.items():
+        if name not in parameters:
+            continue
+        value = parameters[name]
+        number_types = (int, float) if isinstance(low, float) else int
+        if isinstance(value, bool) or not isinstance(value, number_types) or not low <= value <= high:
+            raise ValueError(f"Job parameter {name} should be a number from {low} to {high}, got {value!r}.")
+    work = (parameters.get('population_size', POPULATION_SIZE) * parameters.get('individual_length', INDIVIDUAL_LENGTH)
+            * max(parameters.get('num_generations', NUM_GENERATIONS), 1))
+    if work > JOB_WORK_LIMIT:
+        raise ValueError(f"The job would evaluate {work} notes; population_size * individual_length * num_generations "
+                         f"should be at most {JOB_WORK_LIMIT}.")
+
+
+# This function initializes a worker process of the pool: it keeps the shared progress queue and cancelled set, and
+# imports the modules that compose() only imports when a run needs them, so the first job a worker runs does not pay
+# for them.
+def initialize_worker(progress_queue, cancelled) -> None:
+    """
+    Prepare a worker process of the service pool
+    """
+    global worker_progress, worker_cancelled
+    worker_progress = progress_queue
+    worker_cancelled = cancelled
+    import fitness_functions
+    import metrics
+    import polyphony
+
+
+# This function does nothing; running it once per worker makes the pool start all of its processes up front.
+def warm_up() -> None:
+    """
+    Start a worker process of the service pool
+    """
+
+
+# This function runs one job in a worker process and returns the best fitness and the bytes of its MIDI file. Every
+# generation of a single-population run sends its number, best fitness and mean fitness to the progress queue, and
+# raises JobCancelled once the job has been cancelled.
+def run_job(job_id: int, parameters: Dict[str, object]) -> Tuple[float, bytes]:
+    """
+    Run a composition job and return its fitness and MIDI bytes
+    """
+    def report_progress(metrics) -> None:
+        if job_id in worker_cancelled:
+            raise JobCancelled(f"Job {job_id} was cancelled.")
+        worker_progress.put((job_id, metrics.generation, metrics.best_fitness, metrics.mean_fitness))
+
+    _, best_fitness, midi = compose(**parameters, output_dir=None, callbacks=[report_progress], verbosity=0)
+    return float(best_fitness), midi
+
+
+# The Job class holds one submitted job: its parameters, priority and state ('queued', 'running', 'done', 'error' or
+# 'cancelled'), and the queue of events sent to the connection that submitted it.
+class Job:
+    def __init__(self, job_id: int, parameters: Dict[str, object], priority: int):
+        self.id = job_id
+        self.parameters = parameters
+        self.priority = priority
+        self.state = 'queued'
+        self.events: "asyncio.Queue" = asyncio.Queue()
+
+    # This method sends an event to the connection that submitted the job.
+    def publish(self, event: str, **fields) -> None:
+        """
+        Send an event about the job to its client
+        """
+        self.events.put_nowait({'event': event, 'id': self.id, **fields})
+
+    # This method moves the job to a final state and sends the matching event.
+    def finish(self, state: str, **fields) -> None:
+        """
+        Finish the job and notify its client
+        """
+        self.state = state
+        self.publish(state, **fields)
+
+
+# The ComposerService class owns the worker pool, the job queue and the socket server. start() starts the workers
+# and one dispatcher task per worker; every dispatcher takes the most urgent queued job and runs it in the pool. A
+# thread forwards the progress messages of the workers to the event queues of their jobs.
+class ComposerService:
+    def __init__(self, max_workers: int = SERVICE_WORKERS):
+        if max_workers < 1:
+            raise ValueError("The service needs at least one worker.")
+        self.max_workers = max_workers
+        self.jobs: Dict[int, Job] = {}
+        self.job_ids = itertools.count(1)
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    # This method starts the worker processes, the dispatchers and the progress thread.
+    async def start(self) -> None:
+        """
+        Start the worker pool and the job dispatchers
+        """
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.PriorityQueue()
+        self.manager = multiprocessing.Manager()
+        self.progress = self.manager.Queue()
+        self.cancelled = self.manager.dict()
+        self.pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=initialize_worker,
+                                        initargs=(self.progress, self.cancelled))
+        await asyncio.gather(*(self.loop.run_in_executor(self.pool, warm_up) for _ in range(self.max_workers)))
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.max_workers)]
+        self.progress_thread = threading.Thread(target=self.forward_progress, name='progress-forwarder', daemon=True)
+        self.progress_thread.start()
+
+    # This method listens for clients on a Unix domain socket at path, or on TCP at host and port when a port is
+    # given, until the service is closed.
+    async def serve(self, path: str = SOCKET_PATH, host: str = '127.0.0.1', port: Optional[int] = None) -> None:
+        """
+        Accept client connections
+        """
+        if port is not None:
+            self.server = await asyncio.start_server(self.handle_client, host, port, limit=REQUEST_LIMIT)
+        else:
+            if os.path.exists(path):
+                os.unlink(path)
+            self.server = await asyncio.start_unix_server(self.handle_client, path, limit=REQUEST_LIMIT)
+        async with self.server:
+            await self.server.serve_forever()
+
+    # This method queues a job and returns it. The parameters are checked here, so a misspelt or out-of-range
+    # parameter is reported to the client before the job waits in the queue.
+    def submit(self, parameters: Dict[str, object], priority: int = 0) -> Job:
+        """
+        Queue a composition job
+        """
+        check_job_parameters(parameters)
+        job = Job(next(self.job_ids), dict(parameters), priority)
+        self.jobs[job.id] = job
+        self.queue.put_nowait((priority, job.id, job))
+        job.publish('queued', priority=priority, position=self.queue.qsize())
+        return job
+
+    # This method cancels a job. A queued job is dropped when a dispatcher reaches it, and a running job is stopped
+    # by its worker at the end of the current generation. It returns False if the job is unknown or already finished.
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a queued or running job
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in ('queued', 'running'):
+            return False
+        if job.state == 'queued':
+            job.finish('cancelled')
+        else:
+            self.cancelled[job_id] = True
+        return True
+
+    # This method is the loop of a dispatcher task: it runs the most urgent queued job in the pool and publishes its
+    # result.
+    async def dispatch(self) -> None:
+        """
+        Run queued jobs in the worker pool
+        """
+        while True:
+            _, _, job = await self.queue.get()
+            if job.state != 'queued':
+                continue
+            job.state = 'running'
+            job.publish('started')
+            try:
+                best_fitness, midi = await self.loop.run_in_executor(self.pool, run_job, job.id, job.parameters)
+            except JobCancelled:
+                job.finish('cancelled')
+            except Exception as error:
+                job.finish('error', message=f"{type(error).__name__}: {error}")
+            else:
+                job.finish('done', fitness=best_fitness, midi=base64.b64encode(midi).decode('ascii'))
+            finally:
+                self.cancelled.pop(job.id, None)
+
+    # This method runs in the progress thread and hands every progress message of the workers to the event loop.
+    def forward_progress(self) -> None:
+        """
+        Forward worker progress to the jobs' event queues
+        """
+        while True:
+            message = self.progress.get()
+            if message is None:
+                return
+            self.loop.call_soon_threadsafe(self.publish_progress, *message)
+
+    # This method publishes the progress of a running job.
+    def publish_progress(self, job_id: int, generation: int, best_fitness: float, mean_fitness: float) -> None:
+        """
+        Send a progress event to the client of a job
+        """
+        job = self.jobs.get(job_id)
+        if job is not None and job.state == 'running':
+            job.publish('progress', generation=generation, best_fitness=best_fitness, mean_fitness=mean_fitness)
+
+    # This method streams the events of a job to a client until the job is finished, and then forgets the job.
+    async def stream_events(self, job: Job, writer: asyncio.StreamWriter) -> None:
+        """
+        Send the events of a job to its client
+        """
+        try:
+            while True:
+                event = await job.events.get()
+                writer.write(json.dumps(event).encode() + b'\n')
+                await writer.drain()
+                if event['event'] in ('done', 'error', 'cancelled'):
+                    break
+        except ConnectionError:
+            self.cancel(job.id)
+        finally:
+            self.jobs.pop(job.id, None)
+
+    # This method serves one client connection. Every line is a JSON request: {"op": "submit", "job": {...},
+    # "priority": 0}, {"op": "cancel", "id": 1} or {"op": "status"}. The events of every job submitted on the
+    # connection are streamed back on it, and the connection stays open until the client closes it and its jobs
+    # have finished.
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve the requests of one client
+        """
+        streams = []
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    operation = request.get('op')
+                    if operation == 'submit':
+                        job = self.submit(request.get('job', {}), int(request.get('priority', 0)))
+                        streams.append(asyncio.create_task(self.stream_events(job, writer)))
+                        continue
+                    if operation == 'cancel':
+                        reply = {'event': 'cancel', 'id': request.get('id'), 'ok': self.cancel(request.get('id'))}
+                    elif operation == 'status':
+                        reply = {'event': 'status', 'queued': sum(job.state == 'queued' for job in self.jobs.values()),
+                                 'running': sum(job.state == 'running' for job in self.jobs.values()),
+                                 'workers': self.max_workers}
+                    else:
+                        raise ValueError(f"Unknown operation {operation!r}; expected submit, cancel or status.")
+                except (ValueError, TypeError, AttributeError) as error:
+                    reply = {'event': 'error', 'message': str(error)}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+            await asyncio.gather(*streams)
+        except ConnectionError:
+            pass
+        finally:
+            for stream in streams:
+                stream.cancel()
+            writer.close()
+
+    # This method stops accepting clients and shuts down the dispatchers, the workers and the progress thread.
+    async def close(self) -> None:
+        """
+        Stop the service
+        """
+        if self.server is not None:
+            self.server.close()
+        for job in self.jobs.values():
+            if job.state == 'running':
+                self.cancelled[job.id] = True
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+        self.progress.put(None)
+        self.progress_thread.join()
+        self.manager.shutdown()
+
+
+# This function submits a job to a running service and yields its events, ending with the "done", "error" or
+# "cancelled" event. The service is reached over the Unix domain socket at path, or over TCP when a port is given.
+async def submit_job(parameters: Dict[str, object], priority: int = 0, path: str = SOCKET_PATH,
+                     host: str = '127.0.0.1', port: Optional[int] = None) -> AsyncIterator[Dict[str, object]]:
+    """
+    Submit a job to the composer service and stream its events
+    """
+    if port is not None:
+        reader, writer = await asyncio.open_connection(host, port, limit=REQUEST_LIMIT)
+    else:
+        reader, writer = await asyncio.open_unix_connection(path, limit=REQUEST_LIMIT)
+    try:
+        writer.write(json.dumps({'op': 'submit', 'job': parameters, 'priority': priority}).encode() + b'\n')
+        await writer.drain()
+        async for line in reader:
+            event = json.loads(line)
+            yield event
+            if event['event'] in ('done', 'error', 'cancelled'):
+                break
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+# This function runs the service until it is interrupted.
+async def run_service(arguments: argparse.Namespace) -> None:
+    """
+    Start the composer service and serve clients
+    """
+    service = ComposerService(arguments.workers)
+    await service.start()
+    print(f"Composer Service Ready : {arguments.workers} workers on "
+          f"{arguments.socket if arguments.port is None else f'{arguments.host}:{arguments.port}'}")
+    try:
+        await service.serve(arguments.socket, arguments.host, arguments.port)
+    finally:
+        await service.close()
+
+
+# This function submits the job in a JSON file to the service, prints its progress and writes the MIDI file.
+async def run_client(arguments: argparse.Namespace) -> int:
+    """
+    Submit a job file to the composer service
+    """
+    with open(arguments.job) as job_file:
+        parameters = json.load(job_file)
+    async for event in submit_job(parameters, arguments.priority, arguments.socket, arguments.host, arguments.port):
+        if event['event'] == 'progress':
+            print(f"Generation {event['generation']} : Best Fitness = {event['best_fitness']}")
+        elif event['event'] == 'done':
+            with open(arguments.output, 'wb') as output_file:
+                output_file.write(base64.b64decode(event['midi']))
+            print(f"MIDI File Written : {arguments.output} (Fitness {event['fitness']})")
+            return 0
+        elif event['event'] in ('error', 'cancelled'):
+            # A rejected submission has no job id yet
+            job = f"Job {event['id']}" if 'id' in event else "Job"
+            print(f"{job} {event['event']}: {event.get('message', '')}", file=sys.stderr)
+            return 1
+    return 1
+
+
+# This function is the command-line entry point of the service and its client.
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Composer service: run compose() jobs in a warm worker pool.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="start the service")
+    serve_parser.add_argument('--workers', type=int, default=SERVICE_WORKERS, help="number of worker processes")
+    submit_parser = subparsers.add_parser('submit', help="submit a job file and save its MIDI file")
+    submit_parser.add_argument('job', help="JSON file holding the compose() parameters of the job")
+    submit_parser.add_argument('--output', default='composition.mid', help="MIDI file to write")
+    submit_parser.add_argument('--priority', type=int, default=0, help="lower values run first")
+    for subparser in (serve_parser, submit_parser):
+        subparser.add_argument('--socket', default=SOCKET_PATH, help="Unix domain socket of the service")
+        subparser.add_argument('--host', default='127.0.0.1', help="TCP host, used with --port")
+        subparser.add_argument('--port', type=int, default=None, help="use TCP on this port instead of the socket")
+    arguments = parser.parse_args()
+
+    if arguments.command == 'serve':
+        try:
+            asyncio.run(run_service(arguments))
+        except KeyboardInterrupt:
+            pass
+    else:
+        sys.exit(asyncio.run(run_client(arguments)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# Program Description: Convergence control for the genetic algorithm music composer. Fitness evaluation is the main
+#                      cost of a run, so a run should not keep evaluating generations once it has stopped improving.
+#                      The EarlyStopping class ends a run when the best fitness has not improved for a number of
+#                      generations (the patience) or when a target fitness has been reached. The mutation schedules
+#                      below replace the fixed mutation rate with one that changes over the run: the linear and
+#                      exponential schedules decay from the base rate towards MIN_MUTATION_RATE, so good individuals
+#                      are disturbed less as the run converges, and the adaptive schedule keeps the rate low while the
+#                      best fitness improves and doubles it for every generation the run has stalled, up to the base
+#                      rate, to escape the plateau.
+
+# Required Libraries.
+from typing import Callable, Dict, Optional
+
+# Lowest mutation rate reached by the decaying and adaptive schedules.
+MIN_MUTATION_RATE: float = 0.01
+
+
+# The EarlyStopping class tracks the best fitness of a run. update() is called once per generation with the best
+# fitness seen so far and returns True when the run should stop; reason then describes why. A patience of 0 never
+# stops on a stall, and a target_fitness of None never stops on a target.
+class EarlyStopping:
+    def __init__(self, patience: int = 0, target_fitness: Optional[float] = None, min_delta: float = 0.0,
+                 best_fitness: float = float('-inf'), stalled_generations: int = 0):
+        if patience < 0:
+            raise ValueError("The patience cannot be negative.")
+        self.patience = patience
+        self.target_fitness = target_fitness
+        self.min_delta = min_delta
+        self.best_fitness = best_fitness
+        self.stalled_generations = stalled_generations
+        self.reason: Optional[str] = None
+
+    # This method records the best fitness of a generation and decides whether the run should stop. An improvement
+    # of more than min_delta resets the stall counter.
+    def update(self, best_fitness: float) -> bool:
+        """
+        Record the best fitness of a generation and return whether to stop
+        """
+        if best_fitness > self.best_fitness + self.min_delta:
+            self.best_fitness = best_fitness
+            self.stalled_generations = 0
+        else:
+            self.stalled_generations += 1
+
+        if self.target_fitness is not None and self.best_fitness >= self.target_fitness:
+            self.reason = f"target fitness {self.target_fitness} reached"
+        elif self.patience and self.stalled_generations >= self.patience:
+            self.reason = f"no improvement for {self.stalled_generations} generations"
+        return self.reason is not None
+
+
+# This function keeps the mutation rate fixed at the base rate for the whole run.
+def constant_mutation_rate(base_rate: float, generation: int, num_generations: int, stalled_generations: int) -> float:
+    """
+    Return the base mutation rate
+    """
+    return base_rate
+
+
+# This function decays the mutation rate linearly from the base rate in the first generation to MIN_MUTATION_RATE in
+# the last generation.
+def linear_mutation_rate(base_rate: float, generation: int, num_generations: int, stalled_generations: int) -> float:
+    """
+    Return a mutation rate that decays linearly over the run
+    """
+    progress = generation / max(num_generations - 1, 1)
+    return base_rate + (min(MIN_MUTATION_RATE, base_rate) - base_rate) * progress
+
+
+# This function decays the mutation rate geometrically from the base rate in the first generation to
+# MIN_MUTATION_RATE in the last generation.
+def exponential_mutation_rate(base_rate: float, generation: int, num_generations: int, stalled_generations: int) -> float:
+    """
+    Return a mutation rate that decays exponentially over the run
+    """
+    if base_rate <= MIN_MUTATION_RATE:
+        return base_rate
+    progress = generation / max(num_generations - 1, 1)
+    return base_rate * (MIN_MUTATION_RATE / base_rate) ** progress
+
+
+# This function returns MIN_MUTATION_RATE while the best fitness is improving and doubles it for every generation
+# without improvement, never exceeding the base rate.
+def adaptive_mutation_rate(base_rate: float, generation: int, num_generations: int, stalled_generations: int) -> float:
+    """
+    Return a mutation rate that grows while the run is stalled
+    """
+    return min(base_rate, MIN_MUTATION_RATE * 2.0 ** min(stalled_generations, 64))
+
+
+# Mutation schedules by name, as accepted by compose() and the --mutation-schedule option.
+MUTATION_SCHEDULES: Dict[str, Callable[[float, int, int, int], float]] = {
+    'constant': constant_mutation_rate,
+    'linear': linear_mutation_rate,
+    'exponential': exponential_mutation_rate,
+    'adaptive': adaptive_mutation_rate,
+}
+
+
+# This function returns the mutation schedule with the given name.
+def get_mutation_schedule(name: str) -> Callable[[float, int, int, int], float]:
+    """
+    Look up a mutation schedule by name
+    """
+    try:
+        return MUTATION_SCHEDULES[name]
+    except KeyError:
+        raise ValueError(f"Unknown mutation schedule {name!r}; expected one of {', '.join(MUTATION_SCHEDULES)}.") from None
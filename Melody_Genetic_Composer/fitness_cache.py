@@ -0,0 +1,86 @@
+# Program Description: Fitness memoization for the genetic algorithm music composer. Tournament selection copies the
+#                      same parents many times, and children that were not mutated are identical to their parents, so
+#                      many genomes in a generation have been evaluated before. The cache keys every genome on a
+#                      compact hash of its packed arrays and keeps the fitness of the most recently used genomes in a
+#                      bounded least-recently-used table, so duplicate genomes skip evaluation entirely. Only the
+#                      genomes that miss the cache are passed, as one batch, to the fitness function.
+
+# Required Libraries.
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, List
+import numpy as np
+
+# Number of bytes of the BLAKE2b digest used as the genome key.
+GENOME_KEY_SIZE: int = 16
+
+
+# This function computes a compact key for every genome in the population arrays. The fields of each individual are
+# laid out side by side as raw bytes, and every row is hashed with BLAKE2b, so two genomes share a key exactly when
+# all their notes, octaves, durations and velocities are equal.
+def genome_keys(population: Dict[str, np.ndarray]) -> List[bytes]:
+    """
+    Compute a hash key for every genome in the population arrays
+    """
+    size = len(next(iter(population.values())))
+    genome_bytes = np.hstack([np.ascontiguousarray(population[field]).view(np.uint8).reshape(size, -1)
+                              for field in sorted(population)])
+    return [hashlib.blake2b(row.tobytes(), digest_size=GENOME_KEY_SIZE).digest() for row in genome_bytes]
+
+
+# The FitnessCache class wraps a batched fitness function, such as fitness_batch(), with a bounded LRU memoization
+# layer. The hits and misses counters record how many genomes were answered from the cache and how many had to be
+# evaluated.
+class FitnessCache:
+    def __init__(self, fitness_function: Callable[[Dict[str, np.ndarray]], np.ndarray], maxsize: int = 100000):
+        self.fitness_function = fitness_function
+        self.maxsize = maxsize
+        self.scores: "OrderedDict[bytes, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    # This method returns the fitness of every individual in the population arrays. Cached genomes are answered from
+    # the table and moved to its most recently used end; the remaining genomes are evaluated once per distinct
+    # genome in a single call to the fitness function, stored, and the least recently used entries are evicted.
+    def evaluate(self, population: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluate the fitness of every individual, skipping genomes that are already cached
+        """
+        keys = genome_keys(population)
+        fitness_scores = np.empty(len(keys), dtype=np.float64)
+
+        missing: Dict[bytes, List[int]] = {}
+        for index, key in enumerate(keys):
+            score = self.scores.get(key)
+            if score is not None:
+                self.scores.move_to_end(key)
+                fitness_scores[index] = score
+                self.hits += 1
+            elif key in missing:
+                missing[key].append(index)
+                self.hits += 1
+            else:
+                missing[key] = [index]
+                self.misses += 1
+
+        if missing:
+            first_indices = np.array([indices[0] for indices in missing.values()])
+            new_scores = self.fitness_function({field: values[first_indices] for field, values in population.items()})
+            for (key, indices), score in zip(missing.items(), new_scores.tolist()):
+                fitness_scores[indices] = score
+                self.scores[key] = score
+
+            while len(self.scores) > self.maxsize:
+                self.scores.popitem(last=False)
+
+        return fitness_scores
+
+    # This method returns the hit and miss counters together with the current number of cached genomes.
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the cache counters
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.scores)}
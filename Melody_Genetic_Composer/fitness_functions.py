@@ -0,0 +1,192 @@
+# Program Description: Pluggable fitness functions for the genetic algorithm music composer. The original fitness
+#                      only counts whole-beat durations and distinct pitches and octaves; the scorers below also look
+#                      at how the melody fits the chord progression, how smoothly it moves between notes and how
+#                      regular its rhythm is. Every scorer is batched: it takes the population arrays and returns one
+#                      score per individual, computed for the whole population with array operations.
+#
+#                      Scorers are looked up by name in FITNESS_FUNCTIONS, and a weighted combination is written as a
+#                      comma-separated list of name=weight pairs, for example "chord_tones=2,interval_smoothness=1".
+#                      The ParallelFitnessEvaluator spreads the evaluation of a large population over a process or
+#                      thread pool, one chunk of individuals per task.
+
+# Required Libraries.
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+from Melody_Genetic_Composer import (CHORD_INDEX, CHORD_PROGRESSIONS, CHORD_TRIADS, CHORDS, NOTES, TICKS_PER_BEAT,
+                                     fitness_batch)
+
+# Beats each chord of the progression lasts in the chord-tone scorer.
+BEATS_PER_CHORD: float = 4.0
+# Number of individuals evaluated per task by the ParallelFitnessEvaluator.
+FITNESS_CHUNK_SIZE: int = 1024
+# Whether each pitch class (column) is a tone of each chord (row).
+CHORD_TONE_TABLE: np.ndarray = np.zeros((len(CHORDS), len(NOTES)), dtype=bool)
+CHORD_TONE_TABLE[np.arange(len(CHORDS))[:, None], CHORD_TRIADS] = True
+
+FitnessFunction = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+
+# This function averages every row of a two-dimensional array, scoring rows with no columns as 0.
+def row_mean(values: np.ndarray) -> np.ndarray:
+    """
+    Average every row of a two-dimensional array
+    """
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0])
+    return values.mean(axis=1, dtype=np.float64)
+
+
+# This function returns the duration of every note in MIDI ticks, so that onsets and beat positions can be computed
+# with exact integer arithmetic.
+def note_ticks(population: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Convert the note durations to MIDI ticks
+    """
+    return np.rint(population['durations'] * TICKS_PER_BEAT).astype(np.int64)
+
+
+# This function returns the onset of every note in MIDI ticks, as the sum of the durations of the notes before it.
+def note_onsets(ticks: np.ndarray) -> np.ndarray:
+    """
+    Compute the onset of every note of every individual
+    """
+    return np.cumsum(ticks, axis=1) - ticks
+
+
+# This function scores how well each melody follows a chord progression: the fraction of notes whose pitch class is
+# a tone of the chord sounding at the note's onset. Each chord of the progression lasts BEATS_PER_CHORD beats and the
+# progression repeats for the length of the melody.
+def chord_tone_adherence(population: Dict[str, np.ndarray], progression: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Score the fraction of notes that belong to the chord being played
+    """
+    progression = CHORD_PROGRESSIONS[0] if progression is None else progression
+    chords = np.array([CHORD_INDEX[chord] for chord in progression]) * len(NOTES)
+    positions = note_onsets(note_ticks(population)) // int(BEATS_PER_CHORD * TICKS_PER_BEAT) % len(chords)
+    return row_mean(CHORD_TONE_TABLE.ravel()[chords[positions] + population['pitches']])
+
+
+# This function scores how smoothly each melody moves: every interval between consecutive notes scores 1 for a
+# repeated note, falling linearly to 0 for a leap of an octave or more, and the scores are averaged.
+def interval_smoothness(population: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Score the smoothness of the intervals between consecutive notes
+    """
+    pitches = population['pitches'].astype(np.int64) + 12 * population['octaves'].astype(np.int64)
+    intervals = np.abs(np.diff(pitches, axis=1))
+    return row_mean(np.maximum(0.0, 1.0 - intervals / 12.0))
+
+
+# This function scores how regular the rhythm of each melody is: half of the score is the fraction of notes that
+# repeat the duration of the note before them, and half the fraction of notes that start on a multiple of their own
+# duration, so that notes fall on the beat grid instead of being syncopated.
+def rhythmic_consistency(population: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Score the regularity of the rhythm
+    """
+    ticks = note_ticks(population)
+    repeated = row_mean(ticks[:, 1:] == ticks[:, :-1])
+    on_grid = row_mean(note_onsets(ticks) % np.maximum(ticks, 1) == 0)
+    return 0.5 * repeated + 0.5 * on_grid
+
+
+# Batched fitness functions by name.
+FITNESS_FUNCTIONS: Dict[str, FitnessFunction] = {
+    'default': fitness_batch,
+    'chord_tones': chord_tone_adherence,
+    'interval_smoothness': interval_smoothness,
+    'rhythmic_consistency': rhythmic_consistency,
+}
+
+
+# This function adds a batched fitness function to the registry, so it can be used by name or in a weighted
+# combination.
+def register_fitness_function(name: str, fitness_function: FitnessFunction) -> None:
+    """
+    Register a batched fitness function under a name
+    """
+    FITNESS_FUNCTIONS[name] = fitness_function
+
+
+# The WeightedFitness class combines registered fitness functions into one, as the weighted sum of their scores. It
+# holds the names rather than the functions, so it can be sent to worker processes.
+class WeightedFitness:
+    def __init__(self, weights: Dict[str, float]):
+        unknown = [name for name in weights if name not in FITNESS_FUNCTIONS]
+        if unknown:
+            raise ValueError(f"Unknown fitness function {unknown[0]!r}; expected one of {', '.join(FITNESS_FUNCTIONS)}.")
+        self.weights = dict(weights)
+
+    def __call__(self, population: Dict[str, np.ndarray]) -> np.ndarray:
+        total = np.zeros(len(population['pitches']))
+        for name, weight in self.weights.items():
+            total += weight * FITNESS_FUNCTIONS[name](population)
+        return total
+
+    def __repr__(self) -> str:
+        return f"WeightedFitness({self.weights})"
+
+
+# This function returns the fitness function described by spec: either the name of a registered function or a
+# comma-separated list of name=weight pairs, which is combined with WeightedFitness.
+def get_fitness_function(spec: str) -> FitnessFunction:
+    """
+    Look up a fitness function or weighted combination by its description
+    """
+    if spec in FITNESS_FUNCTIONS:
+        return FITNESS_FUNCTIONS[spec]
+    weights = {}
+    for term in spec.split(','):
+        name, separator, weight = term.partition('=')
+        try:
+            weights[name.strip()] = float(weight) if separator else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight {weight!r} for the fitness function {name.strip()!r}.") from None
+    return WeightedFitness(weights)
+
+
+# The ParallelFitnessEvaluator class evaluates a batched fitness function over a pool of worker processes (or
+# threads, for scorers that release the GIL). The population is split into chunks of chunk_size individuals that are
+# scored in parallel, and populations no larger than one chunk are scored in the calling thread. The pool is started
+# once and reused for every generation.
+class ParallelFitnessEvaluator:
+    def __init__(self, fitness_function: FitnessFunction, max_workers: Optional[int] = None,
+                 chunk_size: int = FITNESS_CHUNK_SIZE, executor: str = 'process'):
+        if executor not in ('process', 'thread'):
+            raise ValueError("The fitness executor must be 'process' or 'thread'.")
+        if chunk_size < 1:
+            raise ValueError("The fitness chunk size must be at least 1.")
+        self.fitness_function = fitness_function
+        self.chunk_size = chunk_size
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        self.pool = pool_class(max_workers=max_workers)
+
+    def __enter__(self) -> 'ParallelFitnessEvaluator':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # This method returns the fitness of every individual in the population arrays.
+    def evaluate(self, population: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluate the fitness of every individual across the pool
+        """
+        size = len(population['pitches'])
+        if size <= self.chunk_size:
+            return np.asarray(self.fitness_function(population), dtype=np.float64)
+        chunks = [{field: values[start:start + self.chunk_size] for field, values in population.items()}
+                  for start in range(0, size, self.chunk_size)]
+        return np.concatenate([np.asarray(scores, dtype=np.float64)
+                               for scores in self.pool.map(self.fitness_function, chunks)])
+
+    __call__ = evaluate
+
+    # This method shuts the pool down.
+    def close(self) -> None:
+        """
+        Stop the worker pool
+        """
+        self.pool.shutdown()
@@ -0,0 +1,172 @@
+# Program Description: Island model evolution for the genetic algorithm music composer. Instead of evolving a single
+#                      population on one core, several independent populations (islands) are evolved in parallel in a
+#                      process pool. Every migration interval the best individuals of each island are copied to the
+#                      next island in a ring, replacing its worst individuals, so good genetic material spreads
+#                      between islands while each island keeps exploring on its own.
+#
+#                      Every island owns its own NumPy random generator spawned from a single seed sequence, and the
+#                      generator travels with the island between the main process and the workers. A run with a fixed
+#                      seed is therefore reproducible regardless of how the process pool schedules the islands.
+
+# Required Libraries.
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from Melody_Genetic_Composer import (ELITE_SIZE, FITNESS_CACHE_SIZE, FITNESS_FUNCTION, MIGRATION_INTERVAL, MIGRATION_SIZE,
+                                     SELECTION, Individual, generate_population, next_generation)
+from fitness_cache import FitnessCache
+from fitness_functions import get_fitness_function
+
+# Fitness cache of the worker process. Fitness only depends on the genome, so one cache is shared by every island
+# the worker evolves and kept between epochs, as long as the fitness function stays the same.
+worker_fitness_cache: Optional[FitnessCache] = None
+worker_fitness_function: Optional[str] = None
+
+
+# This function returns the fitness cache of the worker process for a fitness function, creating it on first use.
+def get_worker_fitness_cache(fitness_cache_size: int, fitness_function: str = FITNESS_FUNCTION) -> FitnessCache:
+    """
+    Return the fitness cache of the current worker process
+    """
+    global worker_fitness_cache, worker_fitness_function
+    if (worker_fitness_cache is None or worker_fitness_cache.maxsize != fitness_cache_size or
+            worker_fitness_function != fitness_function):
+        worker_fitness_cache = FitnessCache(get_fitness_function(fitness_function), fitness_cache_size)
+        worker_fitness_function = fitness_function
+    return worker_fitness_cache
+
+
+# This function scores a population with the fitness function described by fitness_function in a worker process.
+def evaluate_island(population: Dict[str, np.ndarray], fitness_function: str = FITNESS_FUNCTION) -> np.ndarray:
+    """
+    Evaluate the fitness of one island's population
+    """
+    return get_fitness_function(fitness_function)(population)
+
+
+# This function creates the initial population of one island. The population is drawn from a generator seeded with
+# the island's seed, so the initial population is reproducible and the global random state is left alone.
+def initialize_island(island_seed: Optional[int], population_size: int, individual_length: int) -> Dict[str, np.ndarray]:
+    """
+    Generate the initial population of one island
+    """
+    return generate_population(population_size, individual_length, np.random.default_rng(island_seed))
+
+
+# This function evolves one island for the given number of generations in a worker process. It returns the evolved
+# population, the island's random generator (so its state can be carried to the next epoch), the fitness scores of
+# the evolved population (used for migration), and the best individual and fitness seen during the epoch. A positive
+# fitness_cache_size evaluates fitness through the worker's fitness cache, and the elite_size fittest individuals of
+# every generation are carried over unchanged. Individuals are scored by the fitness function described by
+# fitness_function (see fitness_functions.py) and parents are chosen with the named selection operator.
+def evolve_island(population: Dict[str, np.ndarray], rng: np.random.Generator, num_generations: int,
+                  mutation_rate: float, tournament_size: int, fitness_cache_size: int = FITNESS_CACHE_SIZE,
+                  elite_size: int = ELITE_SIZE, fitness_function: str = FITNESS_FUNCTION,
+                  selection: str = SELECTION) -> Tuple[Dict[str, np.ndarray], np.random.Generator, np.ndarray, Dict[str, np.ndarray], float]:
+    """
+    Evolve one island for a number of generations
+    """
+    best_individual = None
+    best_fitness = float('-inf')
+    if fitness_cache_size > 0:
+        evaluate = get_worker_fitness_cache(fitness_cache_size, fitness_function).evaluate
+    else:
+        evaluate = get_fitness_function(fitness_function)
+
+    fitness_scores = evaluate(population)
+    for _ in range(num_generations):
+        generation_best_index = int(np.argmax(fitness_scores))
+        if fitness_scores[generation_best_index] > best_fitness:
+            best_fitness = float(fitness_scores[generation_best_index])
+            best_individual = {field: values[generation_best_index].copy() for field, values in population.items()}
+
+        population = next_generation(population, fitness_scores, mutation_rate, tournament_size, rng, elite_size, selection)
+        fitness_scores = evaluate(population)
+
+    return population, rng, fitness_scores, best_individual, best_fitness
+
+
+# This function migrates individuals between the islands in a ring. The best migration_size individuals of every
+# island replace the worst migration_size individuals of the next island. All emigrants are chosen before any island
+# is modified, so the result does not depend on the order in which the islands are visited.
+def migrate(populations: List[Dict[str, np.ndarray]], fitness_scores: List[np.ndarray], migration_size: int) -> None:
+    """
+    Copy the best individuals of every island over the worst individuals of the next island
+    """
+    emigrants = []
+    for population, scores in zip(populations, fitness_scores):
+        best_indices = np.argsort(-scores, kind='stable')[:migration_size]
+        emigrants.append({field: values[best_indices].copy() for field, values in population.items()})
+
+    for island, (population, scores) in enumerate(zip(populations, fitness_scores)):
+        incoming = emigrants[island - 1]
+        worst_indices = np.argsort(scores, kind='stable')[:migration_size]
+        for field, values in population.items():
+            values[worst_indices] = incoming[field][:len(worst_indices)]
+
+
+# This function runs the island model. The islands are initialized and evolved in a process pool for
+# migration_interval generations at a time, with a migration step between epochs, until num_generations generations
+# have run. The elite_size fittest individuals of every island are carried over to its next generation unchanged,
+# and parents are chosen with the named selection operator.
+# The best individual found on any island is returned as an Individual together with its fitness. Passing a seed makes the run reproducible.
+def run_island_model(num_islands: int, population_size: int, individual_length: int, mutation_rate: float,
+                     num_generations: int, tournament_size: int, migration_interval: int = MIGRATION_INTERVAL,
+                     migration_size: int = MIGRATION_SIZE, seed: Optional[int] = None,
+                     max_workers: Optional[int] = None, fitness_cache_size: int = FITNESS_CACHE_SIZE,
+                     elite_size: int = ELITE_SIZE, fitness_function: str = FITNESS_FUNCTION,
+                     selection: str = SELECTION, verbosity: int = 1) -> Tuple[Individual, float]:
+    """
+    Evolve several populations in parallel with periodic migration and return the best individual
+    """
+    if num_islands < 1:
+        raise ValueError("The number of islands must be at least 1.")
+    if migration_interval < 1:
+        raise ValueError("The migration interval must be at least 1.")
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(num_islands)
+    rngs = [np.random.default_rng(seed_sequence) for seed_sequence in seed_sequences]
+    island_seeds = [int(seed_sequence.generate_state(1)[0]) if seed is not None else None for seed_sequence in seed_sequences]
+
+    best_individual = None
+    best_fitness = float('-inf')
+
+    with ProcessPoolExecutor(max_workers=max_workers or num_islands) as pool:
+        populations = list(pool.map(initialize_island, island_seeds, [population_size] * num_islands,
+                                    [individual_length] * num_islands))
+        fitness_scores = list(pool.map(evaluate_island, populations, [fitness_function] * num_islands))
+
+        generation = 0
+        while generation < num_generations:
+            epoch_generations = min(migration_interval, num_generations - generation)
+            results = list(pool.map(evolve_island, populations, rngs, [epoch_generations] * num_islands,
+                                    [mutation_rate] * num_islands, [tournament_size] * num_islands,
+                                    [fitness_cache_size] * num_islands, [elite_size] * num_islands,
+                                    [fitness_function] * num_islands, [selection] * num_islands))
+            generation += epoch_generations
+
+            populations = [result[0] for result in results]
+            rngs = [result[1] for result in results]
+            fitness_scores = [result[2] for result in results]
+
+            # Update global best individual if necessary
+            for _, _, _, island_best_individual, island_best_fitness in results:
+                if island_best_fitness > best_fitness:
+                    best_individual = island_best_individual
+                    best_fitness = island_best_fitness
+
+            if verbosity >= 1:
+                print(f"Generation {generation} : Best Fitness Per Island = {[result[4] for result in results]}")
+
+            if generation < num_generations and num_islands > 1:
+                migrate(populations, fitness_scores, migration_size)
+
+    # Include the final populations, which have been evaluated but not yet evolved
+    for population, scores in zip(populations, fitness_scores):
+        final_best_index = int(np.argmax(scores))
+        if scores[final_best_index] > best_fitness:
+            best_individual = {field: values[final_best_index].copy() for field, values in population.items()}
+            best_fitness = float(scores[final_best_index])
+
+    return Individual(**best_individual), best_fitness
@@ -0,0 +1,111 @@
+# Program Description: Generation-level metrics for the genetic algorithm music composer. For every generation the
+#                      composer records how long each phase took (fitness evaluation, selection, crossover, mutation
+#                      and I/O such as printing, rendering and checkpoints), the best and mean fitness, the diversity
+#                      of the population, the mutation rate applied, and how many genomes were evaluated or answered
+#                      from the fitness cache. The metrics are passed to callbacks registered with compose(), and the
+#                      writers below save them as CSV or JSON Lines so runs at large population sizes can be analysed
+#                      and tuned afterwards.
+
+# Required Libraries.
+import csv
+import json
+import os
+from typing import Dict, NamedTuple, Union
+import numpy as np
+
+
+# The GenerationMetrics tuple holds the metrics of one generation. Times are in seconds.
+class GenerationMetrics(NamedTuple):
+    generation: int
+    best_fitness: float
+    mean_fitness: float
+    diversity: float
+    evaluations: int
+    cache_hits: int
+    cache_misses: int
+    mutation_rate: float
+    fitness_seconds: float
+    selection_seconds: float
+    crossover_seconds: float
+    mutation_seconds: float
+    io_seconds: float
+    total_seconds: float
+
+
+# This function measures the diversity of the population as the mean, over all note positions, of the fraction of
+# the possible pitches that appear at that position. A population of clones scores 1 / num_pitches and a population
+# using every pitch at every position scores 1. The pitch counts of all positions are taken with one bincount.
+def population_diversity(population: Dict[str, np.ndarray], num_pitches: int = 12) -> float:
+    """
+    Measure the pitch diversity of the population arrays
+    """
+    pitches = population['pitches']
+    size, individual_length = pitches.shape
+    if size == 0 or individual_length == 0:
+        return 0.0
+    offsets = np.arange(individual_length) * num_pitches
+    counts = np.bincount((pitches.astype(np.int64) + offsets).ravel(), minlength=individual_length * num_pitches)
+    present = np.count_nonzero(counts.reshape(individual_length, num_pitches), axis=1)
+    return float(present.mean() / min(num_pitches, size))
+
+
+# The CsvMetricsWriter class is a metrics callback that appends one CSV row per generation to a file, with a header
+# row naming the metrics. With append, the rows are added after those already in the file.
+class CsvMetricsWriter:
+    def __init__(self, path: str, append: bool = False):
+        self.file = open(path, 'a' if append else 'w', newline='')
+        self.writer = csv.writer(self.file)
+        if self.file.tell() == 0:
+            self.writer.writerow(GenerationMetrics._fields)
+
+    def __call__(self, metrics: GenerationMetrics) -> None:
+        self.writer.writerow(metrics)
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# The JsonlMetricsWriter class is a metrics callback that appends one JSON object per generation to a file. With
+# append, the objects are added after those already in the file.
+class JsonlMetricsWriter:
+    def __init__(self, path: str, append: bool = False):
+        self.file = open(path, 'a' if append else 'w')
+
+    def __call__(self, metrics: GenerationMetrics) -> None:
+        self.file.write(json.dumps(metrics._asdict()) + '\n')
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# This function removes the metrics of generation start_generation and later from a metrics file, so a run resumed
+# from a checkpoint of that generation does not record the generations it repeats twice.
+def truncate_metrics(path: str, start_generation: int) -> None:
+    """
+    Keep only the metrics of the generations before start_generation in a metrics file
+    """
+    with open(path, newline='') as metrics_file:
+        lines = metrics_file.readlines()
+    if path.lower().endswith('.csv'):
+        # The generation is the first column, after a header row
+        kept = lines[:1] + [line for line in lines[1:] if int(line.split(',', 1)[0]) < start_generation]
+    else:
+        kept = [line for line in lines if line.strip() and json.loads(line)['generation'] < start_generation]
+    with open(path, 'w', newline='') as metrics_file:
+        metrics_file.writelines(kept)
+
+
+# This function opens the metrics writer for a file: CSV for a .csv file and JSON Lines otherwise. A run resumed at
+# start_generation keeps the metrics of the earlier generations already in the file and appends to them.
+def open_metrics_writer(path: str, start_generation: int = 0) -> Union[CsvMetricsWriter, JsonlMetricsWriter]:
+    """
+    Open a CSV or JSON Lines metrics writer depending on the file extension
+    """
+    append = start_generation > 0 and os.path.exists(path)
+    if append:
+        truncate_metrics(path, start_generation)
+    if path.lower().endswith('.csv'):
+        return CsvMetricsWriter(path, append)
+    return JsonlMetricsWriter(path, append)
@@ -0,0 +1,323 @@
+# Program Description: Polyphonic composition for the genetic algorithm music composer. Instead of evolving a single
+#                      melody, every individual holds three tracks that are evolved together: the melody, a bass line
+#                      with one note per beat, and a chord track with one block chord per bar. All three follow one
+#                      chord progression, laid out once per run as a ProgressionTimeline: the chord of every bar and
+#                      of every beat, the chord tones of every bar, the bass note of every chord degree on every beat
+#                      and the voicing of every chord inversion in every bar are computed up front. Scoring and
+#                      exporting a track only index into these tables, so their cost grows linearly with the number
+#                      of tracks.
+#
+#                      The melody track uses the same population arrays as a melody-only run. The bass track holds
+#                      the degree of the chord (0 root, 1 third, 2 fifth) played on every beat, and the chord track
+#                      the inversion (0 root position, 1 first, 2 second) of every bar, so every bass and chord note
+#                      is a chord tone by construction and the genetic algorithm only chooses between them. The best
+#                      individual is written as one format 1 MIDI file with a track and a channel per part.
+
+# Required Libraries.
+import os
+import struct
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+import numpy as np
+
+from Melody_Genetic_Composer import (CHORD_INDEX, CHORD_TRIADS, CHORDS, CHORDS_PER_PROGRESSION, ELITE_SIZE,
+                                     INDIVIDUAL_LENGTH, MIDI_PITCH_TABLE, MUTATION_RATE, NOTE_OFF, NOTE_ON, NOTES,
+                                     NUM_BARS, NUM_GENERATIONS, POPULATION_SIZE, SELECTION, TICKS_PER_BEAT,
+                                     TOURNAMENT_SIZE, apply_elitism, crossover_batch, encode_midi_track,
+                                     generate_chord_progressions, generate_midi_event_array, generate_population,
+                                     mutate_batch, selection_batch)
+from fitness_functions import BEATS_PER_CHORD, CHORD_TONE_TABLE, interval_smoothness, note_onsets, note_ticks, row_mean
+
+# Octaves of the root of the bass notes and of the root position chords.
+BASS_OCTAVE: int = 2
+CHORD_OCTAVE: int = 3
+# Velocities of the bass and chord notes, which are not evolved.
+BASS_VELOCITY: int = 80
+CHORD_VELOCITY: int = 64
+# Tracks of a polyphonic individual, in the order they are written to the MIDI file, and their MIDI channels.
+TRACKS: Tuple[str, ...] = ('melody', 'bass', 'chords')
+TRACK_CHANNELS: Dict[str, int] = {'melody': 0, 'bass': 1, 'chords': 2}
+# Weight of every track's score in the fitness of a polyphonic individual.
+TRACK_WEIGHTS: Dict[str, float] = {'melody': 1.0, 'bass': 1.0, 'chords': 1.0}
+
+# MIDI pitches of the root position, first inversion and second inversion of every chord, indexed as
+# CHORD_VOICINGS[chord, inversion, voice] with the voices from lowest to highest.
+_root_position = 12 * (CHORD_OCTAVE + 1) + CHORD_TRIADS[:, :1] + (CHORD_TRIADS - CHORD_TRIADS[:, :1]) % len(NOTES)
+CHORD_VOICINGS: np.ndarray = np.stack([np.concatenate((_root_position[:, inversion:],
+                                                       _root_position[:, :inversion] + 12), axis=1)
+                                       for inversion in range(3)], axis=1)
+del _root_position
+
+PolyphonicPopulation = Dict[str, Dict[str, np.ndarray]]
+
+
+# The ProgressionTimeline tuple holds the chord progression of a polyphonic run laid out over its bars. chords is
+# the chord of every bar and beat_chords the chord of every beat, as indices into CHORDS; chord_tones marks the tones
+# of the chord of every bar (bars x 12); bass_pitches is the MIDI pitch of every chord degree on every beat (beats x
+# 3); voicings is the MIDI pitches of every inversion of the chord of every bar (bars x 3 x 3).
+class ProgressionTimeline(NamedTuple):
+    progression: List[str]
+    beats_per_chord: int
+    chords: np.ndarray
+    beat_chords: np.ndarray
+    chord_tones: np.ndarray
+    bass_pitches: np.ndarray
+    voicings: np.ndarray
+
+    @property
+    def num_bars(self) -> int:
+        return len(self.chords)
+
+    @property
+    def num_beats(self) -> int:
+        return len(self.beat_chords)
+
+
+# This function lays a chord progression out over num_bars bars of beats_per_chord beats, repeating it as often as
+# needed, and computes the lookup tables shared by the scoring and export of every track.
+def build_timeline(progression: List[str], num_bars: int = NUM_BARS,
+                   beats_per_chord: int = int(BEATS_PER_CHORD)) -> ProgressionTimeline:
+    """
+    Lay out a chord progression over the bars of a polyphonic composition
+    """
+    if not progression:
+        raise ValueError("The chord progression must have at least one chord.")
+    if num_bars < 1 or beats_per_chord < 1:
+        raise ValueError("The timeline must have at least one bar of at least one beat.")
+    try:
+        chord_indices = np.array([CHORD_INDEX[chord] for chord in progression])
+    except KeyError as error:
+        raise ValueError(f"Unknown chord {error.args[0]!r}; expected one of {', '.join(CHORDS)}.") from None
+
+    chords = chord_indices[np.arange(num_bars) % len(chord_indices)]
+    beat_chords = np.repeat(chords, beats_per_chord)
+    bass_pitches = CHORD_VOICINGS[beat_chords, 0] - 12 * (CHORD_OCTAVE - BASS_OCTAVE)
+    return ProgressionTimeline(list(progression), beats_per_chord, chords, beat_chords, CHORD_TONE_TABLE[chords],
+                               bass_pitches, CHORD_VOICINGS[chords])
+
+
+# This function generates a polyphonic population: the melody track is drawn by generate_population(), and the bass
+# degree of every beat and the chord inversion of every bar are drawn uniformly.
+def generate_polyphonic_population(population_size: int, individual_length: int, timeline: ProgressionTimeline,
+                                   rng=np.random) -> PolyphonicPopulation:
+    """
+    Generate an initial polyphonic population
+    """
+    return {
+        'melody': generate_population(population_size, individual_length, rng),
+        'bass': {'degrees': rng.choice(3, size=(population_size, timeline.num_beats)).astype(np.int8)},
+        'chords': {'inversions': rng.choice(3, size=(population_size, timeline.num_bars)).astype(np.int8)},
+    }
+
+
+# This function scores the melody track against the timeline. A third of the score is the fraction of notes that are
+# tones of the chord of the bar they start in, a third is interval_smoothness(), and a third is how closely the total
+# length of the melody matches the length of the timeline, falling linearly to 0 at a difference of the whole
+# timeline. Notes past the end of the timeline are scored against the progression repeated from the start.
+def melody_track_fitness(melody: Dict[str, np.ndarray], timeline: ProgressionTimeline) -> np.ndarray:
+    """
+    Score the melody track against the progression timeline
+    """
+    ticks = note_ticks(melody)
+    bars = note_onsets(ticks) // (timeline.beats_per_chord * TICKS_PER_BEAT) % timeline.num_bars
+    chord_tones = row_mean(timeline.chord_tones.ravel()[bars * len(NOTES) + melody['pitches']])
+
+    timeline_ticks = timeline.num_beats * TICKS_PER_BEAT
+    length_fit = np.maximum(0.0, 1.0 - np.abs(ticks.sum(axis=1) - timeline_ticks) / timeline_ticks)
+    return (chord_tones + interval_smoothness(melody) + length_fit) / 3.0
+
+
+# This function scores the bass track. Half of the score is the fraction of bars whose first beat plays the root of
+# the chord, and half is the smoothness of the bass line, with every interval between consecutive beats scoring 1 for
+# a repeated note and falling linearly to 0 for a leap of an octave.
+def bass_track_fitness(bass: Dict[str, np.ndarray], timeline: ProgressionTimeline) -> np.ndarray:
+    """
+    Score the bass track against the progression timeline
+    """
+    degrees = bass['degrees'].astype(np.int64)
+    roots_on_downbeats = row_mean(degrees[:, ::timeline.beats_per_chord] == 0)
+    pitches = timeline.bass_pitches[np.arange(timeline.num_beats), degrees]
+    smoothness = row_mean(np.maximum(0.0, 1.0 - np.abs(np.diff(pitches, axis=1)) / 12.0))
+    return 0.5 * roots_on_downbeats + 0.5 * smoothness
+
+
+# This function scores the voice leading of the chord track: for every change of bar the three voices move by some
+# number of semitones in total, which scores 1 when no voice moves and falls linearly to 0 at an octave.
+def chord_track_fitness(chords: Dict[str, np.ndarray], timeline: ProgressionTimeline) -> np.ndarray:
+    """
+    Score the chord track against the progression timeline
+    """
+    voicings = timeline.voicings[np.arange(timeline.num_bars), chords['inversions'].astype(np.int64)]
+    movement = np.abs(np.diff(voicings, axis=1)).sum(axis=2)
+    return row_mean(np.maximum(0.0, 1.0 - movement / 12.0))
+
+
+# Fitness function of every track.
+TRACK_FITNESS: Dict[str, Callable[[Dict[str, np.ndarray], ProgressionTimeline], np.ndarray]] = {
+    'melody': melody_track_fitness,
+    'bass': bass_track_fitness,
+    'chords': chord_track_fitness,
+}
+
+
+# This function returns the fitness of every polyphonic individual as the sum of its track scores weighted by
+# TRACK_WEIGHTS.
+def polyphonic_fitness(population: PolyphonicPopulation, timeline: ProgressionTimeline) -> np.ndarray:
+    """
+    Evaluate the fitness of every polyphonic individual
+    """
+    total = np.zeros(len(population['melody']['pitches']))
+    for track in TRACKS:
+        total += TRACK_WEIGHTS[track] * TRACK_FITNESS[track](population[track], timeline)
+    return total
+
+
+# This function replaces every gene of a choice track (bass degrees or chord inversions) with probability
+# mutation_rate by a random choice of 0, 1 or 2. The array is modified in place.
+def mutate_choices(values: np.ndarray, mutation_rate: float, rng=np.random) -> None:
+    """
+    Mutate the genes of a bass or chord track
+    """
+    mask = rng.random(values.shape) < mutation_rate
+    values[mask] = rng.choice(3, size=np.count_nonzero(mask))
+
+
+# This function produces the next polyphonic generation. One set of parents is selected from the fitness of the
+# whole individuals and every track is crossed over and mutated on its own, so the parts of a child come from the
+# same two parents. The elite_size fittest individuals replace the first children unchanged.
+def next_polyphonic_generation(population: PolyphonicPopulation, fitness_scores: np.ndarray, mutation_rate: float,
+                               tournament_size: int, rng=np.random, elite_size: int = ELITE_SIZE,
+                               selection: str = SELECTION) -> PolyphonicPopulation:
+    """
+    Create the next polyphonic generation using selection, crossover and mutation
+    """
+    parents = selection_batch(fitness_scores, tournament_size, rng, selection)
+    children = {track: crossover_batch(population[track], parents, rng) for track in TRACKS}
+    mutate_batch(children['melody'], mutation_rate, rng)
+    mutate_choices(children['bass']['degrees'], mutation_rate, rng)
+    mutate_choices(children['chords']['inversions'], mutation_rate, rng)
+    for track in TRACKS:
+        apply_elitism(children[track], population[track], fitness_scores, elite_size)
+    return children
+
+
+# This function copies the individual stored at the given row of a polyphonic population out as one single-row
+# population per track.
+def unpack_polyphonic_individual(population: PolyphonicPopulation, index: int) -> PolyphonicPopulation:
+    """
+    Copy one polyphonic individual out of the population arrays
+    """
+    return {track: {field: values[index:index + 1].copy() for field, values in arrays.items()}
+            for track, arrays in population.items()}
+
+
+# This function generates the MIDI events of the chord track: every bar plays the three notes of its voicing
+# together for the whole bar. The events are (time, status, pitch, velocity) rows sorted like
+# generate_midi_event_array().
+def block_chord_events(voicings: np.ndarray, beats_per_chord: int, velocity: int = CHORD_VELOCITY) -> np.ndarray:
+    """
+    Generate the MIDI events of a track of block chords
+    """
+    num_bars, num_voices = voicings.shape
+    start_times = np.repeat(np.arange(num_bars, dtype=np.int64) * beats_per_chord * TICKS_PER_BEAT, num_voices)
+    end_times = start_times + beats_per_chord * TICKS_PER_BEAT
+    pitches = voicings.ravel().astype(np.int64)
+
+    num_notes = len(pitches)
+    events = np.empty((2 * num_notes, 4), dtype=np.int64)
+    events[:num_notes] = np.column_stack((start_times, np.full(num_notes, NOTE_ON), pitches, np.full(num_notes, velocity)))
+    events[num_notes:] = np.column_stack((end_times, np.full(num_notes, NOTE_OFF), pitches, np.zeros(num_notes, dtype=np.int64)))
+
+    order = np.lexsort((events[:, 1], events[:, 0]))
+    return events[order]
+
+
+# This function generates the MIDI events of every track of a polyphonic individual, as returned by
+# unpack_polyphonic_individual(), from the timeline.
+def polyphonic_events(individual: PolyphonicPopulation, timeline: ProgressionTimeline) -> Dict[str, np.ndarray]:
+    """
+    Generate the MIDI events of every track of a polyphonic individual
+    """
+    melody = individual['melody']
+    melody_pitches = MIDI_PITCH_TABLE[melody['pitches'][0].astype(np.int64), melody['octaves'][0].astype(np.int64) + 1]
+    bass_pitches = timeline.bass_pitches[np.arange(timeline.num_beats), individual['bass']['degrees'][0].astype(np.int64)]
+    voicings = timeline.voicings[np.arange(timeline.num_bars), individual['chords']['inversions'][0].astype(np.int64)]
+    return {
+        'melody': generate_midi_event_array(melody_pitches, melody['durations'][0], melody['velocities'][0]),
+        'bass': generate_midi_event_array(bass_pitches, np.ones(timeline.num_beats), np.full(timeline.num_beats, BASS_VELOCITY)),
+        'chords': block_chord_events(voicings, timeline.beats_per_chord),
+    }
+
+
+# This function returns the bytes of a format 1 MIDI file holding a polyphonic individual, with one track per part
+# on the channels in TRACK_CHANNELS. The tempo is set in the first track, and the header and all tracks are encoded
+# in memory in one pass.
+def polyphonic_midi_bytes(individual: PolyphonicPopulation, timeline: ProgressionTimeline) -> bytes:
+    """
+    Encode a polyphonic individual as the bytes of a multi-track MIDI file
+    """
+    events = polyphonic_events(individual, timeline)
+    header = b'MThd' + struct.pack('>IHHH', 6, 1, len(TRACKS), TICKS_PER_BEAT)
+    chunks = [encode_midi_track(events[track], TRACK_CHANNELS[track], tempo=index == 0) for index, track in enumerate(TRACKS)]
+    return header + b''.join(chunks)
+
+
+# This function writes a polyphonic individual to a multi-track MIDI file with a single write.
+def write_polyphonic_midi_file(individual: PolyphonicPopulation, timeline: ProgressionTimeline, filename: str) -> None:
+    """
+    Write a polyphonic individual to a multi-track MIDI file
+    """
+    with open(filename, 'wb') as output_file:
+        output_file.write(polyphonic_midi_bytes(individual, timeline))
+
+
+# The function compose_polyphonic runs the genetic algorithm on polyphonic individuals and writes the best one to a
+# multi-track MIDI file in output_dir. The progression is a list of chord names, or None to draw a progression of
+# CHORDS_PER_PROGRESSION chords from the chord rules; it is laid out over num_bars bars and shared by every
+# individual. Passing a seed makes the run reproducible. The function returns the best individual (one single-row
+# population per track), its fitness and the path of the MIDI file, or the bytes of the MIDI file when output_dir is
+# None.
+def compose_polyphonic(population_size: int = POPULATION_SIZE, individual_length: int = INDIVIDUAL_LENGTH,
+                       mutation_rate: float = MUTATION_RATE, num_generations: int = NUM_GENERATIONS,
+                       tournament_size: int = TOURNAMENT_SIZE, seed: Optional[int] = None,
+                       output_dir: Optional[str] = '.', name: str = 'best_individual', num_bars: int = NUM_BARS,
+                       progression: Optional[List[str]] = None, elite_size: int = ELITE_SIZE,
+                       selection: str = SELECTION,
+                       verbosity: int = 1) -> Tuple[PolyphonicPopulation, float, Union[str, bytes]]:
+    """
+    Run the genetic algorithm on melody, bass and chord tracks and export the best individual to a MIDI file
+    """
+    rng = np.random.default_rng(seed)
+    if progression is None:
+        progression = [CHORDS[chord] for chord in generate_chord_progressions(1, CHORDS_PER_PROGRESSION, rng)[0]]
+    timeline = build_timeline(progression, num_bars)
+    if verbosity >= 1:
+        print(f"Chord Progression : {' '.join(timeline.progression)} over {timeline.num_bars} bars")
+
+    best_individual = None
+    best_fitness = float('-inf')
+    population = generate_polyphonic_population(population_size, individual_length, timeline, rng)
+    for generation in range(num_generations):
+        fitness_scores = polyphonic_fitness(population, timeline)
+        generation_best_index = int(np.argmax(fitness_scores))
+        if fitness_scores[generation_best_index] > best_fitness:
+            best_fitness = float(fitness_scores[generation_best_index])
+            best_individual = unpack_polyphonic_individual(population, generation_best_index)
+
+        population = next_polyphonic_generation(population, fitness_scores, mutation_rate, tournament_size, rng,
+                                                elite_size, selection)
+        if verbosity >= 1:
+            print(f"Generation {generation} : Best Fitness = {fitness_scores[generation_best_index]}")
+
+    if best_individual is None:
+        best_individual = unpack_polyphonic_individual(population, 0)
+        best_fitness = float(polyphonic_fitness(best_individual, timeline)[0])
+
+    if output_dir is None:
+        return best_individual, best_fitness, polyphonic_midi_bytes(best_individual, timeline)
+    os.makedirs(output_dir, exist_ok=True)
+    filename = os.path.join(output_dir, f"{name}_fitness_{best_fitness:.2f}.mid")
+    write_polyphonic_midi_file(best_individual, timeline, filename)
+    if verbosity >= 1:
+        print(f"MIDI File Written : {filename}")
+
+    return best_individual, best_fitness, filename
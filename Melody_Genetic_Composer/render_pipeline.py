@@ -0,0 +1,132 @@
+# Program Description: Background rendering stage for the genetic algorithm music composer. The best individual of
+#                      each generation is handed to a render worker, which writes it to a MIDI file and, when a
+#                      soundfont is configured, synthesizes it to a WAV file with FluidSynth. The worker runs in a
+#                      background thread fed by a bounded queue, so file I/O and synthesis overlap with the evolution
+#                      instead of blocking it. Generations whose best individual has not changed since the last
+#                      rendered one are skipped. FluidSynth is only imported when audio is synthesized.
+
+# Required Libraries.
+import os
+import queue
+import threading
+import wave
+from typing import Optional
+import numpy as np
+
+from Melody_Genetic_Composer import TEMPO, Individual, generate_midi_file
+
+# Audio settings for synthesis.
+SAMPLE_RATE: int = 44100
+RELEASE_SECONDS: float = 1.0
+RENDER_QUEUE_SIZE: int = 8
+
+
+# This function synthesizes an individual to a stereo 16-bit WAV file with FluidSynth. Each note is started, the
+# samples for its duration at TEMPO are rendered, and the note is stopped, followed by a short release tail.
+def synthesize_individual(individual: Individual, soundfont_path: str, filename: str) -> None:
+    """
+    Render an individual to a WAV file using a soundfont
+    """
+    import fluidsynth
+
+    synth = fluidsynth.Synth(samplerate=float(SAMPLE_RATE))
+    try:
+        soundfont_id = synth.sfload(soundfont_path)
+        if soundfont_id == -1:
+            raise FileNotFoundError(f"Could not load soundfont {soundfont_path}")
+        synth.program_select(0, soundfont_id, 0, 0)
+
+        seconds_per_beat = 60.0 / TEMPO
+        pitches = individual.pitches.astype(np.int64) + 12 * (individual.octaves.astype(np.int64) + 1)
+        chunks = []
+        for pitch, duration, velocity in zip(pitches.tolist(), individual.durations.tolist(), individual.velocities.tolist()):
+            synth.noteon(0, pitch, velocity)
+            chunks.append(synth.get_samples(int(duration * seconds_per_beat * SAMPLE_RATE)))
+            synth.noteoff(0, pitch)
+        chunks.append(synth.get_samples(int(RELEASE_SECONDS * SAMPLE_RATE)))
+    finally:
+        synth.delete()
+
+    samples = np.concatenate(chunks).astype(np.int16)
+    with wave.open(filename, 'wb') as wave_file:
+        wave_file.setnchannels(2)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(SAMPLE_RATE)
+        wave_file.writeframes(samples.tobytes())
+
+
+# The RenderWorker class owns the background thread and its queue. submit() is called from the evolution loop and
+# only blocks when the queue is full; close() waits for the queued renders to finish and re-raises the first error
+# the worker hit. The rendered and skipped counters record how many generations were written and how many were
+# skipped because their best individual had not changed.
+class RenderWorker:
+    def __init__(self, output_dir: str, soundfont_path: Optional[str] = None, queue_size: int = RENDER_QUEUE_SIZE):
+        self.output_dir = output_dir
+        self.soundfont_path = soundfont_path
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.last_individual: Optional[Individual] = None
+        self.rendered = 0
+        self.skipped = 0
+        self.error: Optional[BaseException] = None
+        os.makedirs(output_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self.run, name='render-worker', daemon=True)
+        self.thread.start()
+
+    def __enter__(self) -> 'RenderWorker':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # This method queues the best individual of a generation for rendering, unless it is identical to the last
+    # individual that was queued.
+    def submit(self, generation: int, individual: Individual, fitness_score: float) -> bool:
+        """
+        Queue an individual for rendering and return whether it was queued
+        """
+        if self.error is not None:
+            raise RuntimeError("The render worker has failed.") from self.error
+        if self.last_individual is not None and all(np.array_equal(getattr(individual, field), getattr(self.last_individual, field))
+                                                    for field in Individual.__slots__):
+            self.skipped += 1
+            return False
+        self.last_individual = individual
+        self.queue.put((generation, individual, fitness_score))
+        self.rendered += 1
+        return True
+
+    # This method is the body of the background thread. It renders queued individuals until it receives None.
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                if self.error is None:
+                    self.render(*item)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    # This method writes one individual to a MIDI file and, when a soundfont is configured, to a WAV file.
+    def render(self, generation: int, individual: Individual, fitness_score: float) -> None:
+        """
+        Write the MIDI file and optional audio for one generation
+        """
+        basename = os.path.join(self.output_dir, f"generation_{generation:05d}_fitness_{fitness_score:.2f}")
+        export = individual.to_dict()
+        generate_midi_file(export['notes'], export['durations'], export['velocities'], basename + '.mid')
+        if self.soundfont_path is not None:
+            synthesize_individual(individual, self.soundfont_path, basename + '.wav')
+
+    # This method stops the background thread after the queued renders have been written.
+    def close(self) -> None:
+        """
+        Finish the queued renders and stop the worker
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,124 @@
+# Program Description: Parent selection operators for the genetic algorithm music composer. Every operator takes the
+#                      fitness scores of the whole population and returns the indices of the selected parents, drawn
+#                      for all parents at once with array operations, so no Python code runs per parent and no
+#                      individual is copied before crossover.
+#
+#                      Tournament selection draws every tournament without replacement as one matrix with a row per
+#                      parent and picks the winner of each row with argmax. Rank-based selection picks parents with a
+#                      probability that grows linearly with their rank, so it depends on the order of the fitness
+#                      scores but not on their scale. Stochastic universal sampling picks parents in proportion to
+#                      their fitness with evenly spaced pointers over the cumulative fitness, which keeps the number
+#                      of copies of every individual close to its expected value. Truncation selection picks parents
+#                      uniformly from the fittest fraction of the population.
+
+# Required Libraries.
+from typing import Callable, Dict
+import numpy as np
+
+# Selection pressure of rank-based selection: the expected number of copies of the fittest individual, between 1
+# (uniform selection) and 2 (the least fit individual is never selected).
+RANK_PRESSURE: float = 1.5
+# Fraction of the population, fittest first, that truncation selection draws parents from.
+TRUNCATION_FRACTION: float = 0.5
+
+SelectionOperator = Callable[..., np.ndarray]
+
+
+# This function selects parents with tournament selection. Every tournament is sampled without replacement with
+# Floyd's algorithm applied to all rows at once: column c draws a position from the first
+# size - tournament_size + c + 1 positions and takes the last of those positions instead when the row already holds
+# the draw. This needs exactly tournament_size random draws per row, with no rejected tournaments to redraw, and the
+# winner of each row is picked with argmax.
+def tournament_selection(fitness_scores: np.ndarray, num_selected: int, rng=np.random, tournament_size: int = 3) -> np.ndarray:
+    """
+    Select parent indices using tournament selection
+    """
+    size = len(fitness_scores)
+    if tournament_size > size:
+        raise ValueError("Tournament size cannot be larger than the population size.")
+    if tournament_size < 1:
+        raise ValueError("Tournament size must be at least 1.")
+
+    limits = np.arange(size - tournament_size + 1, size + 1)
+    tournaments = (rng.random((tournament_size, num_selected)) * limits[:, None]).astype(np.int64)
+    for column in range(1, tournament_size):
+        draws = tournaments[column]
+        taken = draws == tournaments[0]
+        for previous in range(1, column):
+            taken |= draws == tournaments[previous]
+        draws[taken] = limits[column] - 1
+    tournaments = tournaments.T
+
+    tournament_best_index = np.argmax(fitness_scores[tournaments], axis=1)
+    return tournaments[np.arange(num_selected), tournament_best_index]
+
+
+# This function selects parents with linear rank-based selection. The least fit individual has rank 0 and the
+# fittest rank size - 1, and an individual of rank r is selected with probability
+# (2 - RANK_PRESSURE + 2 * (RANK_PRESSURE - 1) * r / (size - 1)) / size. Parents are drawn by inverse transform
+# sampling on the cumulative probabilities.
+def rank_selection(fitness_scores: np.ndarray, num_selected: int, rng=np.random, tournament_size: int = 3) -> np.ndarray:
+    """
+    Select parent indices using linear rank-based selection
+    """
+    size = len(fitness_scores)
+    if size == 1:
+        return np.zeros(num_selected, dtype=np.int64)
+    order = np.argsort(fitness_scores, kind='stable')
+    weights = 2.0 - RANK_PRESSURE + 2.0 * (RANK_PRESSURE - 1.0) * np.arange(size) / (size - 1)
+    cumulative = np.cumsum(weights)
+    positions = np.searchsorted(cumulative, rng.random(num_selected) * cumulative[-1], side='right')
+    return order[np.minimum(positions, size - 1)]
+
+
+# This function selects parents with stochastic universal sampling. The fitness scores are shifted so the least fit
+# individual has weight 0 (every individual has the same weight when all scores are equal), and num_selected evenly
+# spaced pointers with one random offset are placed over the cumulative weights. The selected indices come out in
+# population order, so they are shuffled before being paired for crossover.
+def stochastic_universal_sampling(fitness_scores: np.ndarray, num_selected: int, rng=np.random, tournament_size: int = 3) -> np.ndarray:
+    """
+    Select parent indices using stochastic universal sampling
+    """
+    size = len(fitness_scores)
+    if num_selected == 0:
+        return np.zeros(0, dtype=np.int64)
+    weights = np.asarray(fitness_scores, dtype=np.float64) - np.min(fitness_scores)
+    if not weights.any():
+        weights = np.ones(size)
+    cumulative = np.cumsum(weights)
+    spacing = cumulative[-1] / num_selected
+    pointers = (rng.random() + np.arange(num_selected)) * spacing
+    selected = np.minimum(np.searchsorted(cumulative, pointers, side='right'), size - 1)
+    return selected[rng.permutation(num_selected)]
+
+
+# This function selects parents with truncation selection: the fittest TRUNCATION_FRACTION of the population (at
+# least one individual) is kept and every parent is drawn uniformly from it.
+def truncation_selection(fitness_scores: np.ndarray, num_selected: int, rng=np.random, tournament_size: int = 3) -> np.ndarray:
+    """
+    Select parent indices using truncation selection
+    """
+    size = len(fitness_scores)
+    kept = max(1, int(size * TRUNCATION_FRACTION))
+    fittest = np.argpartition(-np.asarray(fitness_scores), kept - 1)[:kept] if kept < size else np.arange(size)
+    return fittest[rng.choice(kept, size=num_selected)]
+
+
+# Selection operators by name, as accepted by compose() and the --selection option.
+SELECTION_OPERATORS: Dict[str, SelectionOperator] = {
+    'tournament': tournament_selection,
+    'rank': rank_selection,
+    'sus': stochastic_universal_sampling,
+    'truncation': truncation_selection,
+}
+
+
+# This function returns the selection operator with the given name.
+def get_selection_operator(name: str) -> SelectionOperator:
+    """
+    Look up a selection operator by name
+    """
+    try:
+        return SELECTION_OPERATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown selection operator {name!r}; expected one of {', '.join(SELECTION_OPERATORS)}.") from None
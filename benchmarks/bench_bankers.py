@@ -0,0 +1,137 @@
+# Program Description: Benchmarks for the Banker's Algorithm engine. Synthetic states are generated for a sweep of
+#                      process counts, resource counts and safe/unsafe mixes, and each case times the safety check on
+#                      a batch of states with the list-based engine, the NumPy engine (when NumPy is installed) and
+#                      the resource-request allocator.
+#
+#                      Safe states are built by walking the processes in a random order and giving every process a
+#                      remaining need that fits in the work available at its turn, so a safe sequence is known to
+#                      exist. Unsafe states are safe states where one process needs more of a resource than the
+#                      system holds in total, so it can never finish and the check has to run to exhaustion.
+#
+#                      The trace cases replay a stream of request and release events through the trace simulator.
+#
+#                      Usage: python benchmarks/bench_bankers.py --processes 100 1000 --resources 4 32 --output out.json
+
+# Required Libraries.
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Banker_Algorithm'))
+
+from banker_engine import ResourceAllocator, isSafe, np  # noqa: E402
+from banker_simulation import TraceSimulator  # noqa: E402
+from harness import report, run_case  # noqa: E402
+
+
+# This function generates one state with the given number of processes and resources. The returned state is safe
+# unless unsafe is set.
+def generate_state(rng: random.Random, num_processes: int, num_resources: int, unsafe: bool = False):
+    available = [rng.randint(1, 10) for _ in range(num_resources)]
+    maxm = [None] * num_processes
+    allot = [None] * num_processes
+    work = available.copy()
+    for i in rng.sample(range(num_processes), num_processes):
+        allotted = [rng.randint(0, 10) for _ in range(num_resources)]
+        need = [rng.randint(0, work[j]) for j in range(num_resources)]
+        allot[i] = allotted
+        maxm[i] = [allotted[j] + need[j] for j in range(num_resources)]
+        work = [work[j] + allotted[j] for j in range(num_resources)]
+
+    if unsafe:
+        # work now holds every resource in the system, so this need can never be satisfied
+        i = rng.randrange(num_processes)
+        j = rng.randrange(num_resources)
+        maxm[i][j] = allot[i][j] + work[j] + 1
+
+    return available, maxm, allot
+
+
+# This function generates a batch of states where unsafe_fraction of the states are unsafe.
+def generate_states(seed: int, count: int, num_processes: int, num_resources: int, unsafe_fraction: float):
+    rng = random.Random(seed)
+    return [generate_state(rng, num_processes, num_resources, rng.random() < unsafe_fraction) for _ in range(count)]
+
+
+# This function generates a trace of request and release events for a safe state. Events are (time, kind, process,
+# vector) tuples as read by banker_simulation.readTrace, with one event per time unit. The trace is replayed while it
+# is generated, so every process releases only what it holds and requests only what its waiting requests leave of
+# its remaining claim, and every event is valid.
+def generate_trace(seed: int, state, num_events: int):
+    rng = random.Random(seed)
+    simulator = TraceSimulator(*state)
+    allocator = simulator.allocator
+    num_processes = len(allocator.need)
+    events = []
+    for t in range(num_events):
+        i = rng.randrange(num_processes)
+        if rng.random() < 0.5:
+            kind, remaining = 'release', allocator.allot[i]
+        else:
+            remaining = allocator.need[i].copy()
+            for _, _, request in simulator.queues.get(i, ()):
+                remaining = [x - r for x, r in zip(remaining, request)]
+            kind = 'request'
+        event = (t, kind, i, [rng.randint(0, min(2, x)) for x in remaining])
+        simulator.handleEvent(*event)
+        events.append(event)
+    return events
+
+
+# This function times the safety check for every combination in the sweep, and the request algorithm and the trace
+# replay once for every process and resource count, as they only use safe states.
+def run_benchmarks(process_counts, resource_counts, unsafe_fractions, states_per_case, repeat, seed,
+                   trace_events=2000):
+    results = []
+    for num_processes in process_counts:
+        for num_resources in resource_counts:
+            for unsafe_fraction in unsafe_fractions:
+                parameters = {'processes': num_processes, 'resources': num_resources, 'unsafe_fraction': unsafe_fraction}
+                states = generate_states(seed, states_per_case, num_processes, num_resources, unsafe_fraction)
+
+                results.append(run_case('isSafe_lists', parameters, lambda: states,
+                                        lambda batch: [isSafe(range(len(m)), a, m, al) for a, m, al in batch],
+                                        items=len(states), repeat=repeat))
+
+                if np is not None:
+                    arrays = [(np.array(a), np.array(m), np.array(al)) for a, m, al in states]
+                    results.append(run_case('isSafe_numpy', parameters, lambda: arrays,
+                                            lambda batch: [isSafe(range(len(m)), a, m, al) for a, m, al in batch],
+                                            items=len(arrays), repeat=repeat))
+
+            parameters = {'processes': num_processes, 'resources': num_resources}
+
+            # Grant one small request per process of a safe state, one allocator per run
+            safe_state = generate_state(random.Random(seed), num_processes, num_resources)
+
+            def grant_requests(allocator):
+                for i in range(num_processes):
+                    allocator.requestResources(i, [min(1, x) for x in allocator.need[i]])
+
+            results.append(run_case('requestResources', parameters, lambda: ResourceAllocator(*safe_state),
+                                    grant_requests, items=num_processes, repeat=repeat))
+
+            # Replay a request/release trace, one simulator per run
+            trace = generate_trace(seed, safe_state, trace_events)
+            results.append(run_case('simulateTrace', parameters,
+                                    lambda: TraceSimulator(*safe_state),
+                                    lambda simulator: simulator.run(trace), items=len(trace), repeat=repeat))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Banker's Algorithm engine.")
+    parser.add_argument('--processes', type=int, nargs='+', default=[10, 100, 1000], help="process counts to sweep")
+    parser.add_argument('--resources', type=int, nargs='+', default=[3, 16], help="resource counts to sweep")
+    parser.add_argument('--unsafe-fraction', type=float, nargs='+', default=[0.0, 0.5], help="fractions of unsafe states")
+    parser.add_argument('--states', type=int, default=20, help="states checked per run")
+    parser.add_argument('--trace-events', type=int, default=2000, help="events per replayed trace")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per case")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the state generator")
+    parser.add_argument('--output', metavar='FILE', help="save the results as JSON")
+    arguments = parser.parse_args()
+
+    report('bankers', run_benchmarks(arguments.processes, arguments.resources, arguments.unsafe_fraction,
+                                     arguments.states, arguments.repeat, arguments.seed, arguments.trace_events),
+           arguments.output)
@@ -0,0 +1,63 @@
+# Program Description: Benchmarks for the genetic algorithm music composer. Each case evolves a population for a
+#                      number of generations with the batched population engine (fitness, tournament selection,
+#                      crossover and mutation on the packed population arrays) for a sweep of population sizes,
+#                      individual lengths and generation counts. Generating the initial population is timed as a
+#                      separate case, so the per-generation throughput is not diluted by it.
+#
+#                      Usage: python benchmarks/bench_melody.py --population-size 150 1000 --generations 10 --output out.json
+
+# Required Libraries.
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Melody_Genetic_Composer'))
+
+from Melody_Genetic_Composer import MUTATION_RATE, TOURNAMENT_SIZE, fitness_batch, generate_population, next_generation  # noqa: E402
+from harness import report, run_case  # noqa: E402
+
+
+# This function evolves a population for the given number of generations and returns the final population.
+def evolve(population, num_generations: int, rng: np.random.Generator):
+    for _ in range(num_generations):
+        fitness_scores = fitness_batch(population)
+        population = next_generation(population, fitness_scores, MUTATION_RATE, TOURNAMENT_SIZE, rng)
+    return population
+
+
+# This function times population generation and evolution for every combination in the sweep. The throughput of the
+# evolution cases is counted in individuals evaluated per second.
+def run_benchmarks(population_sizes, individual_lengths, generation_counts, repeat, seed):
+    results = []
+    for population_size in population_sizes:
+        for individual_length in individual_lengths:
+            parameters = {'population_size': population_size, 'individual_length': individual_length}
+            np.random.seed(seed)
+            results.append(run_case('generate_population', parameters, lambda: None,
+                                    lambda _: generate_population(population_size, individual_length),
+                                    items=population_size, repeat=repeat))
+
+            np.random.seed(seed)
+            initial_population = generate_population(population_size, individual_length)
+            for num_generations in generation_counts:
+                rng = np.random.default_rng(seed)
+                results.append(run_case('evolve', dict(parameters, generations=num_generations),
+                                        lambda: {field: values.copy() for field, values in initial_population.items()},
+                                        lambda population: evolve(population, num_generations, rng),
+                                        items=population_size * num_generations, repeat=repeat))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the genetic algorithm music composer.")
+    parser.add_argument('--population-size', type=int, nargs='+', default=[150, 1000], help="population sizes to sweep")
+    parser.add_argument('--individual-length', type=int, nargs='+', default=[50, 200], help="individual lengths to sweep")
+    parser.add_argument('--generations', type=int, nargs='+', default=[1, 10], help="generation counts to sweep")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per case")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the random number generators")
+    parser.add_argument('--output', metavar='FILE', help="save the results as JSON")
+    arguments = parser.parse_args()
+
+    report('melody', run_benchmarks(arguments.population_size, arguments.individual_length, arguments.generations,
+                                    arguments.repeat, arguments.seed), arguments.output)
@@ -0,0 +1,141 @@
+# Program Description: Shared benchmark harness for the projects in this collection. A benchmark case is a callable
+#                      that is run a number of times after a warm-up run; the harness records the latency of every
+#                      run, the peak memory allocated during one further traced run (tracemalloc, which includes
+#                      NumPy arrays), and derives the throughput from a per-run item count. Results are saved as JSON
+#                      with the git revision and Python version, and two result files can be compared case by case to
+#                      see whether a change made things faster or slower.
+#
+#                      Usage: python benchmarks/harness.py compare baseline.json candidate.json
+
+# Required Libraries.
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+
+# This function returns the given percentile of a list of latencies, interpolating linearly between samples.
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return a percentile of a list of values
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# This function runs one benchmark case. setup() is called before every run and its result is passed to run(), so
+# the cost of building the input is not measured. items is the number of units of work (states checked,
+# individuals evaluated, ...) done by one run, used for the throughput. The function returns the case's parameters
+# together with its latency percentiles in seconds, its throughput in items per second and its peak traced memory.
+def run_case(name: str, parameters: Dict[str, object], setup: Callable[[], object], run: Callable[[object], object],
+             items: int, repeat: int = 5, warmup: int = 1) -> Dict[str, object]:
+    """
+    Time a benchmark case and return its result
+    """
+    for _ in range(warmup):
+        run(setup())
+
+    latencies = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        latencies.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run, because tracing slows down the code being timed
+    argument = setup()
+    tracemalloc.start()
+    run(argument)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        'name': name,
+        'parameters': parameters,
+        'repeat': repeat,
+        'items_per_run': items,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p90': percentile(latencies, 0.90),
+        'latency_p99': percentile(latencies, 0.99),
+        'latency_mean': total / len(latencies),
+        'throughput': items * len(latencies) / total if total > 0 else float('inf'),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+# This function returns the git revision of the working tree, or None outside a git checkout.
+def git_revision() -> Optional[str]:
+    """
+    Return the current git revision
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# This function prints one line per result and, when a path is given, saves the results as JSON together with the
+# revision, Python version, platform and time they were measured at.
+def report(suite: str, results: List[Dict[str, object]], path: Optional[str] = None) -> None:
+    """
+    Print benchmark results and save them as JSON
+    """
+    for result in results:
+        parameters = ' '.join(f"{key}={value}" for key, value in result['parameters'].items())
+        print(f"{result['name']:<28} {parameters:<48} p50 {result['latency_p50'] * 1000:10.3f} ms  "
+              f"p99 {result['latency_p99'] * 1000:10.3f} ms  {result['throughput']:14.1f} items/s  "
+              f"peak {result['peak_memory_bytes'] / 2 ** 20:8.1f} MiB")
+
+    if path:
+        document = {
+            'suite': suite,
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'results': results,
+        }
+        with open(path, 'w') as output_file:
+            json.dump(document, output_file, indent=2)
+
+
+# This function compares two result files. Cases are matched on their name and parameters, and the ratio of the
+# median latencies is printed (below 1 means the candidate is faster).
+def compare(baseline_path: str, candidate_path: str) -> None:
+    """
+    Compare the median latencies of two result files
+    """
+    def load(path):
+        with open(path) as result_file:
+            return {(result['name'], json.dumps(result['parameters'], sort_keys=True)): result
+                    for result in json.load(result_file)['results']}
+
+    baseline = load(baseline_path)
+    candidate = load(candidate_path)
+    for key, result in candidate.items():
+        if key not in baseline:
+            continue
+        ratio = result['latency_p50'] / baseline[key]['latency_p50'] if baseline[key]['latency_p50'] else float('inf')
+        print(f"{key[0]:<28} {key[1]:<60} {ratio:8.3f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare_parser = subparsers.add_parser('compare', help="print the median latency ratio of every shared case")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    arguments = parser.parse_args()
+    compare(arguments.baseline, arguments.candidate)